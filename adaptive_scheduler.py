@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+
+from config import data_path
+
+# ==================================================================
+# [스케줄러] 단지별 변동량(churn)에 따라 크롤링 주기 자동 조절
+# ==================================================================
+# 크롤링이 끝날 때마다 변경 이벤트 수(change_events.py)를 직전 크롤링 이후 경과 시간으로
+# 나눠 "시간당 변동량"을 구하고, 지수 이동 평균으로 누적합니다.
+#   - 변동이 많은 단지  -> 주기 단축 (최소 MIN_INTERVAL_MIN)
+#   - 변동이 없는 단지  -> 주기 연장 (최대 MAX_INTERVAL_MIN)
+# 한 번에 주기는 최대 2배까지만 변하며, 실행 1회당 크롤링 가능한 단지 수(예산)를
+# 넘으면 변동량이 큰 단지부터 처리합니다.
+SCHEDULE_FILE = "schedule.db"
+MIN_INTERVAL_MIN = int(os.environ.get("SCHEDULE_MIN_INTERVAL_MIN", "60"))
+MAX_INTERVAL_MIN = int(os.environ.get("SCHEDULE_MAX_INTERVAL_MIN", "1440"))
+HOURLY_BUDGET = float(os.environ.get("SCHEDULE_HOURLY_BUDGET", "20"))  # 시간당 단지 크롤링 횟수 한도
+TARGET_EVENTS_PER_CRAWL = 2.0  # 크롤링 1회에 이 정도 변화가 잡히도록 주기 설정
+EWMA_ALPHA = 0.3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    complex_no      TEXT PRIMARY KEY,
+    interval_min    REAL,
+    churn_per_hour  REAL DEFAULT 0,
+    last_crawled_at REAL,
+    crawls          INTEGER DEFAULT 0
+);
+"""
+
+
+def _clamp(value, lo, hi):
+    return max(lo, min(hi, value))
+
+
+class AdaptiveScheduler:
+
+    def __init__(self, path=None, min_interval=MIN_INTERVAL_MIN, max_interval=MAX_INTERVAL_MIN, hourly_budget=HOURLY_BUDGET):
+        self.conn = sqlite3.connect(path or data_path(SCHEDULE_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hourly_budget = hourly_budget
+
+    def close(self):
+        self.conn.close()
+
+    def register(self, complex_nos):
+        """새 단지는 최소 주기로 시작 (첫 측정 전까지는 자주 확인)"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO schedule (complex_no, interval_min) VALUES (?, ?)",
+                [(str(c), float(self.min_interval)) for c in complex_nos],
+            )
+
+    # --------------------------------------------------------------
+    # 측정 -> 주기 갱신
+    # --------------------------------------------------------------
+    def record_crawl(self, complex_no, n_events, crawled_at=None):
+        """크롤링 1회 결과 반영 (n_events: 신규/가격변경/삭제/재등록 이벤트 합계)"""
+        crawled_at = crawled_at or time.time()
+        self.register([complex_no])
+        row = self.conn.execute("SELECT * FROM schedule WHERE complex_no = ?", (str(complex_no),)).fetchone()
+
+        churn = row["churn_per_hour"] or 0.0
+        interval = row["interval_min"] or float(self.min_interval)
+        if row["last_crawled_at"]:
+            hours = max((crawled_at - row["last_crawled_at"]) / 3600, 1 / 60)
+            observed = n_events / hours
+            churn = observed if row["crawls"] <= 1 else EWMA_ALPHA * observed + (1 - EWMA_ALPHA) * churn
+
+            target = TARGET_EVENTS_PER_CRAWL / churn * 60 if churn > 0 else self.max_interval
+            interval = _clamp(target, interval / 2, interval * 2)
+            interval = _clamp(interval, self.min_interval, self.max_interval)
+
+        with self.conn:
+            self.conn.execute(
+                "UPDATE schedule SET interval_min = ?, churn_per_hour = ?, last_crawled_at = ?, crawls = crawls + 1 WHERE complex_no = ?",
+                (interval, churn, crawled_at, str(complex_no)),
+            )
+        return interval
+
+    # --------------------------------------------------------------
+    # 계획 / 예산 배분
+    # --------------------------------------------------------------
+    def budget_scale(self):
+        """전체 수요(시간당 크롤링 횟수)가 예산을 넘으면 모든 주기를 같은 비율로 늘림"""
+        demand = sum(60.0 / r["interval_min"] for r in self.conn.execute("SELECT interval_min FROM schedule"))
+        return max(1.0, demand / self.hourly_budget) if self.hourly_budget > 0 else 1.0
+
+    def plan(self, now=None):
+        now = now or time.time()
+        scale = self.budget_scale()
+        result = []
+        for r in self.conn.execute("SELECT * FROM schedule"):
+            effective = r["interval_min"] * scale
+            next_due = (r["last_crawled_at"] or 0) + effective * 60
+            result.append({
+                "complex_no": r["complex_no"],
+                "interval_min": r["interval_min"],
+                "effective_interval_min": effective,
+                "churn_per_hour": r["churn_per_hour"] or 0.0,
+                "last_crawled_at": r["last_crawled_at"],
+                "next_due_at": next_due,
+                "overdue_min": (now - next_due) / 60,
+            })
+        return result
+
+    def due(self, limit=None, now=None):
+        """지금 크롤링할 단지 목록 (변동량 x 지연 정도 순)"""
+        candidates = [p for p in self.plan(now) if p["overdue_min"] >= 0]
+        # 한 번도 안 돈 단지 우선, 그 다음 변동량이 크고 오래 밀린 단지
+        candidates.sort(key=lambda p: (
+            p["last_crawled_at"] is not None,
+            -(p["churn_per_hour"] + 0.01) * (1 + p["overdue_min"] / p["effective_interval_min"]),
+        ))
+        if limit is not None:
+            candidates = candidates[:limit]
+        return [p["complex_no"] for p in candidates]
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="단지별 적응형 크롤링 주기")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="단지 등록")
+    p_add.add_argument("complex_nos", nargs="+")
+    sub.add_parser("plan", help="단지별 주기/다음 예정 시각")
+    p_due = sub.add_parser("due", help="지금 크롤링할 단지 (공백 구분 출력)")
+    p_due.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    scheduler = AdaptiveScheduler()
+    try:
+        if args.cmd == "add":
+            scheduler.register(args.complex_nos)
+        elif args.cmd == "plan":
+            print(f"예산 배율: x{scheduler.budget_scale():.2f} (시간당 {scheduler.hourly_budget:g}회)")
+            for p in sorted(scheduler.plan(), key=lambda p: p["next_due_at"]):
+                due_at = time.strftime("%m-%d %H:%M", time.localtime(p["next_due_at"])) if p["next_due_at"] else "즉시"
+                print(f"{p['complex_no']}\t주기 {p['effective_interval_min']:.0f}분\t변동 {p['churn_per_hour']:.2f}건/시간\t다음 {due_at}")
+        elif args.cmd == "due":
+            print(" ".join(scheduler.due(args.limit)))
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
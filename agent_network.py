@@ -0,0 +1,317 @@
+import sys
+import math
+import time
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import scipy.sparse as sp
+
+from config import KST, data_path
+from change_events import price_to_manwon
+from dimensions import NAMED_LOGS
+
+# ==================================================================
+# [네트워크] 중개업소 공동 등록(co-listing) 분석
+# ==================================================================
+# agent_stats 는 시간대별 매물 수만 셉니다. 같은 호실을 여러 중개업소가 반복해서 올리는 패턴
+# (허위 매물 담합의 흔적)을 보려면 "누가 누구와 같은 매물을 올리는지" 가 필요합니다.
+#   1. 로컬 미러(local_mirror.py)에서 (중개업소, 매물 단위) 별 등장 시간 수를 SQL 로 집계
+#      매물 단위 = (단지, 거래방식, 동, 스펙, 가격대)  가격대는 PRICE_BAND 비율 폭의 로그 구간
+#   2. 중개업소 x 매물 단위 희소 행렬 B (MIN_HOURS 시간 이상 올린 경우만 1)
+#   3. 공동 등록 수 = B·Bᵀ (비대각 원소), 가중치 = Jaccard (공동 단위 / 두 업소 단위 합집합)
+#      거의 모든 업소가 올리는 단위(MAX_UNIT_AGENTS 초과)는 정보가 없고 곱셈 비용만 커서 제외
+#   4. 가중치 MIN_WEIGHT 이상 간선으로 라벨 전파(희소 행렬 곱 반복) -> 업소 커뮤니티
+#   5. 업소별 상위 TOP_K 간선과 커뮤니티를 agent_network.db 에 저장 (최근 KEEP_RUNS 회분 유지)
+# real_estate_logs 에 complex_no 컬럼이 없거나 값이 NULL 이면 기본 단지(COMPLEX_NO) 로 봅니다. (migrations/006)
+NETWORK_FILE = "agent_network.db"
+PRICE_BAND = 0.03
+MIN_HOURS = 2
+MAX_UNIT_AGENTS = 50
+MIN_WEIGHT = 0.2
+MIN_SHARED = 2
+TOP_K = 10
+LPA_MAX_ITER = 30
+KEEP_RUNS = 7
+UNKNOWN_AGENTS = ("", "알수없음")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS network_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT, built_at TEXT, date_from TEXT, date_to TEXT,
+    agents INTEGER, units INTEGER, listing_hours INTEGER, edges INTEGER, communities INTEGER, seconds REAL
+);
+CREATE TABLE IF NOT EXISTS agent_edges (
+    run_id INTEGER, agent TEXT, rank INTEGER, peer TEXT, shared_units INTEGER, weight REAL,
+    PRIMARY KEY (run_id, agent, rank)
+);
+CREATE TABLE IF NOT EXISTS agent_communities (
+    run_id INTEGER, agent TEXT, community INTEGER, community_size INTEGER, units INTEGER, degree INTEGER,
+    PRIMARY KEY (run_id, agent)
+);
+CREATE INDEX IF NOT EXISTS idx_communities ON agent_communities (run_id, community);
+"""
+
+
+def price_band(price, ratio=PRICE_BAND):
+    """'12억 5,000' -> 로그 구간 번호 (인접 가격은 같은 구간). 가격이 없으면 None"""
+    value = price_to_manwon(price)
+    return int(math.log(value) / math.log1p(ratio)) if value and value > 0 else None
+
+
+# ==================================================================
+# [행렬] 중개업소 x 매물 단위
+# ==================================================================
+class Incidence:
+    """agents[i], units[j] 와 B[i, j] = 등장 시간 수 (csr)"""
+
+    def __init__(self, agents, units, matrix, listing_hours):
+        self.agents = agents
+        self.units = units
+        self.matrix = matrix
+        self.listing_hours = listing_hours
+
+    @classmethod
+    def from_mirror(cls, mirror, date_from=None, date_to=None):
+        complex_col = mirror.complex_column()
+        sql = (f"SELECT agent, {complex_col} AS complex_no, trade_type, dong, spec, price, COUNT(*) AS hours "
+               f"FROM {NAMED_LOGS} WHERE agent IS NOT NULL")
+        params = []
+        if date_from:
+            sql += " AND crawl_date >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND crawl_date <= ?"
+            params.append(date_to)
+        sql += f" GROUP BY agent, {complex_col}, trade_type, dong, spec, price"
+        return cls.from_groups(mirror.conn.execute(sql, params))
+
+    @classmethod
+    def from_groups(cls, groups):
+        """(agent, complex_no, trade_type, dong, spec, price, hours) 집계 행 -> 희소 행렬"""
+        agent_idx, unit_idx, bands = {}, {}, {}
+        rows, cols, vals = [], [], []
+        total = 0
+        for agent, complex_no, trade_type, dong, spec, price, hours in groups:
+            if agent in UNKNOWN_AGENTS:
+                continue
+            band = bands.get(price)
+            if band is None and price not in bands:
+                band = bands[price] = price_band(price)
+            if band is None:
+                continue
+            unit = (str(complex_no), trade_type, dong or "", spec or "", band)
+            rows.append(agent_idx.setdefault(agent, len(agent_idx)))
+            cols.append(unit_idx.setdefault(unit, len(unit_idx)))
+            vals.append(hours)
+            total += hours
+
+        # 같은 가격대의 여러 가격은 coo -> csr 변환에서 합산됨
+        matrix = sp.coo_matrix(
+            (np.asarray(vals, dtype=np.float32), (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+            shape=(len(agent_idx), len(unit_idx)),
+        ).tocsr()
+        return cls(list(agent_idx), list(unit_idx), matrix, total)
+
+
+# ==================================================================
+# [계산] 공동 등록 가중치 / 커뮤니티
+# ==================================================================
+def co_listing(incidence, min_hours=MIN_HOURS, max_unit_agents=MAX_UNIT_AGENTS):
+    """
+    반환: (shared, weight, units_per_agent)
+      shared[i, j] = 두 업소가 함께 올린 매물 단위 수 / weight[i, j] = Jaccard (둘 다 csr, 대각 0)
+    """
+    binary = incidence.matrix.copy()
+    binary.data = (binary.data >= min_hours).astype(np.float32)
+    binary.eliminate_zeros()
+    units_per_agent = np.asarray(binary.sum(axis=1)).ravel()
+
+    # 2곳 이상이 올렸고 너무 흔하지 않은 단위만 곱셈에 사용
+    agents_per_unit = np.asarray(binary.sum(axis=0)).ravel()
+    keep = np.flatnonzero((agents_per_unit >= 2) & (agents_per_unit <= max_unit_agents))
+    binary = binary.tocsc()[:, keep].tocsr()
+
+    shared = (binary @ binary.T).tocsr()
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+
+    coo = shared.tocoo()
+    union = units_per_agent[coo.row] + units_per_agent[coo.col] - coo.data
+    weight = sp.csr_matrix((coo.data / np.maximum(union, 1), (coo.row, coo.col)), shape=shared.shape)
+    return shared, weight, units_per_agent
+
+
+def communities(shared, weight, min_weight=MIN_WEIGHT, min_shared=MIN_SHARED, max_iter=LPA_MAX_ITER):
+    """
+    라벨 전파: 매 반복마다 S = A · onehot(labels) 로 이웃 라벨별 가중치 합을 구해 가장 큰 라벨로 이동
+    자기 자신에 이웃 최대 가중치만큼의 고리를 달고 동점은 작은 라벨을 택해 진동 없이 수렴
+    반환: (업소별 커뮤니티 번호 - 큰 커뮤니티부터 0, 1, ... / 업소별 소속 커뮤니티 크기)
+    """
+    n = weight.shape[0]
+    mask = weight.multiply(weight >= min_weight).multiply(shared >= min_shared)
+    adj = sp.csr_matrix(mask)
+    adj.eliminate_zeros()
+    self_loop = adj.max(axis=1).toarray().ravel() if adj.nnz else np.zeros(n)
+    adj = (adj + sp.diags(np.maximum(self_loop, 1e-6))).tocsr()
+
+    labels = np.arange(n)
+    ones = np.ones(n, dtype=np.float32)
+    for _ in range(max_iter):
+        onehot = sp.csr_matrix((ones, (np.arange(n), labels)), shape=(n, n))
+        scores = (adj @ onehot).tocsr()
+        new_labels = np.asarray(scores.argmax(axis=1)).ravel()
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    # 크기 순으로 번호 재부여
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse], counts[inverse]
+
+
+def top_edges(shared, weight, k=TOP_K):
+    """업소별 가중치 상위 k 간선 -> {i: [(j, 공동 단위 수, 가중치), ...]}"""
+    # weight 는 shared 와 같은 위치에만 값이 있으므로 인덱스를 정렬하면 data 가 1:1 로 대응
+    shared.sort_indices()
+    weight.sort_indices()
+    result = {}
+    for i in range(weight.shape[0]):
+        start, end = weight.indptr[i], weight.indptr[i + 1]
+        if start == end:
+            continue
+        peers = weight.indices[start:end]
+        values = weight.data[start:end]
+        counts = shared.data[start:end]
+        order = np.lexsort((-counts, -values))[:k]
+        result[i] = [(int(peers[o]), int(counts[o]), float(values[o])) for o in order]
+    return result
+
+
+# ==================================================================
+# [저장소] 실행 결과
+# ==================================================================
+class AgentNetwork:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(NETWORK_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def build(self, mirror, date_from=None, date_to=None):
+        started = time.time()
+        incidence = Incidence.from_mirror(mirror, date_from, date_to)
+        agents = incidence.agents
+        if not agents:
+            print("⚠️ [Network] 기간 내 매물 데이터가 없습니다. (local_mirror.py sync 확인)")
+            return None
+        print(f"🕸️ [Network] 업소 {len(agents)}곳 x 매물 단위 {len(incidence.units)}개 "
+              f"(등장 {incidence.listing_hours}시간, 비영 원소 {incidence.matrix.nnz}개)")
+
+        shared, weight, units_per_agent = co_listing(incidence)
+        labels, sizes = communities(shared, weight)
+        edges = top_edges(shared, weight)
+        degree = np.diff(weight.indptr)
+        n_communities = int(len(set(labels[sizes > 1].tolist())))
+        elapsed = time.time() - started
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO network_runs (built_at, date_from, date_to, agents, units, listing_hours, edges, communities, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (datetime.now(KST).isoformat(timespec="seconds"), date_from, date_to, len(agents), len(incidence.units),
+                 incidence.listing_hours, weight.nnz // 2, n_communities, round(elapsed, 2)))
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO agent_edges VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, agents[i], rank, agents[j], count, round(w, 4))
+                 for i, peers in edges.items() for rank, (j, count, w) in enumerate(peers)])
+            self.conn.executemany(
+                "INSERT INTO agent_communities VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, agents[i], int(labels[i]), int(sizes[i]), int(units_per_agent[i]), int(degree[i]))
+                 for i in range(len(agents))])
+            old = [r[0] for r in self.conn.execute(
+                "SELECT run_id FROM network_runs ORDER BY run_id DESC LIMIT -1 OFFSET ?", (KEEP_RUNS,))]
+            for table in ("agent_edges", "agent_communities", "network_runs"):
+                self.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(r,) for r in old])
+
+        print(f"🕸️ [Network] 간선 {weight.nnz // 2}개, 2곳 이상 커뮤니티 {n_communities}개 ({elapsed:.1f}초, run {run_id})")
+        return run_id
+
+    def latest_run(self):
+        row = self.conn.execute("SELECT * FROM network_runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def edges(self, agent, run_id=None):
+        run_id = run_id or (self.latest_run() or {}).get("run_id")
+        return [dict(r) for r in self.conn.execute(
+            "SELECT peer, shared_units, weight FROM agent_edges WHERE run_id = ? AND agent = ? ORDER BY rank", (run_id, agent))]
+
+    def communities(self, min_size=2, run_id=None):
+        """[{community, size, agents: [...]}] (큰 순)"""
+        run_id = run_id or (self.latest_run() or {}).get("run_id")
+        groups = {}
+        for r in self.conn.execute(
+                "SELECT agent, community, community_size FROM agent_communities WHERE run_id = ? AND community_size >= ? "
+                "ORDER BY community, units DESC", (run_id, min_size)):
+            groups.setdefault(r["community"], {"community": r["community"], "size": r["community_size"], "agents": []})
+            groups[r["community"]]["agents"].append(r["agent"])
+        return list(groups.values())
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="중개업소 공동 등록 네트워크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="로컬 미러로 네트워크 계산 후 저장")
+    p_build.add_argument("--days", type=int, default=30, help="최근 N일 (--from 이 없을 때)")
+    p_build.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    p_build.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    p_build.add_argument("--sync", action="store_true", help="계산 전에 미러 동기화")
+
+    p_top = sub.add_parser("top", help="업소의 상위 공동 등록 상대")
+    p_top.add_argument("agent")
+
+    p_comm = sub.add_parser("communities", help="커뮤니티 목록")
+    p_comm.add_argument("--min-size", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    network = AgentNetwork()
+    try:
+        if args.command == "build":
+            from local_mirror import LocalMirror
+
+            mirror = LocalMirror()
+            try:
+                if args.sync:
+                    mirror.sync()
+                date_from = args.date_from or (datetime.now(KST) - timedelta(days=args.days)).strftime("%Y-%m-%d")
+                network.build(mirror, date_from, args.date_to)
+            finally:
+                mirror.close()
+
+        elif args.command == "top":
+            rows = network.edges(args.agent)
+            if not rows:
+                print("⚠️ 간선이 없습니다.")
+            for r in rows:
+                print(f"{r['peer']}\t공동 {r['shared_units']}\t가중치 {r['weight']:.3f}")
+
+        elif args.command == "communities":
+            for c in network.communities(args.min_size):
+                print(f"#{c['community']} ({c['size']}곳): " + ", ".join(c["agents"]))
+    finally:
+        network.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,546 @@
+import os
+import sys
+import json
+import time
+import gzip
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from config import COMPLEX_NO
+from change_events import normalize_price, price_to_manwon
+from dimensions import NAMED_LOGS
+from snapshot_index import UNOBSERVED_STATUSES, for_complex, history_key, lookup_status, snapshot_order
+
+# ==================================================================
+# [API] 대시보드용 읽기 전용 캐시 서비스 (asyncio, 표준 라이브러리만 사용)
+# ==================================================================
+# 방문자마다 Supabase 에 같은 무거운 쿼리를 날리는 대신, 로컬 미러(local_mirror.py)에서
+# 미리 계산한 뷰를 돌려줍니다.
+#   GET /api/meta        최초/최근 수집 시각 (fetchCrawlMetadata)
+#   GET /api/latest      최근 스냅샷 매물          ?trade_type=
+#   GET /api/logs        기간 내 원본 로그 (fetchAllData) ?from=&to=&trade_type=
+#   GET /api/series      스냅샷별 중개업소/동 매물 수 ?from=&to=&trade_type=&start_hour=&end_hour=
+#   GET /api/lifecycle   매물별 생애주기 요약 (ListingLifecycleAnalysis) ?from=&to=&trade_type=&hide_failed=
+#   GET /api/search      매물번호/동/중개업소 검색 (search_index.py) ?q=&limit=
+#   GET /api/lifecycle/current  저장된 매물별 생애주기 상태 (lifecycle_state.py) ?trade_type=
+# 결과는 LRU + TTL 캐시에 두고, 새 크롤링이 미러에 들어오면(최대 id 변경) 전부 비웁니다.
+# 응답마다 ETag 를 붙여 If-None-Match 가 같으면 본문 없이 304 를 돌려줍니다.
+DEFAULT_TTL = int(os.environ.get("API_CACHE_TTL", "300"))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("API_CACHE_MAX_ENTRIES", "256"))
+CORS_ORIGIN = os.environ.get("API_CORS_ORIGIN", "*")
+MAX_HEADER_BYTES = 16 * 1024
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+               404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+
+    def __init__(self, status, message=""):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================================================================
+# [캐시] LRU + TTL
+# ==================================================================
+class ViewCache:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (만료 시각, CachedView)
+        self.inflight = {}            # key -> Future (같은 뷰를 동시에 여러 번 계산하지 않도록)
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, view = entry
+        if time.monotonic() > expires:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return view
+
+    def put(self, key, view):
+        self.entries[key] = (time.monotonic() + self.ttl, view)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class CachedView:
+    """직렬화된 응답 본문 + ETag (gzip 본문은 처음 요청될 때 1번만 압축)"""
+
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, 6)
+        return self._gzipped
+
+
+# ==================================================================
+# [뷰] 미러 DB 조회 + 계산 (DB 전용 스레드 1개에서 실행)
+# ==================================================================
+def _hour(crawl_time):
+    """'14:05' / '14시' -> 14"""
+    text = str(crawl_time or "")
+    head = text.split(":")[0] if ":" in text else text
+    digits = "".join(ch for ch in head if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+def _param(params, name):
+    """필수 쿼리 파라미터 (없으면 400)"""
+    value = params.get(name)
+    if not value:
+        raise HttpError(400, f"missing query parameter: {name}")
+    return value
+
+
+def _int_param(params, name, default, low=None, high=None):
+    """정수 쿼리 파라미터 (형식/범위가 틀리면 400)"""
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{name} must be an integer")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise HttpError(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _range_logs(mirror, date_from, date_to, trade_type):
+    return mirror.query(
+        f"SELECT * FROM {NAMED_LOGS} WHERE crawl_date BETWEEN ? AND ? AND (? IS NULL OR trade_type = ?) ORDER BY id",
+        (date_from, date_to, trade_type, trade_type),
+    )
+
+
+def view_meta(mirror, params):
+    first = mirror.query("SELECT crawl_date, crawl_time FROM real_estate_logs ORDER BY id LIMIT 1")
+    last = mirror.query("SELECT crawl_date, crawl_time FROM real_estate_logs ORDER BY id DESC LIMIT 1")
+    fmt = lambda rows: f"{rows[0]['crawl_date']} {rows[0]['crawl_time']}" if rows else None
+    return {"first_updated": fmt(first), "last_updated": fmt(last)}
+
+
+def view_latest(mirror, params):
+    return mirror.latest_snapshot(params.get("trade_type"))
+
+
+def view_logs(mirror, params):
+    return _range_logs(mirror, _param(params, "from"), _param(params, "to"), params.get("trade_type"))
+
+
+def view_series(mirror, params):
+    start_hour = _int_param(params, "start_hour", 0, 0, 23)
+    end_hour = _int_param(params, "end_hour", 23, 0, 23)
+    snapshots, order = OrderedDict(), {}
+    for log in _range_logs(mirror, _param(params, "from"), _param(params, "to"), params.get("trade_type")):
+        if not start_hour <= _hour(log["crawl_time"]) <= end_hour:
+            continue
+        key = (log["crawl_date"], log["crawl_time"])
+        snap = snapshots.setdefault(key, {"crawl_date": key[0], "crawl_time": key[1], "total": 0, "agents": {}, "dongs": {}})
+        order.setdefault(key, snapshot_order(log))
+        agent = log.get("agent") or "알수없음"
+        dong = log.get("dong") or "알수없음"
+        snap["total"] += 1
+        snap["agents"][agent] = snap["agents"].get(agent, 0) + 1
+        snap["dongs"][dong] = snap["dongs"].get(dong, 0) + 1
+    return [snapshots[key] for key in sorted(snapshots, key=order.get)]
+
+
+def _group_timeline(timeline):
+    """같은 상태(+수집 시 같은 가격)가 이어지는 구간을 묶음 (최신 -> 과거)"""
+    grouped = []
+    for item in timeline:
+        prev = grouped[-1] if grouped else None
+        if prev and prev["status"] == item["status"] and (
+                item["status"] != "collected" or normalize_price(prev.get("price")) == normalize_price(item.get("price"))):
+            prev["count"] += 1
+            prev["range_start_date"] = item["date"]
+            prev["range_start_time"] = item["time"]
+        else:
+            grouped.append(dict(item, count=1))
+    return grouped
+
+
+def view_lifecycle(mirror, params):
+    """ListingLifecycleAnalysis.tsx 의 analyzedData 와 같은 규칙"""
+    hide_failed = params.get("hide_failed") in ("1", "true")
+    date_from, date_to = _param(params, "from"), _param(params, "to")
+    logs = _range_logs(mirror, date_from, date_to, params.get("trade_type"))
+    history = mirror.snapshots(date_from, date_to)  # 최신 -> 과거
+    # 문자열 키('HH시' / 'HH:MM')가 아니라 이력의 정수 snapshot_id 순서로 정렬
+    order = {}
+    for h in history:
+        order.setdefault((h["crawl_date"], h["crawl_time"]), snapshot_order(h))
+    snapshot_keys = sorted(order, key=order.get, reverse=True)
+    # 단지별 스냅샷/상태 (이 단지 이력이 없는 스냅샷은 빠짐, 같은 스냅샷/거래방식에 여러 건이면 마지막 기록 기준)
+    history = sorted(history, key=lambda h: h["id"])
+    streams = {}
+
+    def stream(complex_no):
+        if complex_no not in streams:
+            mine = for_complex(history, complex_no)
+            crawled = {(h["crawl_date"], h["crawl_time"]) for h in mine}
+            streams[complex_no] = (crawled, {history_key(h): h["status"] for h in mine})
+        return streams[complex_no]
+
+    groups = {}
+    for log in logs:
+        if log.get("article_no") and log["article_no"] != "-":
+            groups.setdefault(log["article_no"], []).append(log)
+
+    result, last_order = [], {}
+    for article_no, items in groups.items():
+        items.sort(key=snapshot_order)
+        first, last = items[0], items[-1]
+        trade_type = last.get("trade_type")
+        by_snapshot = {(i["crawl_date"], i["crawl_time"]): i for i in items}
+        crawled, status_map = stream(last.get("complex_no") or COMPLEX_NO)
+        keys = [k for k in snapshot_keys if k in crawled or k in by_snapshot]
+
+        prices = {normalize_price(i.get("price")) for i in items}
+        owners = {bool(i.get("is_owner")) for i in items}
+        dates = {i.get("confirm_date") or "" for i in items}
+        changes = {"price": len(prices) > 1, "owner": len(owners) > 1, "date": len(dates) > 1}
+
+        initial, current = price_to_manwon(first.get("price")), price_to_manwon(last.get("price"))
+        if current > initial:
+            direction = "up"
+        elif current < initial:
+            direction = "down"
+        else:
+            direction = "fluctuated" if changes["price"] else "same"
+
+        timeline = []
+        for date, time_str in keys:
+            log = by_snapshot.get((date, time_str))
+            if log:
+                timeline.append({"date": date, "time": time_str, "status": "collected", "price": log.get("price"),
+                                 "agent": log.get("agent"), "dong": log.get("dong")})
+            else:
+                # 이 매물 거래방식의 이력 기준 (다른 거래방식만 기록된 스냅샷은 수집하지 않은 것으로 봄)
+                crawl_status = lookup_status(status_map, date, time_str, trade_type, unrecorded="FAIL")
+                timeline.append({"date": date, "time": time_str,
+                                 "status": "failed" if crawl_status in UNOBSERVED_STATUSES else "missing"})
+
+        # 최초 수집 이전 구간 제거
+        collected_idx = [i for i, t in enumerate(timeline) if t["status"] == "collected"]
+        timeline = timeline[:collected_idx[-1] + 1] if collected_idx else []
+
+        # 재등록: 최신 -> 과거 순으로 수집 -> 누락 -> 수집 (화면 로직과 동일, 실패 스냅샷은 건너뜀)
+        is_relisted, stage = False, 0
+        for t in timeline:
+            if t["status"] == "failed":
+                continue
+            if stage == 0:
+                if t["status"] == "collected":
+                    stage = 1
+                else:
+                    break
+            elif stage == 1 and t["status"] == "missing":
+                stage = 2
+            elif stage == 2 and t["status"] == "collected":
+                is_relisted = True
+                break
+
+        status = "active"
+        if timeline:
+            if timeline[0]["status"] == "missing":
+                status = "deleted"
+            elif timeline[0]["status"] == "collected" and len(items) == 1 and len(keys) > 1:
+                status = "new"
+
+        shown = [t for t in timeline if t["status"] != "failed"] if hide_failed else timeline
+        last_order[article_no] = snapshot_order(last)
+        result.append({
+            "article_no": article_no, "dong": last.get("dong"), "spec": last.get("spec"), "agent": last.get("agent"),
+            "trade_type": trade_type or "매매",
+            "current_price": last.get("price"), "initial_price": first.get("price"),
+            "is_owner": bool(last.get("is_owner")), "verification_date": last.get("confirm_date") or None,
+            "has_history_change": any(changes.values()), "changes": changes,
+            "is_relisted": is_relisted, "price_direction": direction,
+            "first_seen": f"{first['crawl_date']} {first['crawl_time']}",
+            "last_seen": f"{last['crawl_date']} {last['crawl_time']}",
+            "status": status, "display_timeline": _group_timeline(shown),
+            "provider": last.get("provider") or "알수없음",
+        })
+
+    result.sort(key=lambda r: last_order[r["article_no"]], reverse=True)
+    return result
+
+
+_search_index = None
+
+
+def view_search(mirror, params):
+    """미러와 같은 DB 스레드에서만 호출되므로 색인 연결도 하나만 둠"""
+    global _search_index
+    query, limit = _param(params, "q"), _int_param(params, "limit", 50)
+    if _search_index is None:
+        from search_index import SearchIndex
+        _search_index = SearchIndex()
+        _search_index.sync_from_mirror(mirror)
+    return _search_index.search(query, limit)
+
+
+_lifecycle_state = None
+
+
+def view_lifecycle_current(mirror, params):
+    """이력을 다시 훑지 않고 크롤링마다 갱신된 상태를 그대로 반환"""
+    global _lifecycle_state
+    if _lifecycle_state is None:
+        from lifecycle_state import LifecycleState
+        _lifecycle_state = LifecycleState()
+        _lifecycle_state.sync_from_mirror(mirror)
+    return _lifecycle_state.listings(trade_type=params.get("trade_type"))
+
+
+ROUTES = {
+    "/api/meta": (view_meta, ()),
+    "/api/latest": (view_latest, ()),
+    "/api/logs": (view_logs, ("from", "to")),
+    "/api/series": (view_series, ("from", "to")),
+    "/api/lifecycle": (view_lifecycle, ("from", "to")),
+    "/api/search": (view_search, ("q",)),
+    "/api/lifecycle/current": (view_lifecycle_current, ()),
+}
+
+
+# ==================================================================
+# [서버]
+# ==================================================================
+class ApiServer:
+
+    def __init__(self, cache=None, poll_interval=60, sync=False, mirror_path=None):
+        self.cache = cache or ViewCache()
+        self.poll_interval = poll_interval
+        self.sync = sync
+        self.mirror_path = mirror_path
+        self.generation = None
+        # sqlite 연결은 만든 스레드에서만 쓸 수 있으므로 DB 작업은 전용 스레드 1개로 처리
+        self.db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mirror")
+        self._mirror = None
+
+    def _mirror_call(self, fn, *args):
+        if self._mirror is None:
+            from local_mirror import LocalMirror
+            self._mirror = LocalMirror(self.mirror_path)
+        return fn(self._mirror, *args)
+
+    async def run_db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.db, self._mirror_call, fn, *args)
+
+    # --------------------------------------------------------------
+    # 새 크롤링 감지 -> 캐시 무효화
+    # --------------------------------------------------------------
+    @staticmethod
+    def _check_generation(mirror, sync):
+        if sync:
+            mirror.sync()
+        if _search_index is not None:
+            _search_index.sync_from_mirror(mirror)
+        if _lifecycle_state is not None:
+            _lifecycle_state.sync_from_mirror(mirror)
+        return (mirror.cursor("real_estate_logs"), mirror.cursor("crawl_history"))
+
+    async def refresh(self):
+        generation = await self.run_db(self._check_generation, self.sync)
+        if generation != self.generation:
+            if self.generation is not None:
+                print(f"🧹 [API] 새 크롤링 감지 (id {self.generation} -> {generation}), 캐시 {len(self.cache.entries)}개 비움")
+            self.cache.clear()
+            self.generation = generation
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ [API] 갱신 확인 실패: {e}")
+
+    # --------------------------------------------------------------
+    # 뷰 조회 (캐시 -> 동일 요청 합치기 -> 계산)
+    # --------------------------------------------------------------
+    async def view(self, path, params):
+        if path not in ROUTES:
+            raise HttpError(404, f"unknown path: {path}")
+        fn, required = ROUTES[path]
+        missing = [p for p in required if not params.get(p)]
+        if missing:
+            raise HttpError(400, f"missing query parameter: {', '.join(missing)}")
+
+        key = (path, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.hits += 1
+            return cached
+
+        pending = self.cache.inflight.get(key)
+        if pending is not None:
+            self.cache.hits += 1
+            return await asyncio.shield(pending)
+
+        self.cache.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.cache.inflight[key] = future
+        generation = self.generation
+        try:
+            payload = await self.run_db(fn, params)
+            view = CachedView(payload)
+            if generation == self.generation:  # 계산 중 무효화됐으면 캐시에 넣지 않음
+                self.cache.put(key, view)
+            future.set_result(view)
+            return view
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 요청이 없어도 경고가 남지 않도록
+            raise
+        finally:
+            self.cache.inflight.pop(key, None)
+
+    # --------------------------------------------------------------
+    # HTTP 처리 (GET / HEAD / OPTIONS, keep-alive)
+    # --------------------------------------------------------------
+    @staticmethod
+    async def _read_request(reader):
+        raw = await reader.readuntil(b"\r\n\r\n")
+        if len(raw) > MAX_HEADER_BYTES:
+            raise HttpError(400, "header too large")
+        lines = raw.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method, target, version, headers
+
+    @staticmethod
+    def _write(writer, status, headers, body=b""):
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        headers = dict({"Access-Control-Allow-Origin": CORS_ORIGIN, "Content-Length": str(len(body))}, **headers)
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    method, target, version, headers = await self._read_request(reader)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                conn_header = {"Connection": "keep-alive" if keep_alive else "close"}
+
+                if method == "OPTIONS":
+                    self._write(writer, 204, dict(conn_header, **{
+                        "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
+                        "Access-Control-Allow-Headers": "If-None-Match",
+                        "Access-Control-Max-Age": "86400"}))
+                elif method not in ("GET", "HEAD"):
+                    self._write(writer, 405, dict(conn_header, Allow="GET, HEAD, OPTIONS"))
+                else:
+                    await self._serve(writer, method, target, headers, conn_header)
+
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _serve(self, writer, method, target, headers, conn_header):
+        parts = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        started = time.perf_counter()
+        try:
+            if parts.path == "/health":
+                view = CachedView({"generation": self.generation, "cache_entries": len(self.cache.entries),
+                                   "hits": self.cache.hits, "misses": self.cache.misses})
+            else:
+                view = await self.view(parts.path, params)
+        except HttpError as e:
+            body = json.dumps({"error": str(e)}).encode("utf-8")
+            self._write(writer, e.status, dict(conn_header, **{"Content-Type": "application/json"}), body)
+            return
+        except Exception as e:
+            print(f"❌ [API] {parts.path} 처리 실패: {e}")
+            body = json.dumps({"error": "internal error"}).encode("utf-8")
+            self._write(writer, 500, dict(conn_header, **{"Content-Type": "application/json"}), body)
+            return
+
+        common = dict(conn_header, **{
+            "ETag": view.etag,
+            "Cache-Control": f"public, max-age={self.cache.ttl}",
+            "Vary": "Accept-Encoding",
+            "Access-Control-Expose-Headers": "ETag",
+        })
+        if view.etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            self._write(writer, 304, common)
+            return
+
+        body = view.body
+        if "gzip" in headers.get("accept-encoding", ""):
+            body = view.gzipped
+            common["Content-Encoding"] = "gzip"
+        common["Content-Type"] = "application/json; charset=utf-8"
+        if method == "HEAD":
+            common["Content-Length"] = str(len(body))
+            body = b""
+        self._write(writer, 200, common, body)
+        print(f"   [API] {parts.path} {len(view.body) // 1024}KB ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+    async def serve(self, host, port):
+        await self.refresh()
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🌐 [API] http://{host}:{port} (TTL {self.cache.ttl}초, 최대 {self.cache.max_entries}개, 갱신 확인 {self.poll_interval}초)")
+        watcher = asyncio.ensure_future(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            self.db.shutdown(wait=False)
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드용 캐시 API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=int, default=DEFAULT_TTL, help="캐시 유지 시간(초)")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument("--poll", type=int, default=60, help="새 크롤링 확인 주기(초)")
+    parser.add_argument("--sync", action="store_true", help="확인할 때마다 Supabase -> 미러 증분 동기화")
+    args = parser.parse_args(argv)
+
+    server = ApiServer(ViewCache(args.max_entries, args.ttl), args.poll, args.sync)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 API 서버 종료")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+from config import KST, data_path
+
+# ==================================================================
+# [이벤트] 크롤링 1회마다 직전 스냅샷과 비교해 변경 이벤트 생성
+# ==================================================================
+# 같은 (단지, 거래방식)의 직전 스냅샷을 article_no 로 해시 조인해
+#   NEW           : 처음 보는 매물
+#   PRICE_CHANGED : 직전 스냅샷과 가격이 다름
+#   REMOVED       : 직전 스냅샷에 있었는데 이번에 없음
+#   RELISTED      : 예전에 본 적 있지만 직전 스냅샷에는 없다가 다시 나타남
+# 이벤트는 로컬 JSONL 로그에 먼저 기록(fsync)한 뒤, 추가 싱크(웹훅 등)로 전달합니다.
+STATE_FILE = "change_state.db"
+LOG_FILE = "change_events.jsonl"
+EVENT_TYPES = ("NEW", "PRICE_CHANGED", "REMOVED", "RELISTED")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS last_snapshot (
+    complex_no TEXT, trade_type TEXT, article_no TEXT, price TEXT, agent TEXT, dong TEXT,
+    PRIMARY KEY (complex_no, trade_type, article_no)
+);
+CREATE TABLE IF NOT EXISTS seen_articles (
+    complex_no TEXT, trade_type TEXT, article_no TEXT, first_seen TEXT,
+    PRIMARY KEY (complex_no, trade_type, article_no)
+);
+CREATE TABLE IF NOT EXISTS snapshot_marks (
+    complex_no TEXT, trade_type TEXT, crawl_date TEXT, crawl_time TEXT,
+    PRIMARY KEY (complex_no, trade_type)
+);
+"""
+
+
+def normalize_price(price):
+    """'12억 5,000' / '12억5000' 비교용 정규화 (대시보드 normalizePrice 와 동일)"""
+    return str(price or "").replace(" ", "").replace(",", "").strip()
+
+
+def price_to_manwon(price):
+    """'12억 5,000' -> 125000 (만원 단위, 대시보드 parsePriceToNumber 와 동일)"""
+    clean = normalize_price(price)
+    if "억" in clean:
+        uk, _, rest = clean.partition("억")
+        return _digits(uk) * 10000 + _digits(rest)
+    return _digits(clean)
+
+
+def _digits(text):
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+# ==================================================================
+# [싱크] 이벤트 전달 대상
+# ==================================================================
+class JsonlSink:
+    """로컬 append-only 로그 (한 줄 = 이벤트 1건)"""
+
+    def __init__(self, path=None):
+        self.path = path or data_path(LOG_FILE)
+
+    def emit(self, events):
+        if not events:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class WebhookSink:
+    """이벤트 묶음을 JSON 으로 POST (실패해도 크롤링은 계속)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, events):
+        if not events:
+            return
+        from urllib.request import Request, urlopen
+
+        body = json.dumps({"events": events}, ensure_ascii=False).encode("utf-8")
+        req = Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            urlopen(req, timeout=self.timeout).close()
+        except Exception as e:
+            print(f"   ⚠️ [Event] 웹훅 전송 실패: {e}")
+
+
+def default_sinks():
+    """로컬 로그 + (CHANGE_EVENT_WEBHOOK 설정 시) 웹훅"""
+    sinks = [JsonlSink()]
+    webhook = os.environ.get("CHANGE_EVENT_WEBHOOK")
+    if webhook:
+        sinks.append(WebhookSink(webhook))
+    return sinks
+
+
+# ==================================================================
+# [비교] 스냅샷 diff
+# ==================================================================
+class ChangeDetector:
+
+    def __init__(self, sinks=None, path=None):
+        self.conn = sqlite3.connect(path or data_path(STATE_FILE))
+        self.conn.executescript(SCHEMA)
+        self.sinks = default_sinks() if sinks is None else sinks
+
+    def close(self):
+        self.conn.close()
+
+    def process_snapshot(self, complex_no, trade_type, rows, crawl_date, crawl_time, complete=True):
+        """
+        rows: 이번 스냅샷 매물 (article_no / price / agent / dong 키를 가진 dict)
+        complete=False 면 빠진 매물을 삭제로 보지 않음 (REMOVED 미발행, 직전 상태 유지)
+        """
+        complex_no = str(complex_no)
+        key = (complex_no, trade_type)
+
+        # 직전 스냅샷 (해시 테이블)
+        prev = {
+            r[0]: (r[1], r[2], r[3])
+            for r in self.conn.execute(
+                "SELECT article_no, price, agent, dong FROM last_snapshot WHERE complex_no = ? AND trade_type = ?", key)
+        }
+        has_prev = self.conn.execute(
+            "SELECT 1 FROM snapshot_marks WHERE complex_no = ? AND trade_type = ?", key).fetchone() is not None
+
+        current = {}
+        for row in rows:
+            article_no = row.get("article_no")
+            if article_no and article_no != "-":
+                current[article_no] = row
+
+        seen = set()
+        if current:
+            for (article_no,) in self.conn.execute(
+                    "SELECT article_no FROM seen_articles WHERE complex_no = ? AND trade_type = ?", key):
+                if article_no in current:
+                    seen.add(article_no)
+
+        ts = datetime.now(KST).isoformat(timespec="seconds")
+        base = {"complex_no": complex_no, "trade_type": trade_type, "crawl_date": crawl_date, "crawl_time": crawl_time, "ts": ts}
+        events = []
+
+        for article_no, row in current.items():
+            price = row.get("price") or ""
+            if article_no in prev:
+                prev_price = prev[article_no][0]
+                if normalize_price(prev_price) != normalize_price(price):
+                    events.append(dict(base, type="PRICE_CHANGED", article_no=article_no, price=price, prev_price=prev_price,
+                                       agent=row.get("agent"), dong=row.get("dong")))
+            elif has_prev:
+                event_type = "RELISTED" if article_no in seen else "NEW"
+                events.append(dict(base, type=event_type, article_no=article_no, price=price,
+                                   agent=row.get("agent"), dong=row.get("dong")))
+
+        if complete:
+            for article_no, (price, agent, dong) in prev.items():
+                if article_no not in current:
+                    events.append(dict(base, type="REMOVED", article_no=article_no, price=price, agent=agent, dong=dong))
+
+        # 상태 갱신: 이벤트 로그를 먼저 남기고 스냅샷 교체
+        for sink in self.sinks:
+            sink.emit(events)
+
+        with self.conn:
+            if complete:
+                self.conn.execute("DELETE FROM last_snapshot WHERE complex_no = ? AND trade_type = ?", key)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO last_snapshot VALUES (?, ?, ?, ?, ?, ?)",
+                [(complex_no, trade_type, a, r.get("price") or "", r.get("agent"), r.get("dong")) for a, r in current.items()],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen_articles VALUES (?, ?, ?, ?)",
+                [(complex_no, trade_type, a, f"{crawl_date} {crawl_time}") for a in current],
+            )
+            self.conn.execute("INSERT OR REPLACE INTO snapshot_marks VALUES (?, ?, ?, ?)", key + (crawl_date, crawl_time))
+
+        counts = {t: sum(1 for e in events if e["type"] == t) for t in EVENT_TYPES}
+        if has_prev:
+            print(f"📣 [Event] {complex_no}/{trade_type}: " + ", ".join(f"{t} {n}" for t, n in counts.items()))
+        else:
+            print(f"📣 [Event] {complex_no}/{trade_type}: 첫 스냅샷 기록 ({len(current)}건, 이벤트 없음)")
+        return events
+
+
+def emit_changes(complex_no, trade_type, rows, crawl_date, crawl_time, complete=True):
+    """크롤러에서 호출하는 단축 함수 (이벤트 처리 실패가 저장을 막지 않도록 예외 흡수)"""
+    try:
+        detector = ChangeDetector()
+        try:
+            return detector.process_snapshot(complex_no, trade_type, rows, crawl_date, crawl_time, complete)
+        finally:
+            detector.close()
+    except Exception as e:
+        print(f"❌ [Event] 변경 이벤트 처리 실패: {e}")
+        return []
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="변경 이벤트 로그 조회")
+    parser.add_argument("--type", choices=EVENT_TYPES)
+    parser.add_argument("--tail", type=int, default=50, help="마지막 N건")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(data_path(LOG_FILE), encoding="utf-8") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        events = []
+
+    if args.type:
+        events = [e for e in events if e["type"] == args.type]
+    for e in events[-args.tail:]:
+        prev = f" (이전 {e['prev_price']})" if e.get("prev_price") else ""
+        print(f"{e['crawl_date']} {e['crawl_time']}\t{e['type']}\t{e['complex_no']}/{e['trade_type']}\t{e['article_no']}\t{e.get('price')}{prev}\t{e.get('agent')}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
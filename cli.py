@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import argparse
+import importlib
+
+from config import DATA_DIR, load_local_env
+
+# ==================================================================
+# [CLI] 단일 진입점: python cli.py <명령> [명령별 인자...]
+# ==================================================================
+# 명령 -> 모듈 이름만 들고 있다가 실행할 모듈 하나만 import 합니다.
+# 브라우저/DB 라이브러리(selenium, undetected_chromedriver, pandas, supabase)는
+# 크롤링 명령에서만 로드되므로 분석/조회 명령은 바로 시작합니다.
+# 명령별 인자는 그대로 각 모듈의 main(argv) 로 넘깁니다. (예: python cli.py price --help)
+COMMANDS = {
+    # 크롤링 (브라우저)
+    "crawl": ("crawler", "크롤링", "API 응답 기반 매매/전세 크롤링 (로컬 실행)"),
+    "crawl-sale": ("crawler_sale", "크롤링", "화면 기반 매매 크롤링 (GitHub Actions)"),
+    "crawl-jeonse": ("crawler_jeonse", "크롤링", "화면 기반 전세 크롤링 (GitHub Actions)"),
+    "crawl-parallel": ("parallel_crawler", "크롤링", "멀티 프로세스 다단지 크롤링"),
+    "crawl-legacy": ("fake_listing_detector", "크롤링", "초기 단일 스크립트 크롤러"),
+    # 분석 / 조회
+    "changes": ("change_events", "분석", "변경 이벤트 로그 조회"),
+    "price": ("price_sketch", "분석", "평형별 가격 분위수 조회"),
+    "lifecycle": ("lifecycle_state", "분석", "매물 생애주기 상태"),
+    "network": ("agent_network", "분석", "중개업소 공동 등록 네트워크"),
+    "dups": ("near_duplicates", "분석", "매물 설명 중복 문구 그룹"),
+    "index": ("snapshot_index", "분석", "스냅샷 비트맵 인덱스"),
+    "search": ("search_index", "분석", "매물번호/동/중개업소 검색 색인"),
+    "schedule": ("adaptive_scheduler", "분석", "단지별 적응형 크롤링 주기"),
+    "catalog": ("complex_catalog", "분석", "지역 단위 단지 카탈로그"),
+    "payloads": ("payload_store", "분석", "articleList 원본 아이템 저장소"),
+    "reparse": ("reparse", "분석", "보관된 원본 HTML 재파싱"),
+    "trace": ("driver_trace", "분석", "WebDriver 추적 결과 요약"),
+    "dims": ("dimensions", "분석", "차원 테이블 조회"),
+    "snapshots": ("snapshot_registry", "분석", "스냅샷 레지스트리"),
+    "mirror": ("local_mirror", "분석", "로컬 분석용 미러 DB"),
+    # 내보내기 / 서버
+    "export": ("export_logs", "내보내기", "real_estate_logs 스트리밍 내보내기"),
+    "serve": ("api_server", "서버", "대시보드용 캐시 API 서버"),
+    "sim": ("sim_server", "서버", "부하 테스트용 로컬 매물 사이트"),
+}
+STATUS_RECENT = 5
+
+
+def _usage():
+    lines, group = [], None
+    for name, (_, category, help_text) in COMMANDS.items():
+        if category != group:
+            group = category
+            lines.append(f"\n{category}:")
+        lines.append(f"  {name:<16}{help_text}")
+    lines.append("\n상태:")
+    lines.append(f"  {'status':<16}로컬 데이터 파일 / DB 설정 / 최근 크롤링 이력")
+    return "\n".join(lines)
+
+
+# ==================================================================
+# [상태] 로컬 파일만 읽음 (네트워크/무거운 라이브러리 없음)
+# ==================================================================
+def show_status():
+    from db_client import supabase_settings
+
+    url, key = supabase_settings()
+    print(f"📂 데이터 폴더: {DATA_DIR}")
+    print(f"🔑 Supabase: {'설정됨 (' + url[:20] + '...)' if url and key else '설정 없음'}")
+    deadline = os.environ.get("CRAWL_DEADLINE")
+    if deadline:
+        print(f"⏳ CRAWL_DEADLINE: {deadline}")
+
+    if not os.path.isdir(DATA_DIR):
+        print("⚠️ 로컬 데이터가 없습니다.")
+        return
+    print("\n파일:")
+    for name in sorted(os.listdir(DATA_DIR)):
+        path = os.path.join(DATA_DIR, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(stat.st_mtime))
+            print(f"  {name:<28}{stat.st_size / 1024:>10.1f} KB  {updated}")
+        else:
+            print(f"  {name + '/':<28}{'-':>13}")
+
+    mirror_file = os.path.join(DATA_DIR, "mirror.db")
+    if os.path.exists(mirror_file):
+        from local_mirror import LocalMirror
+
+        mirror = LocalMirror(mirror_file)
+        try:
+            history = mirror.snapshots()  # 최신 -> 과거 (snapshot_id 순)
+        except Exception as e:
+            history = []
+            print(f"⚠️ 미러 조회 실패: {e}")
+        finally:
+            mirror.close()
+        if history:
+            print(f"\n최근 크롤링 (미러 기준, 총 {len(history)}회):")
+            for h in history[:STATUS_RECENT]:
+                print(f"  {h['crawl_date']} {h['crawl_time']:<6} {h.get('trade_type') or '전체':<4} {h['status']:<8} "
+                      f"{h['collected_count'] or 0}건")
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="허위 매물 탐지 도구 모음",
+        epilog=_usage(), formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(COMMANDS) + ["status"], metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="명령별 인자 (<명령> --help 참고)")
+    args = parser.parse_args(argv)
+
+    # 로컬 실행이면 .env.local 의 Supabase 설정 사용 (이미 있는 환경변수는 덮어쓰지 않음)
+    load_local_env()
+    if args.command == "status":
+        show_status()
+        return
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    module.main(args.args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,155 @@
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+# ==================================================================
+# [검증] 수집 완전성 확인 + 빠진 페이지만 재요청
+# ==================================================================
+# 스크롤 중 받은 articleList 응답을 페이지 번호별로 기록해 두었다가,
+#   1) 중간에 빠진 페이지 / 마지막 페이지의 isMoreData=true (뒤가 더 있음)
+#   2) 단지 상세 API 의 거래방식별 매물 수(dealCount/leaseCount)보다 적게 받음
+# 인 경우 해당 페이지만 같은 URL(page 값만 변경)로 다시 요청합니다.
+TRADE_TYPE_CODES = {"매매": "A1", "전세": "B1", "월세": "B2"}
+COUNT_FIELDS = {"매매": "dealCount", "전세": "leaseCount", "월세": "rentCount"}
+MAX_REFETCH_PAGES = 30
+
+
+class PageTracker:
+    """거래방식 1개에 대한 articleList 페이지 수신 기록"""
+
+    def __init__(self, trade_type):
+        self.trade_code = TRADE_TYPE_CODES.get(trade_type)
+        self.sequences = {}  # 쿼리(page 제외) -> {page: (isMoreData, 원본 건수)}
+        self.templates = {}  # 쿼리(page 제외) -> 대표 URL
+
+    @staticmethod
+    def _split(url):
+        parsed = urlparse(url)
+        qs = parse_qs(parsed.query)
+        try:
+            page = int(qs.pop("page", ["1"])[0])
+        except ValueError:
+            page = 1
+        key = (parsed.path, tuple(sorted((k, tuple(v)) for k, v in qs.items())))
+        return key, page, qs
+
+    def record(self, url, data):
+        """응답 1건 기록. 다른 거래방식 필터(예: 필터 적용 전 전체 목록) 응답은 무시"""
+        key, page, qs = self._split(url)
+        if self.trade_code and qs.get("tradeType", [""])[0] != self.trade_code:
+            return False
+        self.sequences.setdefault(key, {})[page] = (bool(data.get("isMoreData")), len(data.get("articleList") or []))
+        self.templates.setdefault(key, url)
+        return True
+
+    def _main_key(self):
+        if not self.sequences:
+            return None
+        return max(self.sequences, key=lambda k: len(self.sequences[k]))
+
+    @property
+    def pages(self):
+        key = self._main_key()
+        return self.sequences.get(key, {}) if key else {}
+
+    @property
+    def raw_count(self):
+        return sum(count for _, count in self.pages.values())
+
+    def missing_pages(self):
+        pages = self.pages
+        if not pages:
+            return []
+        last = max(pages)
+        missing = [p for p in range(1, last) if p not in pages]
+        if pages[last][0]:
+            missing.append(last + 1)
+        return missing
+
+    def page_url(self, page):
+        key = self._main_key()
+        parsed = urlparse(self.templates[key])
+        qs = parse_qs(parsed.query)
+        qs["page"] = [str(page)]
+        return urlunparse(parsed._replace(query=urlencode(qs, doseq=True)))
+
+
+def expected_count(driver, complex_no, trade_type):
+    """단지 상세 API 의 거래방식별 매물 수 (조회 실패 시 None)"""
+    from land_api import fetch_json
+
+    try:
+        detail = fetch_json(driver, f"/api/complexes/{complex_no}", {"sameAddressGroup": "false"}).get("complexDetail") or {}
+        value = detail.get(COUNT_FIELDS.get(trade_type, ""))
+        return int(value) if value is not None else None
+    except Exception as e:
+        print(f"   ⚠️ 기대 매물 수 조회 실패: {e}")
+        return None
+
+
+def verify_and_refill(driver, complex_no, trade_type, tracker, collected, accept, decode=None):
+    """
+    빠진 페이지만 재요청해 collected(article_no -> item)를 채우고 결과 리포트 반환
+    accept: 수집 대상 매물인지 판단하는 함수 (스크롤 수집과 동일한 필터)
+    decode: 저장 전에 아이템을 변환하는 함수 (None 을 반환하면 제외)
+    """
+    from land_api import fetch_url
+
+    expected = expected_count(driver, complex_no, trade_type)
+    refetched = []
+
+    while len(refetched) < MAX_REFETCH_PAGES:
+        missing = tracker.missing_pages()
+        # 페이지 연결은 끝났는데 기대 건수보다 적으면 다음 페이지를 한 번 더 확인
+        if not missing and tracker.pages and expected is not None and tracker.raw_count < expected:
+            probe = max(tracker.pages) + 1
+            if probe not in refetched:
+                missing = [probe]
+        if not missing:
+            break
+
+        page = missing[0]
+        if page in refetched:
+            break  # 같은 페이지를 다시 받아도 채워지지 않음
+        refetched.append(page)
+
+        url = tracker.page_url(page)
+        try:
+            data = fetch_url(driver, url)
+        except Exception as e:
+            print(f"   ⚠️ [{trade_type}] {page}페이지 재요청 실패: {e}")
+            break
+
+        tracker.record(url, data)
+        articles = data.get("articleList") or []
+        for item in articles:
+            if accept(item) and item.get("articleNo"):
+                value = decode(item) if decode else item
+                if value is not None:
+                    collected[item["articleNo"]] = value
+        if not articles:
+            break  # 빈 페이지 = 더 받을 것이 없음
+
+    remaining = tracker.missing_pages()
+    report = {
+        "trade_type": trade_type,
+        "collected": len(collected),
+        "raw_count": tracker.raw_count,
+        "expected": expected,
+        "pages": len(tracker.pages),
+        "refetched_pages": refetched,
+        "complete": bool(tracker.pages) and not remaining and (expected is None or tracker.raw_count >= expected),
+    }
+
+    mark = "✅" if report["complete"] else "⚠️"
+    print(f"   {mark} [{trade_type}] 완전성: 응답 {report['raw_count']}건 / 기대 {expected if expected is not None else '?'}건, "
+          f"페이지 {report['pages']}개 (재요청 {len(refetched)}개)")
+    return report
+
+
+def summarize(reports):
+    """crawl_history 에 함께 기록할 요약 필드"""
+    expected = [r["expected"] for r in reports if r["expected"] is not None]
+    return {
+        "expected_count": sum(expected) if expected else None,
+        "refetched_pages": sum(len(r["refetched_pages"]) for r in reports),
+        "is_complete": all(r["complete"] for r in reports) if reports else False,
+    }
@@ -0,0 +1,255 @@
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+from config import data_path
+
+# ==================================================================
+# [카탈로그] 지역(법정동 코드) 단위 아파트 단지 목록 캐시
+# ==================================================================
+# 지역 -> 하위 지역 -> 단지 목록 -> 단지 상세(세대수/동수/평형) 순으로 조회하며,
+# 이미 받아둔 정보는 TTL 이 지나기 전까지 다시 요청하지 않습니다.
+CATALOG_FILE = "complex_catalog.db"
+REGION_TTL_DAYS = 7     # 지역별 단지 목록 갱신 주기
+DETAIL_TTL_DAYS = 30    # 단지 상세(세대수 등) 갱신 주기
+CORTAR_LEVELS = (2, 5, 8, 10)  # 법정동 코드 단위: 시도 / 시군구 / 읍면동 / 리
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS regions (
+    cortar_no   TEXT PRIMARY KEY,
+    parent_no   TEXT,
+    name        TEXT,
+    cortar_type TEXT,
+    fetched_at  REAL            -- 하위 목록(지역 또는 단지)을 마지막으로 받은 시각
+);
+CREATE TABLE IF NOT EXISTS complexes (
+    complex_no        TEXT PRIMARY KEY,
+    name              TEXT,
+    cortar_no         TEXT,
+    real_estate_type  TEXT,
+    households        INTEGER,
+    dong_count        INTEGER,
+    area_types        TEXT,     -- JSON [{"name": "110E", "supply": 110.5, "exclusive": 84.9}, ...]
+    deal_count        INTEGER,
+    lease_count       INTEGER,
+    use_approve_ymd   TEXT,
+    latitude          REAL,
+    longitude         REAL,
+    first_seen_at     REAL,
+    listed_at         REAL,     -- 단지 목록에서 마지막으로 확인한 시각
+    detail_fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_complexes_cortar ON complexes (cortar_no);
+"""
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ComplexCatalog:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(CATALOG_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.requests = 0
+
+    def close(self):
+        self.conn.close()
+
+    def _call(self, driver, path, params=None):
+        from land_api import fetch_json
+
+        # 호출 간격은 land_api 내부의 공용 속도 제한(rate_limiter.py)이 조절
+        self.requests += 1
+        return fetch_json(driver, path, params)
+
+    @staticmethod
+    def _is_fresh(fetched_at, ttl_days):
+        return fetched_at is not None and time.time() - fetched_at < ttl_days * 86400
+
+    # --------------------------------------------------------------
+    # 조회 (API) + 저장
+    # --------------------------------------------------------------
+    def refresh_region(self, driver, cortar_no, ttl_days=REGION_TTL_DAYS, detail_ttl_days=DETAIL_TTL_DAYS, max_requests=None):
+        """cortar_no 하위의 모든 단지를 카탈로그에 반영 (TTL 이내 항목은 건너뜀)"""
+        pending, visited = [cortar_no], set()
+        while pending:
+            if max_requests is not None and self.requests >= max_requests:
+                print(f"   ⏸️ 요청 한도({max_requests}) 도달 -> 다음 실행에서 이어서 갱신")
+                break
+
+            code = pending.pop()
+            if code in visited:
+                continue
+            visited.add(code)
+            region = self.conn.execute("SELECT * FROM regions WHERE cortar_no = ?", (code,)).fetchone()
+            is_leaf = region is not None and region["cortar_type"] == "sec"
+
+            if region is not None and self._is_fresh(region["fetched_at"], ttl_days):
+                if not is_leaf:
+                    pending.extend(r["cortar_no"] for r in self.conn.execute("SELECT cortar_no FROM regions WHERE parent_no = ?", (code,)))
+                continue
+
+            if not is_leaf:
+                sub_regions = self._call(driver, "/api/regions/list", {"cortarNo": code}).get("regionList") or []
+                # 하위 지역이 없으면 법정동(말단)으로 보고 단지 목록 조회
+                if sub_regions and all(r.get("cortarNo") != code for r in sub_regions):
+                    self._save_regions(code, sub_regions)
+                    pending.extend(r["cortarNo"] for r in sub_regions)
+                    continue
+
+            self._refresh_complex_list(driver, code)
+
+        self._refresh_details(driver, cortar_no, detail_ttl_days, max_requests)
+        self.conn.commit()
+
+    def _save_regions(self, parent_no, sub_regions):
+        now = time.time()
+        self.conn.execute(
+            "INSERT INTO regions (cortar_no, fetched_at) VALUES (?, ?) "
+            "ON CONFLICT(cortar_no) DO UPDATE SET fetched_at = excluded.fetched_at",
+            (parent_no, now),
+        )
+        self.conn.executemany(
+            "INSERT INTO regions (cortar_no, parent_no, name, cortar_type) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(cortar_no) DO UPDATE SET parent_no = excluded.parent_no, name = excluded.name, cortar_type = excluded.cortar_type",
+            [(r["cortarNo"], parent_no, r.get("cortarName"), r.get("cortarType")) for r in sub_regions],
+        )
+
+    def _refresh_complex_list(self, driver, cortar_no):
+        data = self._call(driver, "/api/regions/complexes", {"cortarNo": cortar_no, "realEstateType": "APT", "order": ""})
+        complexes = data.get("complexList") or []
+        now = time.time()
+
+        self.conn.executemany(
+            """
+            INSERT INTO complexes (complex_no, name, cortar_no, real_estate_type, households, deal_count, lease_count,
+                                   use_approve_ymd, latitude, longitude, first_seen_at, listed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(complex_no) DO UPDATE SET
+                name = excluded.name, cortar_no = excluded.cortar_no, households = COALESCE(excluded.households, households),
+                deal_count = excluded.deal_count, lease_count = excluded.lease_count, listed_at = excluded.listed_at
+            """,
+            [(
+                str(c["complexNo"]), c.get("complexName"), cortar_no, c.get("realEstateTypeCode"),
+                _int(c.get("totalHouseholdCount")), _int(c.get("dealCount")), _int(c.get("leaseCount")),
+                c.get("useApproveYmd"), c.get("latitude"), c.get("longitude"), now, now,
+            ) for c in complexes if c.get("complexNo")],
+        )
+        self.conn.execute(
+            "INSERT INTO regions (cortar_no, cortar_type, fetched_at) VALUES (?, 'sec', ?) "
+            "ON CONFLICT(cortar_no) DO UPDATE SET cortar_type = 'sec', fetched_at = excluded.fetched_at",
+            (cortar_no, now),
+        )
+        self.conn.commit()
+        print(f"   🏢 [{cortar_no}] 단지 {len(complexes)}개")
+
+    def _refresh_details(self, driver, cortar_no, detail_ttl_days, max_requests):
+        cutoff = time.time() - detail_ttl_days * 86400
+        stale = [r["complex_no"] for r in self.conn.execute(
+            "SELECT complex_no FROM complexes WHERE cortar_no LIKE ? AND (detail_fetched_at IS NULL OR detail_fetched_at < ?)",
+            (self._prefix(cortar_no) + "%", cutoff),
+        )]
+
+        for complex_no in stale:
+            if max_requests is not None and self.requests >= max_requests:
+                break
+            try:
+                data = self._call(driver, f"/api/complexes/{complex_no}", {"sameAddressGroup": "false"})
+            except Exception as e:
+                print(f"   ⚠️ 단지 상세 실패 ({complex_no}): {e}")
+                continue
+
+            detail = data.get("complexDetail") or {}
+            area_types = [{
+                "name": p.get("pyeongName"),
+                "supply": p.get("supplyArea"),
+                "exclusive": p.get("exclusiveArea"),
+            } for p in data.get("complexPyeongDetailList") or []]
+
+            self.conn.execute(
+                """
+                UPDATE complexes SET households = COALESCE(?, households), dong_count = ?, area_types = ?,
+                       use_approve_ymd = COALESCE(?, use_approve_ymd), detail_fetched_at = ?
+                WHERE complex_no = ?
+                """,
+                (
+                    _int(detail.get("totalHouseHoldCount") or detail.get("totalHouseholdCount")),
+                    _int(detail.get("totalDongCount")),
+                    json.dumps(area_types, ensure_ascii=False),
+                    detail.get("useApproveYmd"), time.time(), complex_no,
+                ),
+            )
+            self.conn.commit()
+
+    # --------------------------------------------------------------
+    # 카탈로그 조회 (API 호출 없음)
+    # --------------------------------------------------------------
+    @staticmethod
+    def _prefix(cortar_no):
+        """'1144000000' -> '11440' (뒤쪽 0 제거 후 시도 2 / 시군구 5 / 읍면동 8 / 리 10자리 경계까지 채움)"""
+        code = str(cortar_no).rstrip("0")
+        if not code:
+            return ""
+        width = next(w for w in CORTAR_LEVELS if w >= len(code))
+        return code.ljust(width, "0")
+
+    def complexes(self, cortar_no="", min_households=0):
+        rows = self.conn.execute(
+            "SELECT * FROM complexes WHERE cortar_no LIKE ? AND COALESCE(households, 0) >= ? ORDER BY cortar_no, name",
+            (self._prefix(cortar_no) + "%", min_households),
+        ).fetchall()
+        result = []
+        for r in rows:
+            item = dict(r)
+            item["area_types"] = json.loads(item["area_types"]) if item["area_types"] else []
+            result.append(item)
+        return result
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="지역 단위 단지 카탈로그")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_ref = sub.add_parser("refresh", help="지역 단지 목록 갱신 (TTL 지난 항목만)")
+    p_ref.add_argument("cortar_no", help="법정동/시군구 코드 (예: 1138000000)")
+    p_ref.add_argument("--ttl-days", type=float, default=REGION_TTL_DAYS)
+    p_ref.add_argument("--max-requests", type=int)
+    p_ls = sub.add_parser("list", help="카탈로그 조회")
+    p_ls.add_argument("cortar_no", nargs="?", default="")
+    p_ls.add_argument("--min-households", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    catalog = ComplexCatalog()
+    try:
+        if args.cmd == "refresh":
+            from dom_crawler import create_driver
+            from land_api import open_session
+
+            driver = create_driver(extra_args=["--headless=new"])
+            try:
+                open_session(driver)
+                catalog.refresh_region(driver, args.cortar_no, ttl_days=args.ttl_days, max_requests=args.max_requests)
+            finally:
+                driver.quit()
+            print(f"✅ 카탈로그 갱신 완료 (API 호출 {catalog.requests}회, 단지 {len(catalog.complexes(args.cortar_no))}개)")
+
+        elif args.cmd == "list":
+            for c in catalog.complexes(args.cortar_no, args.min_households):
+                areas = ",".join(a["name"] or "" for a in c["area_types"])
+                print(f"{c['complex_no']}\t{c['name']}\t{c['households'] or '-'}세대\t{c['dong_count'] or '-'}개동\t{areas}")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,36 @@
+import os
+from datetime import timedelta, timezone
+
+# ==================================================================
+# [설정] 공용 상수 / 경로
+# ==================================================================
+KST = timezone(timedelta(hours=9))
+COMPLEX_NO = "108064"
+
+# 사이트 주소 (부하 테스트 시 LAND_BASE_URL=http://127.0.0.1:8800 으로 sim_server.py 를 가리킴)
+LAND_BASE_URL = os.environ.get("LAND_BASE_URL", "https://new.land.naver.com").rstrip("/")
+
+# 로컬 실행용 Supabase 설정 파일 (대시보드와 공유, GitHub Actions 에서는 secrets 환경변수 사용)
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "land-dashboard", ".env.local")
+
+# 로컬 인덱스/캐시 파일 저장 위치 (GitHub Actions 에서는 작업 디렉토리 기준)
+DATA_DIR = os.environ.get("LAND_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+
+def data_path(*parts):
+    """DATA_DIR 하위 경로 반환 (상위 폴더는 자동 생성)"""
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def load_local_env(path=ENV_FILE):
+    """
+    .env.local 을 환경변수로 로드 (import 시점이 아니라 실행 진입점에서 호출)
+    python-dotenv 가 없으면 건너뜀. 반환: 로드 여부
+    """
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return False
+    return load_dotenv(dotenv_path=path)
@@ -0,0 +1,216 @@
+import os
+import time
+import signal
+import threading
+from contextlib import contextmanager
+
+from change_events import ChangeDetector, normalize_price
+
+# ==================================================================
+# [예산] 실행 마감 시각 기준 단계별 시간 예산 + 단계적 축소
+# ==================================================================
+# 사이트가 느리면 매매/전세 크롤링이 다음 정시 실행과 겹치고, 워크플로의 cancel-in-progress 가
+# 저장 도중에 프로세스를 죽입니다. CRAWL_DEADLINE 이 있으면 마감 전에 반드시 수집분을 저장합니다.
+#   CRAWL_DEADLINE : 마감 시각 (유닉스 초, 워크플로에서 한 번 계산해 여러 스크립트가 공유)
+#                    1e9 보다 작은 값은 "지금부터 N초" 로 해석
+# 남은 시간을 접속(load) / 스크롤(scroll) / 상세 추출(extract) / 저장(write) 비율로 나누고,
+# 저장 예산은 처음부터 떼어 둡니다. 앞 단계에서 남긴 시간은 뒤 단계로 넘어갑니다.
+# 시간이 모자라면 아래 순서로 축소합니다.
+#   1. SKIP_DETAILS : 직전 스냅샷과 (동, 가격, 중개사) 가 같은 매물은 상세 패널을 열지 않고 매물번호 재사용
+#   2. TRUNCATE     : 스크롤/추출 중단, 그때까지 수집한 매물만 저장 (처음 보는 매물은 버림)
+#   3. DEFER        : 병렬 크롤링에서 아직 시작하지 않은 (우선순위 낮은) 단지는 다음 실행으로 연기
+# 2단계 이상이 일어나면 crawl_history 상태는 PARTIAL (빠진 매물을 삭제로 보지 않음)
+PHASES = ("load", "scroll", "extract", "write")
+PHASE_SHARES = {"load": 0.10, "scroll": 0.30, "extract": 0.45, "write": 0.15}
+MIN_WRITE_SEC = 30.0
+
+SKIP_DETAILS, TRUNCATE, DEFER = 1, 2, 3
+STEP_NAMES = {SKIP_DETAILS: "상세 생략", TRUNCATE: "수집 중단", DEFER: "단지 연기"}
+
+
+class DeadlineExceeded(Exception):
+    """마감 시각(저장 예산 제외) 도달 또는 종료 신호(SIGTERM) 수신"""
+
+
+class CrawlBudget:
+    """deadline_at 이 None 이면 무제한 (모든 검사가 통과하므로 호출부에서 분기할 필요 없음)"""
+
+    def __init__(self, deadline_at=None, shares=None, write_reserve=None, parent=None):
+        self.deadline_at = deadline_at
+        self.shares = dict(shares or PHASE_SHARES)
+        total = max(0.0, deadline_at - time.time()) if deadline_at is not None else 0.0
+        if write_reserve is None:
+            write_reserve = max(MIN_WRITE_SEC, total * self.shares["write"])
+        self.write_reserve = min(write_reserve, total)
+        self.parent = parent
+        self.level = 0
+        self.notes = []
+        self.stop_reason = ""
+        self.phase = None
+        self.phase_end = None
+
+    @classmethod
+    def from_env(cls, fraction=1.0):
+        """CRAWL_DEADLINE 기준 예산. fraction: 남은 시간 중 이 스크립트가 쓸 비율 (뒤에 다른 스크립트가 이어서 돌 때)"""
+        value = os.environ.get("CRAWL_DEADLINE", "").strip()
+        if not value:
+            return cls()
+        now = time.time()
+        deadline = float(value)
+        if deadline < 1e9:
+            deadline += now
+        budget = cls(now + max(0.0, deadline - now) * fraction)
+        print(f"⏳ [Budget] 마감까지 {budget.remaining():.0f}초 (저장 예산 {budget.write_reserve:.0f}초)")
+        return budget
+
+    @property
+    def limited(self):
+        return self.deadline_at is not None
+
+    def remaining(self):
+        return self.deadline_at - time.time() if self.limited else float("inf")
+
+    def available(self):
+        """저장 예산을 뺀 남은 수집 시간"""
+        return self.remaining() - self.write_reserve
+
+    def expired(self):
+        """마감 도달 또는 종료 신호 수신 (신호는 guard() 를 건 상위 예산에만 기록되므로 상위까지 확인)"""
+        node = self
+        while node:
+            if node.stop_reason:
+                return True
+            node = node.parent
+        return self.available() <= 0
+
+    # --------------------------------------------------------------
+    # 단계
+    # --------------------------------------------------------------
+    def begin(self, phase):
+        """남은 수집 시간을 이번 단계와 이후 단계(저장 제외) 비율로 나눠 이번 단계 마감 시각 결정"""
+        self.phase = phase
+        if not self.limited or phase == "write":
+            self.phase_end = self.deadline_at
+            return self
+        later = PHASES[PHASES.index(phase):-1]
+        weight = self.shares[phase] / sum(self.shares[p] for p in later)
+        self.phase_end = time.time() + max(0.0, self.available()) * weight
+        return self
+
+    def phase_left(self):
+        if self.phase_end is None:
+            return float("inf")
+        return self.phase_end - time.time()
+
+    def exhausted(self):
+        """현재 단계 예산 소진 여부"""
+        return self.expired() or self.phase_left() <= 0
+
+    def sub(self, fraction):
+        """남은 수집 시간의 fraction 만큼 쓰는 하위 예산 (저장 예산은 상위가 보관, 축소 기록은 상위로 전달)"""
+        if not self.limited:
+            return CrawlBudget(parent=self)
+        deadline = time.time() + max(0.0, self.available()) * fraction
+        return CrawlBudget(deadline, self.shares, write_reserve=0.0, parent=self)
+
+    # --------------------------------------------------------------
+    # 축소 기록
+    # --------------------------------------------------------------
+    def degrade(self, level, message):
+        self._record(level, message)
+        root = self
+        while root.parent:
+            root = root.parent
+        left = f"{root.remaining():.0f}초" if root.limited else "-"
+        print(f"   ⏳ [Budget] {STEP_NAMES[level]}: {message} (마감까지 {left})")
+
+    def _record(self, level, message):
+        self.level = max(self.level, level)
+        self.notes.append(f"{STEP_NAMES[level]}: {message}")
+        if self.parent:
+            self.parent._record(level, message)
+
+    def merge(self, level, notes):
+        """다른 프로세스(병렬 워커)의 축소 기록 합치기"""
+        self.level = max(self.level, level)
+        self.notes.extend(notes)
+
+    @property
+    def partial(self):
+        return self.level >= TRUNCATE
+
+    def summary(self):
+        return " | ".join(self.notes)
+
+    # --------------------------------------------------------------
+    # 강제 중단 (메인 스레드 전용)
+    # --------------------------------------------------------------
+    @contextmanager
+    def guard(self):
+        """
+        수집 구간을 감쌈: 마감(저장 예산 제외) 시각의 SIGALRM, 작업 취소 시의 SIGTERM 을
+        DeadlineExceeded 로 바꿔 멈춰 있는 드라이버 호출에서도 빠져나와 저장 단계로 가게 함
+        """
+        if threading.current_thread() is not threading.main_thread():
+            yield self
+            return
+
+        def handler(signum, frame):
+            self.stop_reason = "종료 신호 수신" if signum == signal.SIGTERM else "마감 시각 도달"
+            raise DeadlineExceeded(self.stop_reason)
+
+        prev_term = signal.signal(signal.SIGTERM, handler)
+        prev_alarm = signal.signal(signal.SIGALRM, handler)
+        if self.limited:
+            signal.setitimer(signal.ITIMER_REAL, max(0.01, self.available()))
+        try:
+            yield self
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, prev_alarm)
+            signal.signal(signal.SIGTERM, prev_term)
+
+
+def crawl_status(rows, budget, report=None):
+    """
+    crawl_history / 생애주기 상태: 0건 FAIL, 축소로 일부만 수집 PARTIAL
+    단, 페이지 상태로 매물 없음이 확정된 0건(report["empty"])은 정상 결과라 SUCCESS
+    """
+    if not rows:
+        return "SUCCESS" if report and report.get("empty") else "FAIL"
+    return "PARTIAL" if budget.partial else "SUCCESS"
+
+
+# ==================================================================
+# [재사용] 직전 스냅샷 매물번호 (상세 패널 생략용)
+# ==================================================================
+def listing_key(dong, price, agent):
+    return (dong or "", normalize_price(price), agent or "")
+
+
+def known_articles(complex_no, trade_type):
+    """
+    change_events 의 직전 스냅샷 -> {(동, 가격, 중개사): 매물번호}
+    같은 키가 여러 매물에 걸리면 어느 것인지 알 수 없으므로 제외
+    """
+    try:
+        detector = ChangeDetector(sinks=[])
+        try:
+            rows = detector.conn.execute(
+                "SELECT article_no, price, agent, dong FROM last_snapshot WHERE complex_no = ? AND trade_type = ?",
+                (str(complex_no), trade_type)).fetchall()
+        finally:
+            detector.close()
+    except Exception as e:
+        print(f"⚠️ [Budget] 직전 스냅샷 조회 실패: {e}")
+        return {}
+
+    known, dup = {}, set()
+    for article_no, price, agent, dong in rows:
+        key = listing_key(dong, price, agent)
+        if key in known:
+            dup.add(key)
+        known[key] = article_no
+    for key in dup:
+        del known[key]
+    return known
@@ -1,18 +1,24 @@
-import os
 import json
 import time
 import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from dotenv import load_dotenv
-from supabase import create_client, Client
+from config import ENV_FILE, load_local_env
+from db_client import get_supabase, supabase_settings, insert_rows
+from land_api import install_auth_hook, BASE_URL, HOST
+from rate_limiter import get_limiter, classify_response
+from completeness import PageTracker, verify_and_refill, summarize, expected_count
+from listing_record import ListingBatch, ListingDecodeError, decode_article
+from change_events import emit_changes
+from price_sketch import check_prices
+from lifecycle_state import advance_lifecycle
+from payload_store import SnapshotWriter
+from driver_trace import get_tracer, trace_driver
+from dimensions import encode_rows
+from snapshot_registry import register_snapshot
+from page_state import check_landing, is_retryable, EMPTY
+from crawl_budget import CrawlBudget, DeadlineExceeded, TRUNCATE
 
 # ==================================================================
 # [설정] 환경변수 및 상수 정의
@@ -20,97 +26,80 @@ from supabase import create_client, Client
 COMPLEX_NO = "108064"
 KST = timezone(timedelta(hours=9))
 
-# 1. 현재 파일 위치 기준 .env.local 로드
-current_dir = os.path.dirname(os.path.abspath(__file__))
-env_path = os.path.join(current_dir, 'land-dashboard/.env.local') 
-
-load_result = load_dotenv(dotenv_path=env_path)
-print(f"📂 경로: {env_path}")
-print(f"🔄 로드 결과: {load_result}")
 
-SUPABASE_URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("NEXT_PUBLIC_SUPABASE_KEY")
+def load_env():
+    """
+    .env.local 로드 + Supabase 설정 확인 (import 시점이 아니라 main 에서 한 번 호출)
+    반환: DB 저장 가능 여부
+    """
+    load_result = load_local_env()
+    print(f"📂 경로: {ENV_FILE}")
+    print(f"🔄 로드 결과: {load_result}")
 
-if SUPABASE_URL:
-    print(f"✅ URL 로드 성공: {SUPABASE_URL[:10]}...")
-else:
-    print("❌ URL 로드 실패 (DB 저장 불가)")
+    url, _ = supabase_settings()
+    if url:
+        print(f"✅ URL 로드 성공: {url[:10]}...")
+    else:
+        print("❌ URL 로드 실패 (DB 저장 불가)")
+    return bool(url)
 
 
 # ==================================================================
 # [함수] 데이터 정제 및 DB 저장
 # ==================================================================
-def refine_data(raw_data_list, trade_type, fixed_date, fixed_time):
+def refine_data(listings):
     """
-    네이버 원본 데이터 리스트를 DB 스키마에 맞게 변환
+    수집된 Listing 목록을 컬럼형 배치로 정리 (저장 행은 배치에서 바로 생성)
     """
-    refined_list = []
-    
-    for item in raw_data_list:
-        # 가격 정보
-        price_str = item.get('dealOrWarrantPrc', '')
-        
-        area_name = item.get('areaName', '')   # 110E-2
-        area_ex = item.get('area2', '')        # 84 (전용면적)
-        floor = item.get('floorInfo', '')      # 저/22층
-        direction = item.get('direction', '')  # 남서향
-        formatted_spec = f"{area_name}/{area_ex}m², {floor}, {direction}"
-
-        refined_item = {
-             "crawl_date": fixed_date,
-             "crawl_time": fixed_time,
-             "article_no": item.get('articleNo', ''),  # 매물 번호 (PK)
-             "trade_type": trade_type,                 # 매매/전세
-             "price": price_str,                       # 가격
-             "dong": item.get('buildingName'),         # 동
-             "spec": formatted_spec,
-             "agent": item.get('realtorName'),         # 중개업소
-             "provider": item.get('cpName'),           # 제공 업체
-             "confirm_date": item.get('articleConfirmYmd',''), # 확인날짜
-             "is_owner": item.get('verificationTypeCode') == 'OWNER' # 집주인 인증여부
-        }
-        refined_list.append(refined_item)
-    
-    return refined_list
+    return ListingBatch.from_listings(listings)
 
-def save_to_supabase(data_list):
+def save_to_supabase(batch, fixed_date, fixed_time, snapshot_id=None):
     """
     Supabase DB에 매물 데이터 저장 (Upsert)
+    snapshot_id: 이번 크롤링의 정수 스냅샷 id (snapshot_registry.py)
+    행마다 단지번호(complex_no)를 붙임 (migrations/006 전이면 빼고 저장)
     """
-    if not data_list or not SUPABASE_URL:
+    if not len(batch) or not supabase_settings()[0]:
         print("⚠️ 저장할 데이터가 없거나 DB 설정이 누락되었습니다.")
         return
 
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        supabase = get_supabase()
         table_name = "real_estate_logs" 
 
-        response = supabase.table(table_name).upsert(data_list).execute()
+        rows = encode_rows(batch.db_rows(fixed_date, fixed_time, snapshot_id, COMPLEX_NO), copy=False)
+        response = insert_rows(supabase, table_name, rows, {"complex_no": "006"}, upsert=True)
         
-        print(f"✅ DB 저장 완료! (총 {len(data_list)}건 처리)")
+        print(f"✅ DB 저장 완료! (총 {len(batch)}건 처리)")
         
     except Exception as e:
         print(f"❌ DB 저장 중 오류 발생: {e}")
 
 # [추가됨] 이력 기록 함수
-def save_crawl_history(date, time_str, status, count=0, error_msg=""):
+def save_crawl_history(date, time_str, status, count=0, error_msg="", extra=None, snapshot_id=None):
     """
     crawl_history 테이블에 성공/실패 여부를 기록합니다.
+    extra: 완전성 검증 결과 등 추가 컬럼 (migrations/001 참고)
     """
-    if not SUPABASE_URL: return
+    if not supabase_settings()[0]: return
 
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        supabase = get_supabase()
         
         history_data = {
             "crawl_date": date,
             "crawl_time": time_str,
-            "status": status,          # 'SUCCESS' 또는 'FAIL'
+            "status": status,          # 'SUCCESS' / 'PARTIAL'(마감 예산으로 일부만 수집) / 'FAIL'
             "collected_count": count,  # 수집된 개수
             "error_message": str(error_msg)[:1000] # 에러 메시지 길이 제한
         }
+        if extra:
+            history_data.update(extra)
+        if snapshot_id is not None:
+            history_data["snapshot_id"] = snapshot_id
+        history_data["complex_no"] = COMPLEX_NO  # 이 단지만의 결과 (migrations/006)
         
-        supabase.table("crawl_history").insert(history_data).execute()
+        insert_rows(supabase, "crawl_history", [history_data], {"complex_no": "006"})
         print(f"📝 [History] 이력 기록 완료: {status} ({count}건)")
         
     except Exception as e:
@@ -125,9 +114,13 @@ class NaverLandCrawler:
     def __init__(self):
         """생성자: 드라이버 초기화"""
         self.driver = self._init_driver()
+        self.reports = {}  # 거래방식별 완전성 검증 결과
+        self.payloads = {}  # 거래방식별 원본 articleList 보관 (페이지마다 저장, 메모리엔 매물번호 -> 해시만)
 
     def _init_driver(self):
         """드라이버 옵션 설정"""
+        import undetected_chromedriver as uc
+
         options = uc.ChromeOptions()
         options.add_argument("--headless=new") 
         options.add_argument("--window-size=1920,1080")
@@ -152,12 +145,15 @@ class NaverLandCrawler:
         })
         driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {
             "headers": {
-                "Referer": "https://new.land.naver.com/",
-                "Origin": "https://new.land.naver.com"
+                "Referer": f"{BASE_URL}/",
+                "Origin": BASE_URL
             }
         })
+        # 누락 페이지 재요청용 authorization 헤더 확보
+        install_auth_hook(driver)
         
-        return driver
+        # CRAWLER_TRACE=1 이면 WebDriver 명령 단위로 소요 시간 기록
+        return trace_driver(driver)
 
     def close(self):
         # 드라이버가 존재하고 살아있을 때만 종료 시도
@@ -167,14 +163,12 @@ class NaverLandCrawler:
                 self.driver.quit()
             except Exception:
                 pass # 이미 닫혀있으면 패스
-
-    def _wait_for_loading(self):
-        try:
-            WebDriverWait(self.driver, 20).until(EC.presence_of_element_located((By.ID, "articleListArea")))
-        except Exception as e:
-            print(f"   ⚠️ 로딩 대기 실패: {e}")
+        for writer in getattr(self, "payloads", {}).values():
+            writer.close()
 
     def _reset_and_apply_filters(self, target_type):
+        from selenium.webdriver.common.by import By
+
         print(f"   ⚙️ 필터 적용 중: {target_type}")
         
         # 1. 전체 거래방식 해제
@@ -208,7 +202,26 @@ class NaverLandCrawler:
         
         time.sleep(3)
 
-    def _scroll_and_collect_packets(self, target_type):
+    @staticmethod
+    def _accept_item(item, target_type):
+        if (item.get("tradeTypeName") != target_type): return False
+        if (item.get("tradeCompleteYN") == "Y"): return False
+        if (item.get("articleStatus") != "R0"): return False
+        return True
+
+    @staticmethod
+    def _decode_item(item, target_type):
+        """필요한 필드만 검증해 Listing 으로 변환 (형식 오류는 제외)"""
+        try:
+            return decode_article(item, target_type)
+        except ListingDecodeError as e:
+            print(f"   ⚠️ 매물 디코드 실패 (제외): {e}")
+            return None
+
+    def _scroll_and_collect_packets(self, target_type, budget):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.action_chains import ActionChains
+
         try:
             list_area = self.driver.find_element(By.ID, "articleListArea")
         except:
@@ -220,12 +233,55 @@ class NaverLandCrawler:
             pass
 
         collected_data_map = {}
+        payloads = self.payloads.setdefault(target_type, SnapshotWriter(COMPLEX_NO, target_type))
+        tracker = PageTracker(target_type)
+
+        def decode(item):
+            # 정제된 Listing 과 함께 원본 아이템도 보관 (payload_store 에 페이지 단위로 저장)
+            listing = self._decode_item(item, target_type)
+            if listing:
+                payloads.add(listing.article_no, item)
+            return listing
+
+        try:
+            self._scroll_loop(target_type, list_area, tracker, collected_data_map, decode, budget)
+        except DeadlineExceeded as e:
+            budget.degrade(TRUNCATE, f"[{target_type}] 스크롤 중 {e}")
+
+        print(f"   ✅ [{target_type}] 1차 수집 완료: {len(collected_data_map)}건 (중복제거됨)")
+
+        # 응답 페이지 기준 완전성 확인 (빠진 페이지만 재요청, 예산이 없으면 생략하고 불완전으로 기록)
+        budget.begin("extract")
+        report = {"trade_type": target_type, "expected": None, "refetched_pages": [], "complete": False}
+        if budget.exhausted():
+            budget.degrade(TRUNCATE, f"[{target_type}] 누락 페이지 재요청 생략")
+        else:
+            try:
+                with get_tracer().phase("verify"):
+                    report = verify_and_refill(
+                        self.driver, COMPLEX_NO, target_type, tracker, collected_data_map,
+                        lambda item: self._accept_item(item, target_type),
+                        decode,
+                    )
+            except DeadlineExceeded as e:
+                budget.degrade(TRUNCATE, f"[{target_type}] 재요청 중 {e}")
+        if budget.partial:
+            report["complete"] = False
+        self.reports[target_type] = report
+        return collected_data_map
+
+    def _scroll_loop(self, target_type, list_area, tracker, collected_data_map, decode, budget):
+        from selenium.webdriver.common.by import By
+
         last_count = 0
         same_loop = 0
-        
+
         for i in range(50): # 최대 50회 스크롤
             items = self.driver.find_elements(By.CSS_SELECTOR, "div.item:not(.item--child)")
             curr_count = len(items)
+            if budget.exhausted():
+                budget.degrade(TRUNCATE, f"[{target_type}] 스크롤 예산 소진 ({len(collected_data_map)}건에서 중단)")
+                break
             if (curr_count > 0):
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", items[-1])
             self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", list_area)
@@ -242,20 +298,22 @@ class NaverLandCrawler:
                         resp_url = message["params"]["response"]["url"]
                         
                         if ("api/articles/complex" in resp_url and "realEstateType" in resp_url):
+                            # 스크롤이 만든 API 응답 상태를 속도 제한에 반영 (429/403 감지)
+                            get_limiter().feedback(HOST, "api", classify_response(message["params"]["response"].get("status", 200)))
                             request_id = message["params"]["requestId"]
                             try:
                                 response_body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
                                 data = json.loads(response_body['body'])
+                                tracker.record(resp_url, data)
                                 articles = data.get('articleList', [])
                                 
                                 for item in articles:
-                                    if (item.get("tradeTypeName") != target_type): continue
-                                    if (item.get("tradeCompleteYN") == "Y"): continue
-                                    if (item.get("articleStatus") != "R0"): continue
+                                    if not self._accept_item(item, target_type): continue
                                     
-                                    article_no = item.get('articleNo')
-                                    if (article_no):
-                                        collected_data_map[article_no] = item
+                                    listing = decode(item)
+                                    if (listing):
+                                        collected_data_map[listing.article_no] = listing
+                                self.payloads[target_type].flush()
                             except:
                                 pass
                 except:
@@ -270,19 +328,34 @@ class NaverLandCrawler:
             
             last_count = curr_count
 
-        print(f"   ✅ [{target_type}] 1차 수집 완료: {len(collected_data_map)}건 (중복제거됨)")
-        return collected_data_map
-
-    def collect(self, target_type):
+    def collect(self, target_type, budget=None):
         print(f"\n🔎 [{target_type}] 프로세스 시작...")
         
         print(f"   🌏 페이지 접속: {COMPLEX_NO}")
-        self.driver.get(f"https://new.land.naver.com/complexes/{COMPLEX_NO}")
-        self._wait_for_loading()
+        limiter = get_limiter()
+        tracer = get_tracer()
+        budget = budget or CrawlBudget()
+        with tracer.phase(target_type), tracer.phase("load"):
+            budget.begin("load")
+            limiter.acquire(HOST, "page")
+            self.driver.get(f"{BASE_URL}/complexes/{COMPLEX_NO}")
+            # 차단/구조 변경이면 예외 (재시도 안 함), 과부하면 PageStateError -> 재시도 루프로
+            # 목록이 비어 있으면 단지 API 매물 수로 0건 여부 확인 (문구나 0건 응답 없이는 EMPTY 아님)
+            landing = check_landing(self.driver, HOST,
+                                    total_fn=lambda: expected_count(self.driver, COMPLEX_NO, target_type))
+
+        if landing.state == EMPTY:
+            print(f"   ℹ️ [{target_type}] 등록된 매물이 없습니다. (스크롤 생략)")
+            self.reports[target_type] = {"trade_type": target_type, "expected": 0, "refetched_pages": [], "complete": True,
+                                         "empty": True}
+            return {}
         
-        self._reset_and_apply_filters(target_type)
+        with tracer.phase(target_type), tracer.phase("filter"):
+            self._reset_and_apply_filters(target_type)
         
-        data_map = self._scroll_and_collect_packets(target_type)
+        with tracer.phase(target_type), tracer.phase("scroll"):
+            budget.begin("scroll")
+            data_map = self._scroll_and_collect_packets(target_type, budget)
         
         print("   " + "-"*30)
         return data_map
@@ -290,19 +363,29 @@ class NaverLandCrawler:
 # ==================================================================
 # 메인 실행 블록 (재시도 + 이력 기록 통합)
 # ==================================================================
-def main():
+def main(argv=None):
+    # numpy 를 쓰는 중복 문구 탐지는 실행 시점에 로드 (crawler_sale/jeonse.py 와 동일)
+    from near_duplicates import find_duplicates
+
+    db_ready = load_env()
     max_retries = 3  # 최대 재시도 횟수
     
     # [중요] 시작 시간을 고정합니다. (재시도하더라도 첫 시도 시간을 기록해야 함)
-    start_now = datetime.now()
+    # 실행 PC 시간대와 무관하게 다른 크롤러와 같은 KST 기준으로 기록
+    start_now = datetime.now(KST)
     FIXED_DATE = start_now.strftime("%Y-%m-%d")
     FIXED_TIME = start_now.strftime("%H:%M")
     
     final_status = "FAIL" # 기본값은 실패로 시작
     final_count = 0
     last_error_msg = ""
+    completeness = None
+    collected = {}  # 거래방식 -> (정제된 행, 완전성) : 생애주기 상태 갱신용
+    # CRAWL_DEADLINE 이 있으면 단계별 예산 안에서 수집하고 마감 전에 수집분 저장 (crawl_budget.py)
+    budget = CrawlBudget.from_env()
     
     print(f"\n🕒 작업 기준 시간: {FIXED_DATE} {FIXED_TIME}")
+    snapshot_id = register_snapshot(FIXED_DATE, FIXED_TIME, [COMPLEX_NO], ["매매", "전세"]) if db_ready else None
 
     for attempt in range(max_retries):
         crawler = None 
@@ -312,30 +395,55 @@ def main():
             # --- 여기서 에러가 나면 except로 점프합니다 ---
             crawler = NaverLandCrawler()
             
-            # 1. 크롤링 수행
-            sale_map = crawler.collect("매매")
-            jeonse_map = crawler.collect("전세")
+            # 1. 크롤링 수행 (거래방식마다 남은 수집 시간을 나눠 쓰고, 마감이면 그때까지 수집분으로 진행)
+            maps = {}
+            try:
+                with budget.guard():
+                    for i, trade_type in enumerate(("매매", "전세")):
+                        maps[trade_type] = crawler.collect(trade_type, budget.sub(1 / (2 - i)))
+            except DeadlineExceeded as e:
+                budget.degrade(TRUNCATE, f"{e} ({', '.join(maps) or '수집 없이'} 이후 중단)")
+            for trade_type in ("매매", "전세"):
+                crawler.reports.setdefault(trade_type, {"trade_type": trade_type, "expected": None, "refetched_pages": [], "complete": False})
+            sale_map = maps.get("매매", {})
+            jeonse_map = maps.get("전세", {})
             
             print(f"   📊 수집 결과: 매매 {len(sale_map)}건, 전세 {len(jeonse_map)}건")
             
-            # 2. 데이터 정제 (고정된 시간 FIXED_TIME 사용)
-            clean_sale = refine_data(list(sale_map.values()), "매매", FIXED_DATE, FIXED_TIME)
-            clean_jeonse = refine_data(list(jeonse_map.values()), "전세", FIXED_DATE, FIXED_TIME)
+            # 2. 데이터 정제 (거래방식별 컬럼형 배치)
+            sale_batch = refine_data(sale_map.values())
+            jeonse_batch = refine_data(jeonse_map.values())
             
             # 3. 데이터 통합
-            final_db_data = clean_sale + clean_jeonse
-            final_count = len(final_db_data)
+            final_batch = ListingBatch().extend(sale_batch).extend(jeonse_batch)
+            final_count = len(final_batch)
             
-            # 4. DB 저장
-            if final_db_data:
+            # 4. DB 저장 (고정된 시간 FIXED_TIME 사용)
+            budget.begin("write")
+            if final_count:
                 print(f"💾 총 {final_count}건의 데이터를 DB에 저장합니다...")
-                save_to_supabase(final_db_data)
+                save_to_supabase(final_batch, FIXED_DATE, FIXED_TIME, snapshot_id)
             else:
                 print("⚠️ 저장할 데이터가 0건입니다.")
 
-            # 여기까지 오면 성공
-            final_status = "SUCCESS"
-            last_error_msg = "" # 성공 시 에러 메시지 초기화
+            # 5. 직전 스냅샷 대비 변경 이벤트 (신규/가격변경/삭제/재등록)
+            for trade_type, batch in (("매매", sale_batch), ("전세", jeonse_batch)):
+                clean_rows = batch.to_rows(FIXED_DATE, FIXED_TIME, COMPLEX_NO)
+                report = crawler.reports.get(trade_type, {})
+                emit_changes(COMPLEX_NO, trade_type, clean_rows, FIXED_DATE, FIXED_TIME, report.get("complete", True))
+                check_prices(COMPLEX_NO, trade_type, clean_rows, FIXED_DATE, FIXED_TIME)
+                find_duplicates(COMPLEX_NO, trade_type, clean_rows, FIXED_DATE, FIXED_TIME, snapshot_id)
+                collected[trade_type] = (clean_rows, report.get("complete", True))
+                payloads = crawler.payloads.pop(trade_type, None) or SnapshotWriter(COMPLEX_NO, trade_type)
+                payloads.commit(FIXED_DATE, FIXED_TIME)
+
+            # 여기까지 오면 성공 (완전성 검증 결과도 함께 기록)
+            completeness = summarize(list(crawler.reports.values()))
+            if not completeness["is_complete"]:
+                print("⚠️ 일부 페이지가 끝까지 채워지지 않았습니다. (is_complete = false 로 기록)")
+            # 마감 예산 때문에 일부만 수집했으면 PARTIAL (축소 내역은 error_message 에 남김)
+            final_status = "PARTIAL" if budget.partial else "SUCCESS"
+            last_error_msg = budget.summary() # 성공 시 에러 메시지 초기화 (PARTIAL 이면 축소 내역)
             
             print("✨ 크롤링 및 저장이 완료되었습니다.")
             break # 성공했으니 루프 탈출
@@ -349,6 +457,14 @@ def main():
                 try: crawler.close()
                 except: pass
 
+            # 차단/화면 구조 변경은 다시 해도 같으므로 바로 중단
+            if not is_retryable(e):
+                print("🛑 재시도해도 같은 결과라 중단합니다.")
+                break
+            if budget.expired():
+                print("⏳ 마감이 가까워 재시도하지 않습니다.")
+                break
+
             # 마지막 시도가 아니면 대기 후 재시도
             if attempt < max_retries - 1:
                 print("🔄 10초 후 재시도합니다...")
@@ -358,7 +474,11 @@ def main():
 
     # [핵심] 성공/실패 여부에 상관없이 이력을 기록함
     print("\n" + "="*50)
-    save_crawl_history(FIXED_DATE, FIXED_TIME, final_status, final_count, last_error_msg)
+    save_crawl_history(FIXED_DATE, FIXED_TIME, final_status, final_count, last_error_msg, completeness, snapshot_id)
+    # 기록한 상태 그대로 매물별 생애주기 한 단계 진행 (실패면 스냅샷 수만 증가)
+    for trade_type in ("매매", "전세"):
+        rows, complete = collected.get(trade_type, ([], True))
+        advance_lifecycle(COMPLEX_NO, trade_type, FIXED_DATE, FIXED_TIME, final_status, rows, complete, snapshot_id)
     print("="*50)
 
     # 마지막으로 브라우저 정리
@@ -371,4 +491,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
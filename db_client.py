@@ -0,0 +1,78 @@
+import os
+
+# ==================================================================
+# [공용] Supabase 클라이언트 / 페이지 조회
+# ==================================================================
+# GitHub Actions 는 SUPABASE_URL/KEY, 로컬(.env.local)은 NEXT_PUBLIC_* 를 사용
+PAGE_SIZE = 1000  # PostgREST 기본 max-rows
+
+_client = None
+
+
+def supabase_settings():
+    """(url, key) - 없으면 None"""
+    url = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_KEY")
+    return url, key
+
+
+def get_supabase():
+    """Supabase 클라이언트 (최초 호출 시 1회 생성)"""
+    global _client
+    if _client is None:
+        url, key = supabase_settings()
+        if not url or not key:
+            raise RuntimeError("Supabase 설정이 없습니다. (SUPABASE_URL / SUPABASE_KEY)")
+
+        from supabase import create_client
+        _client = create_client(url, key)
+    return _client
+
+
+def insert_rows(supabase, table, rows, optional=None, upsert=False):
+    """
+    rows 저장. 실패하면 optional({컬럼: 마이그레이션 번호}) 컬럼을 순서대로 하나씩 빼고 다시 시도
+    (해당 마이그레이션 적용 전 스키마 호환, 끝까지 실패하면 마지막 예외)
+    """
+    def write(data):
+        query = supabase.table(table)
+        return (query.upsert(data) if upsert else query.insert(data)).execute()
+
+    try:
+        return write(rows)
+    except Exception as e:
+        error = e
+    for column, migration in (optional or {}).items():
+        if not any(column in row for row in rows):
+            continue
+        print(f"⚠️ [{table}] {column} 없이 저장 (migrations/{migration} 적용 여부 확인): {error}")
+        rows = [{k: v for k, v in row.items() if k != column} for row in rows]
+        try:
+            return write(rows)
+        except Exception as e:
+            error = e
+    raise error
+
+
+def iter_rows(table, columns="*", after_id=0, page_size=PAGE_SIZE, filters=None):
+    """
+    id 커서 기반으로 테이블 전체를 페이지 단위로 순회 (offset 없이 keyset 방식)
+    filters: query 객체를 받아 조건을 추가하는 함수 (예: lambda q: q.eq("trade_type", "매매"))
+    """
+    supabase = get_supabase()
+    cursor = after_id
+    if columns != "*" and "id" not in [c.strip() for c in columns.split(",")]:
+        columns = "id," + columns
+
+    while True:
+        query = supabase.table(table).select(columns).gt("id", cursor)
+        if filters:
+            query = filters(query)
+        rows = query.order("id").limit(page_size).execute().data or []
+
+        for row in rows:
+            yield row
+
+        if len(rows) < page_size:
+            break
+        cursor = rows[-1]["id"]
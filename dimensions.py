@@ -0,0 +1,123 @@
+import os
+import sys
+import argparse
+
+from db_client import get_supabase, iter_rows
+
+# ==================================================================
+# [차원] 중개업소 / 제공업체 / 동 -> 정수 키 (migrations/002 참고)
+# ==================================================================
+# 저장 직전에 행의 문자열 값을 차원 테이블의 정수 키로 바꿔 *_id 컬럼에 채웁니다.
+#   - 프로세스당 차원 테이블을 한 번 통째로 읽어 메모리에 둠 (수백 건 수준)
+#   - 처음 보는 값만 모아서 한 번에 upsert 하고 돌려받은 id 를 캐시에 추가
+# 기본은 문자열 컬럼을 None 으로 비워 키만 저장합니다. (DIMENSION_KEYS_ONLY=0 이면 문자열도 함께 저장)
+# 이름이 필요한 조회는 차원을 조인한 뷰를 읽습니다.
+#   Supabase  : real_estate_logs_named / agent_stats_named (migrations/002, 005) -> logs_table()
+#   로컬 미러 : 같은 이름의 SQLite 뷰 (local_mirror.py)
+DIMENSIONS = {
+    "agent": "dim_agent",
+    "provider": "dim_provider",
+    "dong": "dim_dong",
+}
+KEYS_ONLY = os.environ.get("DIMENSION_KEYS_ONLY", "1") not in ("", "0")
+NAMED_LOGS = "real_estate_logs_named"
+
+
+class DimensionCache:
+    """차원 테이블 1개의 name -> id 캐시"""
+
+    def __init__(self, table):
+        self.table = table
+        self.ids = None
+
+    def load(self):
+        self.ids = {}
+        for row in iter_rows(self.table, "id,name"):
+            self.ids[row["name"]] = row["id"]
+        return self.ids
+
+    def resolve(self, names):
+        """이름 목록 -> {이름: id}. 없는 이름은 한 번에 추가"""
+        if self.ids is None:
+            self.load()
+        missing = sorted({n for n in names if n and n not in self.ids})
+        if missing:
+            rows = get_supabase().table(self.table).upsert(
+                [{"name": n} for n in missing], on_conflict="name").execute().data or []
+            for row in rows:
+                self.ids[row["name"]] = row["id"]
+            print(f"🗂️ [Dim] {self.table}: 신규 {len(missing)}건 추가 (총 {len(self.ids)}건)")
+        return {n: self.ids.get(n) for n in names if n}
+
+
+_caches = {}
+_disabled = False
+_logs_table = None
+
+
+def get_cache(field):
+    cache = _caches.get(field)
+    if cache is None:
+        cache = _caches[field] = DimensionCache(DIMENSIONS[field])
+    return cache
+
+
+def encode_rows(rows, fields=("agent", "provider", "dong"), keys_only=None, copy=True):
+    """
+    저장할 행 목록에 <필드>_id 키를 붙인 사본 반환 (원본 행은 그대로 둠)
+    copy=False 면 사본 없이 행에 바로 기록 (저장 직전에 새로 만든 행일 때)
+    차원 테이블이 아직 없으면(마이그레이션 전) 경고 후 원본 그대로 반환
+    """
+    global _disabled
+    if _disabled or not rows:
+        return rows
+    keys_only = KEYS_ONLY if keys_only is None else keys_only
+
+    try:
+        mapping = {field: get_cache(field).resolve([r.get(field) for r in rows]) for field in fields}
+    except Exception as e:
+        _disabled = True
+        print(f"⚠️ [Dim] 차원 키 변환 생략 (migrations/002 적용 여부 확인): {e}")
+        return rows
+
+    encoded = []
+    for row in rows:
+        row = dict(row) if copy else row
+        for field in fields:
+            value = row.get(field)
+            row[f"{field}_id"] = mapping[field].get(value) if value else None
+            if keys_only and row[f"{field}_id"] is not None:
+                row[field] = None
+        encoded.append(row)
+    return encoded
+
+
+def logs_table():
+    """이름을 조인한 뷰가 있으면 뷰, 없으면(migrations/002 전) 원본 real_estate_logs (프로세스당 1회 확인)"""
+    global _logs_table
+    if _logs_table is None:
+        try:
+            get_supabase().table(NAMED_LOGS).select("id").limit(1).execute()
+            _logs_table = NAMED_LOGS
+        except Exception as e:
+            print(f"⚠️ [Dim] {NAMED_LOGS} 뷰 없음, 원본 테이블 조회 (migrations/002 적용 여부 확인): {e}")
+            _logs_table = "real_estate_logs"
+    return _logs_table
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="차원 테이블 조회")
+    parser.add_argument("field", choices=sorted(DIMENSIONS))
+    args = parser.parse_args(argv)
+
+    ids = get_cache(args.field).load()
+    for name, key in sorted(ids.items(), key=lambda kv: kv[1]):
+        print(f"{key}\t{name}")
+    print(f"-- {DIMENSIONS[args.field]}: {len(ids)}건", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,494 @@
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+
+from land_api import install_auth_hook, BASE_URL, HOST
+from rate_limiter import get_limiter
+from listing_html import parse_group, parse_item, parse_detail
+from listing_record import db_rows
+from db_client import insert_rows
+from reparse import save_raw_html
+from driver_trace import get_tracer, trace_driver
+from dimensions import encode_rows
+from snapshot_registry import with_snapshot_id
+from page_state import check_landing, EMPTY
+from completeness import expected_count
+from crawl_budget import CrawlBudget, DeadlineExceeded, SKIP_DETAILS, TRUNCATE, known_articles, listing_key
+
+# ==================================================================
+# [공용] 화면(DOM) 기반 크롤링 로직 (crawler_sale.py / crawler_jeonse.py)
+# ==================================================================
+# 브라우저/파서 라이브러리(undetected_chromedriver, selenium, bs4)는 쓰는 함수 안에서 import
+# (cli.py 나 저장 함수만 쓰는 모듈이 import 만으로 무거운 패키지를 요구하지 않도록)
+DEFAULT_TITLE_PREFIX = "DMC파크뷰자이"
+
+
+def create_driver(extra_args=()):
+    """가상 디스플레이 위에서 동작하는 크롬 드라이버 생성"""
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--lang=ko_KR")
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    for arg in extra_args:
+        options.add_argument(arg)
+
+    # 버전 고정 (GitHub Actions 환경 대응)
+    driver = uc.Chrome(options=options, version_main=142)
+
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        "source": """
+            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+        """
+    })
+    # 완전성 검증(기대 매물 수 조회)용 authorization 헤더 확보
+    install_auth_hook(driver)
+    # CRAWLER_TRACE=1 이면 WebDriver 명령 단위로 소요 시간 기록
+    return trace_driver(driver)
+
+
+def apply_trade_filter(driver, trade_type):
+    """거래방식 필터 + 묶기 + 가격순 정렬"""
+    from selenium.webdriver.common.by import By
+
+    if trade_type == "전세":
+        print("⚙️ 전세 매물 필터 적용 중...")
+    else:
+        print("⚙️ 필터 적용 중...")
+
+    try:
+        if trade_type == "전세":
+            # [Step 1] 전세(filter_2) 켜기 (가장 먼저!)
+            driver.execute_script("if(!document.querySelector('#complex_article_trad_type_filter_2:checked')) document.querySelector('label[for=\"complex_article_trad_type_filter_2\"]').click();")
+            time.sleep(1.0) # 반응 대기
+
+            # [Step 2] 매매(filter_1) 끄기
+            driver.execute_script("if(document.querySelector('#complex_article_trad_type_filter_1:checked')) document.querySelector('label[for=\"complex_article_trad_type_filter_1\"]').click();")
+        else:
+            driver.execute_script("if(document.querySelector('#complex_article_trad_type_filter_0:checked')) document.querySelector('#complex_article_trad_type_filter_0').click();")
+            time.sleep(0.5)
+            driver.execute_script("if(!document.querySelector('#complex_article_trad_type_filter_1:checked')) document.querySelector('#complex_article_trad_type_filter_1').click();")
+            time.sleep(1)
+
+        group_input = driver.find_element(By.ID, "address_group2")
+        if not group_input.is_selected():
+            driver.execute_script("arguments[0].click();", driver.find_element(By.CSS_SELECTOR, "label[for='address_group2']"))
+            time.sleep(1)
+
+        driver.find_element(By.CSS_SELECTOR, "a.sorting_type[data-nclk='TAA.price']").click()
+
+        print("   ⏳ 목록 갱신 대기 (5초)...")
+        time.sleep(5)
+
+    except Exception as e:
+        print(f"⚠️ 필터 오류: {e}")
+
+
+def scroll_to_end(driver, budget=None):
+    """목록 영역을 끝까지 스크롤 (개수가 5회 연속 그대로면 종료, 스크롤 예산이 다하면 거기서 중단)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    print("⬇️ 데이터 로딩 중 (전체 매물 확보)...")
+    budget = budget or CrawlBudget()
+
+    try: list_area = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "articleListArea")))
+    except: list_area = driver.find_element(By.TAG_NAME, "body")
+
+    try:
+        actions = ActionChains(driver)
+        actions.move_to_element(list_area).click().perform()
+    except: pass
+
+    last_count = 0
+    same_count_loop = 0
+
+    for _ in range(50):
+        items = driver.find_elements(By.CSS_SELECTOR, "div.item:not(.item--child)")
+        curr_count = len(items)
+
+        if budget.exhausted():
+            budget.degrade(TRUNCATE, f"스크롤 예산 소진 ({curr_count}개 그룹에서 중단)")
+            break
+
+        print(f"   ... 스크롤 중 (현재 {curr_count}개)")
+
+        if curr_count > 0:
+            last_item = items[-1]
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", last_item)
+
+        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", list_area)
+        try: list_area.send_keys(Keys.PAGE_DOWN)
+        except: pass
+
+        time.sleep(2.0)
+
+        if curr_count == last_count and curr_count > 0:
+            same_count_loop += 1
+            if same_count_loop >= 5:
+                print(f"   ✅ 전체 목록 로딩 완료 (최종 {curr_count}개 그룹)")
+                break
+        else:
+            same_count_loop = 0
+
+        last_count = curr_count
+
+
+def _find_article_no(driver, target):
+    """상세 패널 -> URL -> 리스트 data 속성 순으로 매물번호 추출. 반환: (매물번호, 상세 패널 HTML)"""
+    from bs4 import BeautifulSoup
+    from selenium.webdriver.common.by import By
+
+    article_no = None
+    detail_html = ""
+
+    # [핵심] 최대 3회까지 재시도 (0.5초 간격)
+    for attempt in range(3):
+        full_soup = BeautifulSoup(driver.page_source, "html.parser")
+        detail_area = full_soup.select_one("div.detail_contents_inner")
+
+        if detail_area:
+            detail_html = str(detail_area)
+            article_no = parse_detail(detail_html)["article_no"]
+
+        if article_no:
+            break
+        time.sleep(0.5)
+
+    # [비상 대책 1] 테이블 파싱 실패 시, 현재 URL 확인
+    if not article_no:
+        try:
+            curr_url = driver.current_url
+            if "articleNo=" in curr_url:
+                qs = parse_qs(urlparse(curr_url).query)
+                if "articleNo" in qs:
+                    article_no = qs["articleNo"][0]
+                    print(f"   ⚠️ [복구] 테이블 파싱 실패 -> URL에서 추출 성공 ({article_no})")
+        except: pass
+
+    # [비상 대책 2] 그래도 없으면 리스트의 data 속성 확인
+    if not article_no:
+        try:
+            link_tag = target.find_element(By.CSS_SELECTOR, "a.item_link")
+            article_no = link_tag.get_attribute("data-article-no")
+        except: pass
+
+    return article_no, detail_html
+
+
+def _open_detail(driver, target):
+    """매물 클릭 -> 상세 패널 로딩 -> 매물번호 추출. 반환: (매물번호, 상세 패널 HTML)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    # 1. 클릭할 요소 결정 ("네이버에서 보기" 버튼 우선, 없으면 제목 링크)
+    naver_btns = target.find_elements(By.CSS_SELECTOR, "div.label_area a.label--cp")
+    if len(naver_btns) > 0:
+        click_element = naver_btns[0]
+    else:
+        click_element = target.find_element(By.CSS_SELECTOR, "a.item_link")
+
+    # 2. 클릭 실행 & 상세 패널 로딩 (클릭마다 상세 API 호출이 발생하므로 속도 제한 적용)
+    get_limiter().acquire(HOST, "detail")
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", target)
+    driver.execute_script("arguments[0].click();", click_element)
+
+    time.sleep(0.6) # 패널 열리는 시간 확보
+
+    try:
+        WebDriverWait(driver, 2).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.detail_contents_inner"))
+        )
+    except:
+        pass
+
+    # 3. 상세 패널 파싱
+    return _find_article_no(driver, target)
+
+
+def extract_listings(driver, trade_type, crawl_date, crawl_time, title_prefix=DEFAULT_TITLE_PREFIX, raw=None,
+                     budget=None, known=None, complex_no=None):
+    """
+    스크롤이 끝난 목록에서 매물 정보 추출 (상세 패널 클릭으로 매물번호 확보)
+    complex_no: 행마다 단지번호를 붙임 (여러 단지를 한 스냅샷에 저장하는 parallel_crawler.py 용)
+    raw: list 를 넘기면 매물별 원본 HTML(목록 그룹/매물/상세 패널)과 추출 결과를 담아줌
+    budget/known: 추출 예산이 모자라면 known({(동, 가격, 중개사): 매물번호}) 에 있는 매물은 클릭 생략,
+                  예산이 다하면 known 에 없는 매물은 버림 (crawl_budget.py)
+    """
+    from selenium.webdriver.common.by import By
+
+    parent_items = driver.find_elements(By.CSS_SELECTOR, "div.item:not(.item--child)")
+    print(f"📝 총 {len(parent_items)}개 그룹 발견.")
+
+    db_data = []
+    tracer = get_tracer()
+    budget = budget or CrawlBudget()
+    known = known or {}
+    click_sec = 2.0  # 상세 패널 1건 평균 소요 (실측으로 갱신)
+    reused = dropped = 0
+
+    for idx, parent in enumerate(parent_items):
+        # [예산] 남은 그룹을 모두 클릭할 시간이 없으면 단계적으로 축소
+        if budget.expired():
+            budget.degrade(TRUNCATE, f"마감 임박, {len(parent_items) - idx}개 그룹 미처리")
+            break
+        if budget.level < TRUNCATE and budget.exhausted():
+            budget.degrade(TRUNCATE, "추출 예산 소진, 직전 스냅샷과 같은 매물만 계속 수집")
+        elif budget.level < SKIP_DETAILS and (len(parent_items) - idx) * click_sec > budget.phase_left():
+            budget.degrade(SKIP_DETAILS, f"남은 {len(parent_items) - idx}개 그룹 x {click_sec:.1f}초 > 예산 {budget.phase_left():.0f}초")
+
+        try:
+            p_html = parent.get_attribute('outerHTML')
+            group = parse_group(p_html)
+            title = group["title"]
+            if not title or title == "제목없음": continue
+
+            dong = sys.intern(title.replace(title_prefix, "").strip() if title_prefix else title)
+            spec = group["spec"]
+
+            # 펼치기 로직 (중개사 N곳 버튼이 있을 경우)
+            multi_btn = parent.find_elements(By.CSS_SELECTOR, "span.label--multicp")
+            targets = []
+
+            if multi_btn:
+                driver.execute_script("arguments[0].click();", multi_btn[0])
+                time.sleep(0.3)
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", parent)
+
+                child_container = parent.find_element(By.CSS_SELECTOR, "div.item.item--child")
+                inners = child_container.find_elements(By.CSS_SELECTOR, "div.item_inner")
+                for inner in inners:
+                    if inner.find_elements(By.CSS_SELECTOR, "div.cp_area"): targets.append(inner)
+            else:
+                targets.append(parent.find_element(By.CSS_SELECTOR, "div.item_inner"))
+
+            for sub_idx, target in enumerate(targets):
+                if budget.expired():
+                    break
+                # 루프 시작할 때마다 변수 초기화 (이전 값 덮어쓰기 방지)
+                article_no = None
+                agent_name = None
+                price = ""
+
+                with tracer.listing(f"{idx}.{sub_idx}"):
+                    try:
+                        # 0. [예산] 직전 스냅샷과 같은 매물이면 상세 패널 없이 매물번호 재사용
+                        if budget.level >= SKIP_DETAILS:
+                            t_html = target.get_attribute('outerHTML')
+                            item = parse_item(t_html)
+                            article_no = known.get(listing_key(dong, item["price"], item["agent"]))
+                            if not article_no and budget.level >= TRUNCATE:
+                                dropped += 1
+                                continue
+
+                        if article_no:
+                            detail_html = ""
+                            reused += 1
+                        else:
+                            started = time.monotonic()
+                            article_no, detail_html = _open_detail(driver, target)
+                            click_sec = 0.8 * click_sec + 0.2 * (time.monotonic() - started)
+                            tracer.set_listing(article_no)
+
+                            # 4. 나머지 정보 추출
+                            t_html = target.get_attribute('outerHTML')
+                            item = parse_item(t_html)
+                        agent_name = item["agent"]
+                        price = item["price"]
+
+                        # 🌟 [검증] 매물번호가 여전히 None이면 저장 건너뛰기
+                        if not article_no:
+                            print(f"   ❌ 매물번호 추출 실패 (Skip) - {agent_name}")
+                            continue
+
+                        print(f"   🚀 [{trade_type}] {dong} / {price} / {agent_name} / 번호:{article_no}")
+
+                        row = {
+                            "agent": sys.intern(agent_name), "dong": dong, "spec": spec, "price": price,
+                            "article_no": article_no,
+                            "trade_type": trade_type,
+                            "crawl_date": crawl_date,
+                            "crawl_time": crawl_time,
+                            "is_landlord": item["is_landlord"], # 집주인 인증 여부
+                            "verification_date": item["verification_date"], # 확인매물 날짜
+                            "description": item["description"] # 매물 특징 (로컬 분석용, DB 저장 안 함)
+                        }
+                        if complex_no is not None:
+                            row["complex_no"] = str(complex_no)
+                        db_data.append(row)
+
+                        if raw is not None:
+                            raw.append({
+                                "trade_type": trade_type, "crawl_date": crawl_date, "crawl_time": crawl_time,
+                                "title_prefix": title_prefix,
+                                "group_html": p_html, "item_html": t_html, "detail_html": detail_html,
+                                "row": row,
+                            })
+
+                    except DeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        print(f"   ❌ 파싱 에러: {e}")
+                        continue
+        except DeadlineExceeded:
+            raise  # 마감/종료 신호는 삼키지 않고 crawl_complex 로 (그때까지 수집분 저장)
+        except Exception:
+            continue
+
+    if reused or dropped:
+        print(f"   ⏳ [Budget] 상세 패널 생략 {reused}건 (직전 스냅샷 매물번호 재사용), 미수집 {dropped}건")
+    return db_data
+
+
+def crawl_complex(driver, complex_no, trade_type, crawl_date, crawl_time, title_prefix=DEFAULT_TITLE_PREFIX, report=None,
+                  budget=None):
+    """
+    단지 페이지 접속 -> 필터 -> 스크롤 -> 추출. 0건이면 빈 리스트 반환
+    report: dict 를 넘기면 기대 매물 수 대비 수집 건수(완전성)를 채워줌
+    budget: CrawlBudget 을 넘기면 단계별 예산 안에서 축소하며 수집 (마감 시 그때까지 수집분 반환)
+    """
+    from selenium.webdriver.common.by import By
+
+    limiter = get_limiter()
+    tracer = get_tracer()
+    budget = budget or CrawlBudget()
+
+    with tracer.phase("load"):
+        budget.begin("load")
+        limiter.acquire(HOST, "page")
+        driver.get(f"{BASE_URL}/complexes/{complex_no}")
+
+        # 몇 초 안에 상태 판정: 차단/구조 변경이면 바로 예외, 매물 없는 단지면 스크롤 없이 종료
+        # (매물 없음 문구 또는 단지 API 매물 수 0 일 때만 확정)
+        landing = check_landing(driver, HOST, screenshot="debug_blocked.png",
+                                total_fn=lambda: expected_count(driver, complex_no, trade_type))
+
+    if landing.state == EMPTY:
+        print("ℹ️ 등록된 매물이 없는 단지입니다. (스크롤 생략)")
+        if report is not None:
+            report.update({"trade_type": trade_type, "collected": 0, "expected": 0, "refetched_pages": [], "complete": True,
+                           "empty": True})
+        return []
+
+    with tracer.phase("filter"):
+        apply_trade_filter(driver, trade_type)
+    with tracer.phase("scroll"):
+        budget.begin("scroll")
+        try:
+            scroll_to_end(driver, budget)
+        except DeadlineExceeded as e:
+            budget.degrade(TRUNCATE, f"스크롤 중 {e}")
+
+    if len(driver.find_elements(By.CSS_SELECTOR, "div.item:not(.item--child)")) == 0:
+        print("❌ 데이터 0건.")
+        driver.save_screenshot("debug_zero.png")
+        return []
+
+    raw = []
+    with tracer.phase("extract"):
+        budget.begin("extract")
+        known = known_articles(complex_no, trade_type) if budget.limited else {}
+        try:
+            db_data = extract_listings(driver, trade_type, crawl_date, crawl_time, title_prefix, raw=raw,
+                                       budget=budget, known=known, complex_no=complex_no)
+        except DeadlineExceeded as e:
+            # 신호/알람으로 끊긴 경우: raw 에 담긴 매물(추출 완료분)만 저장
+            budget.degrade(TRUNCATE, f"추출 중 {e}")
+            db_data = [r["row"] for r in raw]
+    save_raw_html(complex_no, trade_type, crawl_date, crawl_time, raw)
+
+    if report is not None:
+        # 화면 크롤링은 페이지 단위 재요청이 불가하므로 건수 비교 결과만 기록
+        expected = None
+        if not budget.expired():
+            with tracer.phase("verify"):
+                expected = expected_count(driver, complex_no, trade_type)
+        report.update({
+            "trade_type": trade_type,
+            "collected": len(db_data),
+            "expected": expected,
+            "refetched_pages": [],
+            "complete": not budget.partial and (expected is None or len(db_data) >= expected),
+        })
+        if not report["complete"]:
+            print(f"⚠️ [{trade_type}] 기대 {expected}건 중 {len(db_data)}건만 수집")
+
+    return db_data
+
+
+# ==================================================================
+# [공용] DB 저장
+# ==================================================================
+def save_listings(supabase, db_data, crawl_date, crawl_time, snapshot_id=None):
+    """
+    real_estate_logs 저장 + 중개업소별 건수(agent_stats) 저장 (snapshot_id: snapshot_registry 참고)
+    행에 complex_no 가 있으면 함께 저장하고 agent_stats 도 단지별로 집계 (migrations/006 전이면 빼고 저장)
+    """
+    if not db_data:
+        return
+
+    try:
+        insert_rows(supabase, 'real_estate_logs', with_snapshot_id(encode_rows(db_rows(db_data)), snapshot_id),
+                    {"complex_no": "006"})
+        print(f"✅ [Log] 총 {len(db_data)}건 저장 완료")
+    except Exception as e:
+        print(f"❌ [Log] 저장 실패: {e}")
+
+    stats_data = []
+    for (complex_no, agent), count in Counter((row.get('complex_no'), row['agent']) for row in db_data).most_common():
+        stat = {
+            "agent": agent,
+            "count": count,
+            "crawl_date": crawl_date,
+            "crawl_time": crawl_time
+        }
+        if complex_no is not None:
+            stat["complex_no"] = complex_no
+        stats_data.append(stat)
+
+    try:
+        insert_rows(supabase, 'agent_stats', with_snapshot_id(encode_rows(stats_data, fields=("agent",)), snapshot_id),
+                    {"complex_no": "006"})
+        print(f"✅ [Stats] 통계 저장 완료")
+    except Exception as e:
+        print(f"❌ [Stats] 저장 실패: {e}")
+
+
+def save_crawl_history(supabase, date, time_str, status, count=0, error_msg="", extra=None, snapshot_id=None,
+                       trade_type=None, complex_no=None):
+    """
+    crawl_history 테이블에 성공/실패 여부 기록 (crawler.py 와 동일한 스키마)
+    trade_type: 한 거래방식만 수집한 실행이면 거래방식 (여러 거래방식을 합친 결과면 None, migrations/004 참고)
+    complex_no: 한 단지만의 결과면 단지번호 (migrations/006 참고)
+    """
+    history_data = {
+        "crawl_date": date,
+        "crawl_time": time_str,
+        "status": status,
+        "collected_count": count,
+        "error_message": str(error_msg)[:1000]
+    }
+    if extra:
+        history_data.update(extra)
+    if snapshot_id is not None:
+        history_data["snapshot_id"] = snapshot_id
+    if trade_type:
+        history_data["trade_type"] = trade_type
+    if complex_no:
+        history_data["complex_no"] = str(complex_no)
+
+    try:
+        # 마이그레이션 전이면 단지/거래방식 없이라도 기록 (합친 결과로 취급됨)
+        insert_rows(supabase, "crawl_history", [history_data], {"complex_no": "006", "trade_type": "004"})
+        stream = "/".join(str(v) for v in (complex_no, trade_type) if v)
+        print(f"📝 [History] 이력 기록 완료: {status} ({count}건{', ' + stream if stream else ''})")
+    except Exception as e:
+        print(f"❌ 이력 기록 실패: {e}")
@@ -0,0 +1,271 @@
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import argparse
+from contextlib import contextmanager
+
+from config import data_path
+
+# ==================================================================
+# [계측] WebDriver 명령 단위 추적 (CRAWLER_TRACE=1 일 때만 동작)
+# ==================================================================
+# find_elements / get_attribute / execute_script / page_source / get_log 등 모든 WebDriver
+# 호출은 결국 driver.execute(command, params) 한 곳을 지나갑니다. 여기에 계측을 끼워
+#   - 명령별 호출 수 / 소요 시간 / 요청·응답 크기
+#   - 크롤링 단계(phase) 및 매물 단위 귀속
+# 을 기록하고, 프로세스 종료 시 요약 리포트와 flame graph 용 folded stack 파일을 남깁니다.
+#   data/traces/<이름>-<pid>.folded   (flamegraph.pl / speedscope 에 그대로 입력)
+#   data/traces/<이름>-<pid>.json     (요약 + 매물별 통계)
+TRACE_ENABLED = os.environ.get("CRAWLER_TRACE", "") not in ("", "0")
+TRACE_DIR = "traces"
+
+# selenium 이 내부적으로 execute_script 로 돌리는 atom 은 주석으로 이름이 붙어 있음
+_ATOM_RE = re.compile(r"^\s*/\*\s*(\w+)\s*\*/")
+
+
+def _payload_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def command_label(command, params):
+    """executeScript 는 atom 이름(getAttribute 등), CDP 명령은 메서드 이름까지 붙임"""
+    params = params or {}
+    if command in ("executeScript", "executeAsyncScript", "w3cExecuteScript", "w3cExecuteScriptAsync"):
+        match = _ATOM_RE.match(params.get("script") or "")
+        return f"executeScript:{match.group(1)}" if match else "executeScript"
+    if command == "executeCdpCommand":
+        return f"cdp:{params.get('cmd', '?')}"
+    return command
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Tracer:
+
+    def __init__(self, name=None):
+        script = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0]
+        self.name = name or re.sub(r"[^\w.-]", "", script) or "crawler"
+        self.stack = []            # 현재 단계 이름들
+        self.listing_key = None    # 현재 매물 (None 이면 매물 밖)
+        self.commands = {}         # label -> [호출 수, 총 초, 요청 바이트, 응답 바이트, 소요 목록]
+        self.folded = {}           # "단계;...;명령" -> 마이크로초
+        self.listings = {}         # 매물 키 -> [명령 수, 총 초]
+        self.phases = {}           # 단계 경로 -> 벽시계 초
+        self.started = time.perf_counter()
+        self._reported = False
+
+    # --------------------------------------------------------------
+    # 귀속 정보
+    # --------------------------------------------------------------
+    @contextmanager
+    def phase(self, name):
+        self.stack.append(name)
+        path = ";".join(self.stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[path] = self.phases.get(path, 0.0) + time.perf_counter() - started
+            self.stack.pop()
+
+    @contextmanager
+    def listing(self, key):
+        """매물 1건 처리 구간. 매물번호를 알게 되면 set_listing 으로 키를 바꿀 수 있음"""
+        prev = self.listing_key
+        self.listing_key = str(key)
+        try:
+            with self.phase("listing"):
+                yield
+        finally:
+            self.listing_key = prev
+
+    def set_listing(self, key):
+        if self.listing_key is not None and key:
+            stats = self.listings.pop(self.listing_key, None)
+            self.listing_key = str(key)
+            if stats:
+                merged = self.listings.setdefault(self.listing_key, [0, 0.0])
+                merged[0] += stats[0]
+                merged[1] += stats[1]
+
+    # --------------------------------------------------------------
+    # 기록
+    # --------------------------------------------------------------
+    def record(self, command, params, response, elapsed):
+        label = command_label(command, params)
+        stats = self.commands.setdefault(label, [0, 0.0, 0, 0, []])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += _payload_size(params)
+        stats[3] += _payload_size(response.get("value") if isinstance(response, dict) else response)
+        stats[4].append(elapsed)
+
+        frame = ";".join(self.stack + [label]) if self.stack else label
+        self.folded[frame] = self.folded.get(frame, 0) + int(elapsed * 1_000_000)
+
+        if self.listing_key is not None:
+            per = self.listings.setdefault(self.listing_key, [0, 0.0])
+            per[0] += 1
+            per[1] += elapsed
+
+    def install(self, driver):
+        """driver.execute 를 계측 버전으로 교체 (WebElement 메서드도 모두 여기를 거침)"""
+        if getattr(driver, "_trace_installed", False):
+            return driver
+        original = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = original(driver_command, params)
+                return response
+            finally:
+                self.record(driver_command, params, response, time.perf_counter() - started)
+
+        driver.execute = traced_execute
+        driver._trace_installed = True
+        return driver
+
+    # --------------------------------------------------------------
+    # 리포트
+    # --------------------------------------------------------------
+    def summary(self):
+        total = time.perf_counter() - self.started
+        commands = []
+        for label, (count, secs, req, resp, samples) in self.commands.items():
+            commands.append({
+                "command": label, "count": count, "total_s": round(secs, 3),
+                "mean_ms": round(secs / count * 1000, 2), "p95_ms": round(_percentile(samples, 0.95) * 1000, 2),
+                "request_bytes": req, "response_bytes": resp,
+            })
+        commands.sort(key=lambda c: -c["total_s"])
+
+        per_listing = list(self.listings.values())
+        listing_secs = [s for _, s in per_listing]
+        slowest = sorted(self.listings.items(), key=lambda kv: -kv[1][1])[:10]
+        return {
+            "name": self.name,
+            "wall_s": round(total, 3),
+            "driver_s": round(sum(c["total_s"] for c in commands), 3),
+            "commands": commands,
+            "phases": {k: round(v, 3) for k, v in sorted(self.phases.items())},
+            "listings": {
+                "count": len(per_listing),
+                "mean_commands": round(sum(n for n, _ in per_listing) / len(per_listing), 1) if per_listing else 0,
+                "mean_ms": round(sum(listing_secs) / len(listing_secs) * 1000, 1) if listing_secs else 0,
+                "p95_ms": round(_percentile(listing_secs, 0.95) * 1000, 1),
+                "slowest": [{"key": k, "commands": n, "ms": round(s * 1000, 1)} for k, (n, s) in slowest],
+            },
+        }
+
+    def report(self):
+        """요약 출력 + 파일 저장 (여러 번 불려도 1번만)"""
+        if self._reported or not self.commands:
+            return None
+        self._reported = True
+        summary = self.summary()
+
+        base = data_path(TRACE_DIR, f"{self.name}-{os.getpid()}")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for frame, micros in sorted(self.folded.items()):
+                f.write(f"{frame} {micros}\n")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        print_summary(summary)
+        print(f"🔬 [Trace] 저장: {base}.json / {base}.folded")
+        return base
+
+
+class NullTracer:
+    """CRAWLER_TRACE 미설정 시 사용 (아무것도 하지 않음)"""
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    @contextmanager
+    def listing(self, key):
+        yield
+
+    def set_listing(self, key):
+        pass
+
+    def install(self, driver):
+        return driver
+
+    def report(self):
+        return None
+
+
+def print_summary(summary, top=15):
+    driver_share = summary["driver_s"] / summary["wall_s"] * 100 if summary["wall_s"] else 0
+    print(f"\n🔬 [Trace] {summary['name']}: 전체 {summary['wall_s']:.1f}초 중 WebDriver {summary['driver_s']:.1f}초 ({driver_share:.0f}%)")
+    print(f"   {'명령':<36}{'횟수':>7}{'합계(초)':>10}{'평균(ms)':>10}{'p95(ms)':>10}{'응답(KB)':>10}")
+    for c in summary["commands"][:top]:
+        print(f"   {c['command'][:35]:<36}{c['count']:>7}{c['total_s']:>10.2f}{c['mean_ms']:>10.1f}{c['p95_ms']:>10.1f}{c['response_bytes'] / 1024:>10.0f}")
+    for path, secs in summary["phases"].items():
+        print(f"   [단계] {path}: {secs:.1f}초")
+    listings = summary["listings"]
+    if listings["count"]:
+        print(f"   [매물] {listings['count']}건, 건당 명령 {listings['mean_commands']}회 / 평균 {listings['mean_ms']:.0f}ms (p95 {listings['p95_ms']:.0f}ms)")
+
+
+_tracer = None
+
+
+def get_tracer():
+    """프로세스당 1개. 활성화 시 종료할 때 자동으로 리포트"""
+    global _tracer
+    if _tracer is None:
+        if TRACE_ENABLED:
+            _tracer = Tracer()
+            atexit.register(_tracer.report)
+        else:
+            _tracer = NullTracer()
+    return _tracer
+
+
+def trace_driver(driver):
+    return get_tracer().install(driver)
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="저장된 WebDriver 추적 결과 요약")
+    parser.add_argument("paths", nargs="*", help="*.json (기본: data/traces 전체)")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    paths = args.paths
+    if not paths:
+        trace_dir = os.path.dirname(data_path(TRACE_DIR, "x"))
+        paths = sorted(os.path.join(trace_dir, n) for n in os.listdir(trace_dir) if n.endswith(".json"))
+    if not paths:
+        print("⚠️ 추적 결과가 없습니다. CRAWLER_TRACE=1 로 크롤러를 실행하세요.")
+        return
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            print_summary(json.load(f), args.top)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
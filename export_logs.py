@@ -0,0 +1,253 @@
+import os
+import sys
+import csv
+import time
+import argparse
+from datetime import datetime
+
+from config import KST, COMPLEX_NO
+from db_client import get_supabase, iter_rows
+from dimensions import logs_table
+from snapshot_index import for_complex, history_key, lookup_status
+
+# ==================================================================
+# [내보내기] real_estate_logs 전체 기간 스트리밍 내보내기 (CSV / Parquet / XLSX)
+# ==================================================================
+# 대시보드 엑셀 다운로드(최대 1만 건, 31일, 브라우저 메모리)의 제약 없이 분석용 파일을 만듭니다.
+# id 커서(keyset)로 CHUNK_SIZE 건씩 받아 바로 파일에 이어 쓰므로 메모리 사용량은 일정합니다.
+# --with-status 를 주면 같은 스냅샷의 crawl_history 상태(SUCCESS/PARTIAL/FAIL, 완전성)를 붙입니다.
+# 매매/전세를 따로 수집한 스냅샷은 행의 거래방식 이력, 여러 단지를 수집한 스냅샷은 행의 단지 이력 기준입니다.
+CHUNK_SIZE = 1000
+XLSX_MAX_ROWS = 1_048_576  # 엑셀 시트 1개 최대 행 수
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _has_column(table, column):
+    try:
+        get_supabase().table(table).select(column).limit(1).execute()
+        return True
+    except Exception:
+        return False
+
+
+def build_filters(trade_type=None, date_from=None, date_to=None, complex_no=None):
+    """iter_rows 에 넘길 조건 함수"""
+    if complex_no and not _has_column(logs_table(), "complex_no"):
+        # 기존 스키마는 단지 구분 컬럼 없이 기본 단지만 저장됨
+        if str(complex_no) != COMPLEX_NO:
+            raise ValueError(f"real_estate_logs 에 complex_no 컬럼이 없어 {complex_no} 단지로 거를 수 없습니다.")
+        complex_no = None
+
+    def apply(query):
+        if trade_type:
+            query = query.eq("trade_type", trade_type)
+        if date_from:
+            query = query.gte("crawl_date", date_from)
+        if date_to:
+            query = query.lte("crawl_date", date_to)
+        if complex_no and str(complex_no) == COMPLEX_NO:
+            # 단지번호 없이 저장된 행(migrations/006 이전 저장 코드)은 기본 단지
+            query = query.or_(f"complex_no.eq.{complex_no},complex_no.is.null")
+        elif complex_no:
+            query = query.eq("complex_no", str(complex_no))
+        return query
+
+    return apply
+
+
+def load_status(date_from=None, date_to=None):
+    """기간 내 crawl_history 행 (id 순). 스냅샷 x 단지 x 거래방식 수만큼이라 작음"""
+    def apply(query):
+        if date_from:
+            query = query.gte("crawl_date", date_from)
+        if date_to:
+            query = query.lte("crawl_date", date_to)
+        return query
+
+    return list(iter_rows("crawl_history", "*", filters=apply))
+
+
+def status_map(history, complex_no):
+    """단지의 (crawl_date, crawl_time, trade_type) -> (status, is_complete) (history_key 참고)"""
+    # 같은 스냅샷/거래방식에 여러 건이면 (재시도 등) 마지막 기록 기준
+    return {history_key(row): (row.get("status"), row.get("is_complete")) for row in for_complex(history, complex_no)}
+
+
+# ==================================================================
+# [쓰기] 형식별 writer (write(chunk) 를 반복 호출 후 close)
+# ==================================================================
+class CsvWriter:
+
+    def __init__(self, path):
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        self.f = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = None
+
+    def write(self, rows):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.f, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetWriter:
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+        self.schema = None
+
+    def write(self, rows):
+        pa = self.pa
+        if self.writer is None:
+            inferred = pa.Table.from_pylist(rows).schema
+            # 첫 청크에서 전부 NULL 인 컬럼은 타입을 알 수 없으므로 문자열로 고정
+            self.schema = pa.schema([
+                pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in inferred
+            ])
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression="zstd")
+        table = pa.Table.from_pylist([{k: r.get(k) for k in self.schema.names} for r in rows], schema=self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class XlsxWriter:
+
+    def __init__(self, path, conditions=None):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("XLSX 내보내기에는 openpyxl 이 필요합니다. (pip install openpyxl)")
+        self.path = path
+        self.wb = Workbook(write_only=True)  # 행을 바로 흘려 쓰는 모드 (셀을 메모리에 들고 있지 않음)
+        self.conditions = conditions or []
+        self.columns = None
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheet_no = 0
+
+    def _new_sheet(self):
+        self.sheet_no += 1
+        self.sheet = self.wb.create_sheet(title=f"logs_{self.sheet_no}")
+        self.sheet_rows = 0
+        if self.sheet_no == 1:
+            # 대시보드 엑셀과 같이 상단에 조회 조건 기록
+            for label, value in self.conditions:
+                self.sheet.append([label, value])
+                self.sheet_rows += 1
+            if self.conditions:
+                self.sheet.append([])
+                self.sheet_rows += 1
+        self.sheet.append(self.columns)
+        self.sheet_rows += 1
+
+    def write(self, rows):
+        if self.columns is None:
+            self.columns = list(rows[0].keys())
+            self._new_sheet()
+        for row in rows:
+            if self.sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append([row.get(c) for c in self.columns])
+            self.sheet_rows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self.wb.create_sheet(title="logs_1")
+        self.wb.save(self.path)
+
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".xlsx": "xlsx"}
+
+
+def export(path, fmt=None, columns="*", trade_type=None, date_from=None, date_to=None, complex_no=None, with_status=False):
+    """조건에 맞는 real_estate_logs 를 파일로 내보내고 건수 반환"""
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS.values():
+        raise ValueError(f"지원하지 않는 형식: {path} (csv / parquet / xlsx)")
+
+    filters = build_filters(trade_type, date_from, date_to, complex_no)
+    history = load_status(date_from, date_to) if with_status else None
+    status_maps = {}
+
+    if fmt == "csv":
+        writer = CsvWriter(path)
+    elif fmt == "parquet":
+        writer = ParquetWriter(path)
+    else:
+        writer = XlsxWriter(path, [
+            ("조회 기간", f"{date_from or '처음'} ~ {date_to or '마지막'}"),
+            ("거래 유형", trade_type or "전체"),
+            ("단지", complex_no or COMPLEX_NO),
+            ("내보낸 일시", datetime.now(KST).strftime("%Y-%m-%d %H:%M")),
+        ])
+
+    total = 0
+    started = time.time()
+    try:
+        # 차원 키만 저장된 행도 이름이 보이도록 real_estate_logs_named 뷰에서 읽음 (dimensions.py)
+        for chunk in _chunks(iter_rows(logs_table(), columns, page_size=CHUNK_SIZE, filters=filters), CHUNK_SIZE):
+            if history is not None:
+                for row in chunk:
+                    row_complex = row.get("complex_no") or complex_no or COMPLEX_NO
+                    if row_complex not in status_maps:
+                        status_maps[row_complex] = status_map(history, row_complex)
+                    crawl_status, is_complete = lookup_status(
+                        status_maps[row_complex], row.get("crawl_date"), row.get("crawl_time"),
+                        row.get("trade_type") or trade_type,
+                    ) or (None, None)
+                    row["crawl_status"] = crawl_status
+                    row["crawl_is_complete"] = is_complete
+            writer.write(chunk)
+            total += len(chunk)
+            if total % (CHUNK_SIZE * 10) == 0:
+                print(f"   ... {total}건 ({time.time() - started:.0f}초)", file=sys.stderr)
+    finally:
+        writer.close()
+    return total
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="real_estate_logs 스트리밍 내보내기")
+    parser.add_argument("output", help="저장 경로 (.csv / .parquet / .xlsx)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="확장자 대신 형식 지정")
+    parser.add_argument("--columns", default="*", help="예) crawl_date,crawl_time,article_no,price")
+    parser.add_argument("--trade-type", choices=["매매", "전세", "월세"])
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    parser.add_argument("--complex", dest="complex_no")
+    parser.add_argument("--with-status", action="store_true", help="crawl_history 상태/완전성 컬럼 추가")
+    args = parser.parse_args(argv)
+
+    total = export(args.output, args.format, args.columns, args.trade_type, args.date_from, args.date_to,
+                   args.complex_no, args.with_status)
+    print(f"✅ {total}건 내보내기 완료: {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,38 +1,42 @@
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import pandas as pd
 import time
-import os
+import sys
 import random
 from datetime import datetime, timedelta, timezone
-from supabase import create_client, Client
-from pyvirtualdisplay import Display 
+
+from config import LAND_BASE_URL
 
 # ==================================================================
 # [설정] 환경변수
 # ==================================================================
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 COMPLEX_NO = "108064"
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("❌ Supabase 설정이 없습니다.")
-    exit()
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+BASE_URL = LAND_BASE_URL  # sim_server.py 로 돌릴 때의 주소 변경은 config.py 한 곳에서
 
 KST = timezone(timedelta(hours=9))
-NOW = datetime.now(KST)
-TODAY_STR = NOW.strftime("%Y-%m-%d")
-HOUR_STR = NOW.strftime("%H")
 
 def run_crawler():
-    print(f"🚀 [GitHub Actions] {TODAY_STR} {HOUR_STR}시 크롤링 시작...")
+    # 브라우저/DB 라이브러리와 클라이언트는 실행 시점에 준비 (import 만으로는 부작용 없음)
+    from db_client import supabase_settings, get_supabase
+
+    supabase_url, supabase_key = supabase_settings()
+    if not supabase_url or not supabase_key:
+        print("❌ Supabase 설정이 없습니다.")
+        return
+
+    import undetected_chromedriver as uc
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from bs4 import BeautifulSoup
+    import pandas as pd
+    from pyvirtualdisplay import Display
+
+    supabase = get_supabase()
+    now = datetime.now(KST)
+    crawl_date = now.strftime("%Y-%m-%d")
+    crawl_time = f"{now.strftime('%H')}시"
+    print(f"🚀 [GitHub Actions] {crawl_date} {crawl_time} 크롤링 시작...")
 
     display = Display(visible=0, size=(1920, 1080))
     display.start()
@@ -54,7 +58,7 @@ def run_crawler():
     })
     
     try:
-        driver.get(f"https://new.land.naver.com/complexes/{COMPLEX_NO}")
+        driver.get(f"{BASE_URL}/complexes/{COMPLEX_NO}")
         
         try: WebDriverWait(driver, 40).until(EC.presence_of_element_located((By.ID, "complex_article_trad_type_filter_0")))
         except: pass
@@ -208,7 +212,7 @@ def run_crawler():
                     
                     db_data.append({
                         "agent": agent, "dong": dong, "spec": spec, "price": price,
-                        "article_no": article_no, "crawl_date": TODAY_STR, "crawl_time": f"{HOUR_STR}시"
+                        "article_no": article_no, "crawl_date": crawl_date, "crawl_time": crawl_time
                     })
 
 
@@ -231,7 +235,7 @@ def run_crawler():
                     
                     # db_data.append({
                     #     "agent": agent, "dong": dong, "spec": spec, "price": price,
-                    #     "article_no": article_no, "crawl_date": TODAY_STR, "crawl_time": f"{HOUR_STR}시"
+                    #     "article_no": article_no, "crawl_date": crawl_date, "crawl_time": crawl_time
                     # })
             except: continue
         
@@ -256,8 +260,8 @@ def run_crawler():
                 stats_data.append({
                     "agent": row['agent'],
                     "count": int(row['count']),
-                    "crawl_date": TODAY_STR,
-                    "crawl_time": f"{HOUR_STR}시"
+                    "crawl_date": crawl_date,
+                    "crawl_time": crawl_time
                 })
             
             try:
@@ -273,5 +277,9 @@ def run_crawler():
     finally:
         display.stop()
 
+def main(argv=None):
+    run_crawler()
+
+
 if __name__ == "__main__":
-    run_crawler()
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
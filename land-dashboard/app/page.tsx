@@ -134,8 +134,9 @@ export default function Dashboard() {
   const fetchAllData = async () => {
     setLoading(true);
     try {
+      // 동/중개업소/제공업체는 차원 키(*_id)로만 저장되므로 이름을 조인한 뷰에서 조회 (migrations/005)
       let query = supabase
-        .from("real_estate_logs")
+        .from("real_estate_logs_named")
         .select("*")
         .gte("crawl_date", startDate)
         .lte("crawl_date", endDate)
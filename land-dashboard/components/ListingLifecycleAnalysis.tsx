@@ -33,7 +33,8 @@ interface Props {}
 interface CrawlHistoryLog {
   crawl_date: string;
   crawl_time: string;
-  status: "SUCCESS" | "FAIL";
+  status: "SUCCESS" | "PARTIAL" | "FAIL";
+  trade_type?: string | null; // 매매/전세를 따로 수집한 실행의 거래방식 (여러 거래방식을 합친 이력은 null)
 }
 
 interface TimelineItem {
@@ -128,7 +129,8 @@ export default function ListingLifecycleAnalysis({}: Props) {
       const term = searchTerm ? searchTerm.trim() : "";
       
       // [최적화] 조건에 맞는 모든 데이터를 한 번에 가져와서 메모리에서 필터링함 (RPC 사용 안 함)
-      let query = supabase.from("real_estate_logs").select("*").order("id", { ascending: false });
+      // 동/중개업소/제공업체는 차원 키(*_id)로만 저장되므로 이름을 조인한 뷰에서 조회 (migrations/005)
+      let query = supabase.from("real_estate_logs_named").select("*").order("id", { ascending: false });
       
       // 1. 검색어가 있을 때 (날짜 무시하고 전체 DB 검색)
       if (term.length > 0) {
@@ -145,11 +147,10 @@ export default function ListingLifecycleAnalysis({}: Props) {
 
       const historyQuery = supabase
         .from("crawl_history")
-        .select("crawl_date, crawl_time, status")
+        .select("crawl_date, crawl_time, status, trade_type")
         .gte("crawl_date", localStartDate)
         .lte("crawl_date", localEndDate)
-        .order("crawl_date", { ascending: false })
-        .order("crawl_time", { ascending: false });
+        .order("id", { ascending: true }); // 같은 스냅샷/거래방식에 여러 건이면 마지막 기록 기준
 
       const [logsResult, historyResult] = await Promise.all([query, historyQuery]);
 
@@ -172,18 +173,40 @@ export default function ListingLifecycleAnalysis({}: Props) {
   const analyzedData = useMemo(() => {
     if (logs.length === 0 || crawlHistory.length === 0) return [];
 
+    // 'HH시' / 'HH:MM' 이 섞여 있으므로 'HH:MM' 으로 맞춰 비교 (snapshot_index.snapshot_sort_key 와 같은 규칙)
+    const normalizeTime = (t: string) => {
+      const v = String(t).trim();
+      if (v.endsWith("시")) return `${v.slice(0, -1).padStart(2, "0")}:00`;
+      if (v.includes(":")) {
+        const [hh, mm] = v.split(":");
+        return `${hh.padStart(2, "0")}:${mm.slice(0, 2).padStart(2, "0")}`;
+      }
+      return v;
+    };
+
     // 1. 전체 크롤링 시간표 생성 (Snapshot 기준: 최신 -> 과거)
-    const uniqueSnapshots = crawlHistory.map(h => `${h.crawl_date}|${h.crawl_time}`);
+    const uniqueSnapshots = Array.from(new Set(crawlHistory.map(h => `${h.crawl_date}|${h.crawl_time}`)));
     uniqueSnapshots.sort((a, b) => {
       const [dateA, timeA] = a.split("|"); const [dateB, timeB] = b.split("|");
       if (dateA !== dateB) return dateB.localeCompare(dateA);
-      return timeB.localeCompare(timeA);
+      return normalizeTime(timeB).localeCompare(normalizeTime(timeA));
     });
 
-    const historyStatusMap = new Map<string, "SUCCESS" | "FAIL">();
+    // 스냅샷|거래방식 -> 상태 (합친 이력은 거래방식 자리가 빈 문자열)
+    const historyStatusMap = new Map<string, "SUCCESS" | "PARTIAL" | "FAIL">();
     crawlHistory.forEach(h => {
-        historyStatusMap.set(`${h.crawl_date}|${h.crawl_time}`, h.status);
+        historyStatusMap.set(`${h.crawl_date}|${h.crawl_time}|${h.trade_type || ""}`, h.status);
     });
+    const TRADE_TYPES = ["매매", "전세", "월세"];
+    // 매물 거래방식의 이력 -> 없으면 합친 이력 -> 다른 거래방식 이력만 있으면 이 거래방식은 수집하지 않은 것(FAIL)
+    const snapshotStatus = (snapshotKey: string, tradeType: string) => {
+        const own = historyStatusMap.get(`${snapshotKey}|${tradeType}`);
+        if (own) return own;
+        const combined = historyStatusMap.get(`${snapshotKey}|`);
+        if (combined) return combined;
+        if (TRADE_TYPES.some(t => t !== tradeType && historyStatusMap.has(`${snapshotKey}|${t}`))) return "FAIL";
+        return undefined;
+    };
 
     const groups: Record<string, RealEstateLog[]> = {};
     logs.forEach((log) => {
@@ -197,7 +220,7 @@ export default function ListingLifecycleAnalysis({}: Props) {
       // 매물 로그 날짜순 정렬 (과거 -> 최신)
       items.sort((a, b) => {
         if (a.crawl_date !== b.crawl_date) return a.crawl_date.localeCompare(b.crawl_date);
-        return a.crawl_time.localeCompare(b.crawl_time);
+        return normalizeTime(a.crawl_time).localeCompare(normalizeTime(b.crawl_time));
       });
 
       const firstItem = items[0]; // DB에 기록된 최초 데이터
@@ -239,12 +262,13 @@ export default function ListingLifecycleAnalysis({}: Props) {
       const rawTimeline: TimelineItem[] = uniqueSnapshots.map((snapshotKey) => {
           const [sDate, sTime] = snapshotKey.split("|");
           const log = items.find((i) => i.crawl_date === sDate && i.crawl_time === sTime);
-          const serverStatus = historyStatusMap.get(snapshotKey);
+          const serverStatus = snapshotStatus(snapshotKey, lastItem.trade_type);
 
           if (log) {
             return { full_key: snapshotKey, date: sDate, time: sTime, status: "collected", price: log.price, agent: log.agent, dong: log.dong, count: 1 };
           } else {
-            if (serverStatus === "FAIL") {
+            // PARTIAL: 마감 예산으로 일부만 수집한 스냅샷이라 안 보여도 누락으로 단정할 수 없음
+            if (serverStatus === "FAIL" || serverStatus === "PARTIAL") {
                 return { full_key: snapshotKey, date: sDate, time: sTime, status: "failed", count: 1 };
             } else {
                 return { full_key: snapshotKey, date: sDate, time: sTime, status: "missing", count: 1 };
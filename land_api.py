@@ -0,0 +1,102 @@
+import json
+import time
+from urllib.parse import urlencode, urlparse
+
+from config import COMPLEX_NO, LAND_BASE_URL
+from rate_limiter import get_limiter, classify_response, BLOCKED, BlockedError
+
+# ==================================================================
+# [공용] 브라우저 세션을 통한 네이버 부동산 API 호출
+# ==================================================================
+# 사이트 API 는 페이지 스크립트가 붙이는 authorization 헤더가 있어야 응답합니다.
+# 페이지가 로드되기 전에 XHR/fetch 훅을 심어 그 헤더를 window.__landAuth 에 저장해 두고,
+# 이후 같은 탭 안에서 fetch() 로 직접 호출합니다. (쿠키/Referer 도 그대로 사용)
+BASE_URL = LAND_BASE_URL
+HOST = urlparse(BASE_URL).netloc
+
+_AUTH_HOOK = """
+(function() {
+    const save = (k, v) => { if (k && String(k).toLowerCase() === 'authorization' && v) window.__landAuth = v; };
+    const origSet = XMLHttpRequest.prototype.setRequestHeader;
+    XMLHttpRequest.prototype.setRequestHeader = function(k, v) { save(k, v); return origSet.apply(this, arguments); };
+    const origFetch = window.fetch;
+    window.fetch = function(input, init) {
+        try {
+            const h = (init && init.headers) || {};
+            if (h instanceof Headers) h.forEach((v, k) => save(k, v));
+            else Object.keys(h).forEach(k => save(k, h[k]));
+        } catch (e) {}
+        return origFetch.apply(this, arguments);
+    };
+})();
+"""
+
+_FETCH_SCRIPT = """
+const [url, done] = [arguments[0], arguments[arguments.length - 1]];
+const headers = { 'accept': 'application/json' };
+if (window.__landAuth) headers['authorization'] = window.__landAuth;
+fetch(url, { headers: headers, credentials: 'include' })
+    .then(r => r.text().then(body => done({ status: r.status, body: body })))
+    .catch(e => done({ status: 0, body: String(e) }));
+"""
+
+
+class LandApiError(Exception):
+    def __init__(self, status, path, body=""):
+        super().__init__(f"API 호출 실패 ({status}) {path} {str(body)[:200]}")
+        self.status = status
+        self.path = path
+
+
+def install_auth_hook(driver):
+    """페이지 로드 전에 호출해야 함 (새 문서마다 자동 삽입)"""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _AUTH_HOOK})
+
+
+def wait_for_auth(driver, timeout=10):
+    """페이지 스크립트가 API 를 한 번 호출해 헤더가 잡힐 때까지 대기"""
+    end = time.time() + timeout
+    while time.time() < end:
+        if driver.execute_script("return window.__landAuth || null;"):
+            return True
+        time.sleep(0.3)
+    return False
+
+
+def fetch_url(driver, url, timeout=20):
+    """같은 탭에서 전체 URL 로 GET 호출 -> JSON. 2xx 가 아니면 LandApiError, 차단이면 BlockedError"""
+    limiter = get_limiter()
+    host = urlparse(url).netloc
+    limiter.acquire(host, "api")
+
+    driver.set_script_timeout(timeout)
+    result = driver.execute_async_script(_FETCH_SCRIPT, url)
+    status = result.get("status", 0)
+
+    outcome = classify_response(status, result.get("body")) if status else "THROTTLED"
+    limiter.feedback(host, "api", outcome)
+    if outcome == BLOCKED:
+        raise BlockedError(f"API 차단 응답 ({status}) {url}")
+    if not 200 <= status < 300:
+        raise LandApiError(status, url, result.get("body"))
+    try:
+        return json.loads(result["body"])
+    except ValueError:
+        raise LandApiError(status, url, result.get("body"))
+
+
+def fetch_json(driver, path, params=None, timeout=20):
+    """BASE_URL 기준 경로로 GET 호출 -> JSON"""
+    url = f"{BASE_URL}{path}"
+    if params:
+        url += "?" + urlencode(params)
+    return fetch_url(driver, url, timeout)
+
+
+def open_session(driver, landing_complex_no=COMPLEX_NO):
+    """API 호출용 세션 준비 (단지 페이지를 한 번 열어 쿠키/헤더 확보)"""
+    install_auth_hook(driver)
+    driver.get(f"{BASE_URL}/complexes/{landing_complex_no}")
+    if not wait_for_auth(driver):
+        print("   ⚠️ authorization 헤더를 확보하지 못했습니다. (헤더 없이 호출)")
+    return driver
@@ -0,0 +1,326 @@
+import sys
+import sqlite3
+import argparse
+
+from config import COMPLEX_NO, data_path
+from change_events import normalize_price, price_to_manwon
+from dimensions import NAMED_LOGS
+from snapshot_index import for_complex, history_key, lookup_status, snapshot_order
+
+# ==================================================================
+# [생애주기] 매물별 상태를 크롤링 1회마다 한 번씩만 갱신
+# ==================================================================
+# ListingLifecycleAnalysis.tsx 는 화면을 그릴 때마다 매물 전체 이력을 다시 훑어
+# "수집 -> 누락 -> 수집"(실패 스냅샷은 건너뜀) 이면 재등록으로 판정합니다.
+# 여기서는 매물마다 상태 레코드를 저장해 두고 스냅샷이 들어올 때마다 앞으로만 진행시킵니다.
+#   SUCCESS (완전)  : 이번에 본 매물은 active (missing 이었으면 재등록 +1), 못 본 active 매물은 missing
+#   SUCCESS (불완전) / PARTIAL : 본 매물만 갱신 (빠진 매물을 누락으로 보지 않음)
+#   FAIL            : 스냅샷 수만 늘리고 매물 상태는 그대로 (화면 규칙과 동일하게 건너뜀)
+# 스냅샷당 비용은 (이번 수집 건수 + active 매물 수) 이며 이력 길이와 무관합니다.
+# 같은 스냅샷은 한 번만 반영되고(processed), 이미 반영한 것보다 이전 스냅샷은 무시합니다.
+# 스냅샷 순서는 정수 snapshot_id (migrations/003) 로 비교하고, id 가 없던 시기의 기록만 (날짜, 시각) 으로 비교합니다.
+STATE_FILE = "lifecycle_state.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    complex_no TEXT, trade_type TEXT, article_no TEXT,
+    stage TEXT,                 -- active / missing
+    seen_count INTEGER,
+    first_seen TEXT, last_seen TEXT,
+    missing_since INTEGER,      -- 누락된 완전 스냅샷 순번 (missing 일 때만)
+    relist_count INTEGER,
+    first_price TEXT, last_price TEXT, price_changed INTEGER,
+    agent TEXT, dong TEXT, spec TEXT,
+    last_seen_id INTEGER,       -- last_seen 스냅샷의 snapshot_id
+    PRIMARY KEY (complex_no, trade_type, article_no)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_stage ON articles (complex_no, trade_type, stage);
+CREATE TABLE IF NOT EXISTS streams (
+    complex_no TEXT, trade_type TEXT,
+    last_date TEXT, last_time TEXT,
+    snapshots INTEGER,          -- 반영한 스냅샷 수 (실패 포함)
+    success_seq INTEGER,        -- 반영한 완전 스냅샷 수
+    last_snapshot_id INTEGER,
+    PRIMARY KEY (complex_no, trade_type)
+);
+CREATE TABLE IF NOT EXISTS processed (
+    complex_no TEXT, trade_type TEXT, crawl_date TEXT, crawl_time TEXT, status TEXT,
+    PRIMARY KEY (complex_no, trade_type, crawl_date, crawl_time)
+);
+"""
+# 이 컬럼들이 생기기 전에 만든 파일은 열 때 컬럼 추가
+ADDED_COLUMNS = {"articles": ("last_seen_id",), "streams": ("last_snapshot_id",)}
+
+
+def price_direction(first_price, last_price, price_changed):
+    """대시보드 priceDirection 과 같은 규칙"""
+    initial, current = price_to_manwon(first_price), price_to_manwon(last_price)
+    if current > initial:
+        return "up"
+    if current < initial:
+        return "down"
+    return "fluctuated" if price_changed else "same"
+
+
+class LifecycleState:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(STATE_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {r["name"] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column in columns:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+
+    def close(self):
+        self.conn.close()
+
+    def _stream(self, key):
+        row = self.conn.execute(
+            "SELECT last_date, last_time, snapshots, success_seq, last_snapshot_id FROM streams "
+            "WHERE complex_no = ? AND trade_type = ?", key).fetchone()
+        return dict(row) if row else {"last_date": None, "last_time": None, "snapshots": 0, "success_seq": 0,
+                                      "last_snapshot_id": None}
+
+    @staticmethod
+    def _stream_order(stream):
+        """스트림에 마지막으로 반영한 스냅샷의 정렬 키 (아직 없으면 None)"""
+        if stream["last_date"] is None:
+            return None
+        return snapshot_order({"crawl_date": stream["last_date"], "crawl_time": stream["last_time"],
+                               "snapshot_id": stream["last_snapshot_id"]})
+
+    @staticmethod
+    def _seen_order(row):
+        date, time_str = row["last_seen"].split(" ", 1)
+        return snapshot_order({"crawl_date": date, "crawl_time": time_str, "snapshot_id": row["last_seen_id"]})
+
+    # --------------------------------------------------------------
+    # 스냅샷 반영
+    # --------------------------------------------------------------
+    def advance(self, complex_no, trade_type, crawl_date, crawl_time, status, rows=(), complete=True, snapshot_id=None):
+        """스냅샷 1개 반영. 반환: 전이 건수 dict (이미 반영했거나 순서가 뒤면 None)"""
+        key = (str(complex_no), trade_type)
+        snapshot = (crawl_date, crawl_time)
+        if self.conn.execute(
+                "SELECT 1 FROM processed WHERE complex_no = ? AND trade_type = ? AND crawl_date = ? AND crawl_time = ?",
+                key + snapshot).fetchone():
+            return None
+        stream = self._stream(key)
+        last = self._stream_order(stream)
+        if last is not None and snapshot_order(
+                {"crawl_date": crawl_date, "crawl_time": crawl_time, "snapshot_id": snapshot_id}) < last:
+            print(f"   ⚠️ [Lifecycle] {key[0]}/{trade_type} {crawl_date} {crawl_time}: 이미 반영한 스냅샷보다 이전이라 건너뜀")
+            return None
+
+        counts = {"new": 0, "seen": 0, "relisted": 0, "missing": 0}
+        seen_at = f"{crawl_date} {crawl_time}"
+        full = status == "SUCCESS" and complete
+        stream["snapshots"] += 1
+        if full:
+            stream["success_seq"] += 1
+
+        with self.conn:
+            if status != "FAIL":
+                current = {}
+                for row in rows:
+                    article_no = row.get("article_no")
+                    if article_no and article_no != "-":
+                        current[article_no] = row
+
+                ids = list(current)
+                known = {}
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    marks = ",".join("?" * len(chunk))
+                    for r in self.conn.execute(
+                            f"SELECT * FROM articles WHERE complex_no = ? AND trade_type = ? AND article_no IN ({marks})",
+                            list(key) + chunk):
+                        known[r["article_no"]] = r
+
+                for article_no, row in current.items():
+                    price = row.get("price") or ""
+                    prev = known.get(article_no)
+                    if prev is None:
+                        counts["new"] += 1
+                        self.conn.execute(
+                            "INSERT INTO articles (complex_no, trade_type, article_no, stage, seen_count, first_seen, last_seen, "
+                            "missing_since, relist_count, first_price, last_price, price_changed, agent, dong, spec, last_seen_id) "
+                            "VALUES (?, ?, ?, 'active', 1, ?, ?, NULL, 0, ?, ?, 0, ?, ?, ?, ?)",
+                            key + (article_no, seen_at, seen_at, price, price, row.get("agent"), row.get("dong"), row.get("spec"),
+                                   snapshot_id))
+                        continue
+
+                    relisted = prev["stage"] == "missing"
+                    counts["relisted" if relisted else "seen"] += 1
+                    changed = prev["price_changed"] or normalize_price(prev["last_price"]) != normalize_price(price)
+                    self.conn.execute(
+                        "UPDATE articles SET stage = 'active', seen_count = seen_count + 1, last_seen = ?, last_seen_id = ?, "
+                        "missing_since = NULL, relist_count = relist_count + ?, last_price = ?, price_changed = ?, "
+                        "agent = ?, dong = ?, spec = ? "
+                        "WHERE complex_no = ? AND trade_type = ? AND article_no = ?",
+                        (seen_at, snapshot_id, int(relisted), price, int(bool(changed)), row.get("agent"), row.get("dong"),
+                         row.get("spec")) + key + (article_no,))
+
+                if full:
+                    gone = [r[0] for r in self.conn.execute(
+                        "SELECT article_no FROM articles WHERE complex_no = ? AND trade_type = ? AND stage = 'active'", key)
+                        if r[0] not in current]
+                    counts["missing"] = len(gone)
+                    self.conn.executemany(
+                        "UPDATE articles SET stage = 'missing', missing_since = ? "
+                        "WHERE complex_no = ? AND trade_type = ? AND article_no = ?",
+                        [(stream["success_seq"],) + key + (a,) for a in gone])
+
+            self.conn.execute("INSERT INTO processed VALUES (?, ?, ?, ?, ?)", key + snapshot + (status,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO streams (complex_no, trade_type, last_date, last_time, snapshots, success_seq, "
+                "last_snapshot_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + snapshot + (stream["snapshots"], stream["success_seq"], snapshot_id))
+        return counts
+
+    # --------------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------------
+    def _present(self, row, stream):
+        item = dict(row)
+        missing = item["stage"] == "missing"
+        if missing:
+            status = "deleted"
+        elif item["seen_count"] == 1 and stream["snapshots"] > 1:
+            status = "new"
+        else:
+            status = "active"
+        item.update(
+            status=status,
+            is_relisted=not missing and item["relist_count"] > 0,
+            missing_streak=stream["success_seq"] - item["missing_since"] + 1 if missing else 0,
+            price_direction=price_direction(item["first_price"], item["last_price"], item["price_changed"]),
+            price_changed=bool(item["price_changed"]),
+        )
+        return item
+
+    def listings(self, complex_no=COMPLEX_NO, trade_type=None, stage=None):
+        sql = "SELECT * FROM articles WHERE complex_no = ?"
+        params = [str(complex_no)]
+        if trade_type:
+            sql += " AND trade_type = ?"
+            params.append(trade_type)
+        if stage:
+            sql += " AND stage = ?"
+            params.append(stage)
+        streams = {}
+        result = []
+        # last_seen 문자열('HH시' / 'HH:MM')이 아니라 snapshot_id 순서로 최근 본 매물부터
+        for row in sorted(self.conn.execute(sql, params), key=self._seen_order, reverse=True):
+            stream_key = (row["complex_no"], row["trade_type"])
+            if stream_key not in streams:
+                streams[stream_key] = self._stream(stream_key)
+            result.append(self._present(row, streams[stream_key]))
+        return result
+
+    def article(self, article_no, complex_no=COMPLEX_NO):
+        return [self._present(r, self._stream((r["complex_no"], r["trade_type"]))) for r in self.conn.execute(
+            "SELECT * FROM articles WHERE complex_no = ? AND article_no = ?", (str(complex_no), article_no))]
+
+    # --------------------------------------------------------------
+    # 로컬 미러에서 따라잡기 (crawl_history 순서대로)
+    # --------------------------------------------------------------
+    def sync_from_mirror(self, mirror, complex_no=COMPLEX_NO):
+        # 이 단지의 행/이력만 (다른 단지 이력이 이 단지 스트림을 진행시키지 않도록, migrations/006)
+        complex_col = mirror.complex_column()
+        trade_types = [r["trade_type"] for r in mirror.query(
+            f"SELECT DISTINCT trade_type FROM {NAMED_LOGS} WHERE trade_type IS NOT NULL AND {complex_col} = ?",
+            (str(complex_no),))]
+        statuses, order = {}, {}
+        for h in sorted(for_complex(mirror.snapshots(), complex_no), key=lambda h: h["id"]):
+            # 같은 스냅샷/거래방식이 여러 번 기록되면 (재시도 등) 마지막 기록 기준
+            statuses[history_key(h)] = h
+            order.setdefault((h["crawl_date"], h["crawl_time"]), snapshot_order(h))
+
+        applied = 0
+        for trade_type in trade_types:
+            last = self._stream_order(self._stream((str(complex_no), trade_type)))
+            # 문자열 키가 아니라 이력의 snapshot_id 순서로 진행
+            for snapshot in sorted(order, key=order.get):
+                if last is not None and order[snapshot] <= last:
+                    continue
+                # 이 거래방식의 이력 (다른 거래방식만 기록된 스냅샷은 크롤러처럼 이 스트림을 진행하지 않음)
+                h = lookup_status(statuses, snapshot[0], snapshot[1], trade_type)
+                if h is None:
+                    continue
+                complete = h.get("is_complete") is None or bool(h["is_complete"])
+                rows = [] if h["status"] == "FAIL" else mirror.query(
+                    f"SELECT article_no, price, agent, dong, spec FROM {NAMED_LOGS} "
+                    f"WHERE crawl_date = ? AND crawl_time = ? AND trade_type = ? AND {complex_col} = ?",
+                    snapshot + (trade_type, str(complex_no)))
+                if self.advance(complex_no, trade_type, snapshot[0], snapshot[1], h["status"], rows, complete,
+                                h.get("snapshot_id")) is not None:
+                    applied += 1
+        return applied
+
+
+def advance_lifecycle(complex_no, trade_type, crawl_date, crawl_time, status, rows=(), complete=True, snapshot_id=None):
+    """크롤러에서 호출하는 단축 함수 (실패해도 저장을 막지 않도록 예외 흡수)"""
+    try:
+        state = LifecycleState()
+        try:
+            counts = state.advance(complex_no, trade_type, crawl_date, crawl_time, status, rows, complete, snapshot_id)
+        finally:
+            state.close()
+        if counts is not None:
+            print(f"🧬 [Lifecycle] {complex_no}/{trade_type} {status}: " + ", ".join(f"{k} {v}" for k, v in counts.items()))
+        return counts
+    except Exception as e:
+        print(f"❌ [Lifecycle] 상태 갱신 실패: {e}")
+        return None
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="매물 생애주기 상태")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("sync", help="로컬 미러의 crawl_history 순서대로 따라잡기")
+    p_list = sub.add_parser("list", help="매물 상태 목록")
+    p_list.add_argument("--trade-type", choices=["매매", "전세", "월세"])
+    p_list.add_argument("--status", choices=["active", "new", "deleted", "relisted"])
+    p_list.add_argument("--limit", type=int, default=50)
+    p_show = sub.add_parser("show", help="매물 1건")
+    p_show.add_argument("article_no")
+    for p in (sub.choices["sync"], p_list, p_show):
+        p.add_argument("--complex", dest="complex_no", default=COMPLEX_NO)
+    args = parser.parse_args(argv)
+
+    state = LifecycleState()
+    try:
+        if args.cmd == "sync":
+            from local_mirror import LocalMirror
+            mirror = LocalMirror()
+            try:
+                applied = state.sync_from_mirror(mirror, args.complex_no)
+            finally:
+                mirror.close()
+            print(f"🧬 [Lifecycle] 스냅샷 {applied}개 반영")
+        elif args.cmd == "list":
+            rows = state.listings(args.complex_no, args.trade_type)
+            if args.status == "relisted":
+                rows = [r for r in rows if r["is_relisted"]]
+            elif args.status:
+                rows = [r for r in rows if r["status"] == args.status]
+            for r in rows[:args.limit]:
+                print(f"{r['article_no']}\t{r['trade_type']}\t{r['status']}\t재등록 {r['relist_count']}\t누락 {r['missing_streak']}\t"
+                      f"{r['first_price']} -> {r['last_price']} ({r['price_direction']})\t{r['last_seen']}\t{r['agent']}")
+            print(f"-- {len(rows)}건", file=sys.stderr)
+        elif args.cmd == "show":
+            for r in state.article(args.article_no, args.complex_no):
+                print(r)
+    finally:
+        state.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,165 @@
+# ==================================================================
+# [파싱 규칙] 목록/상세 HTML -> 필드 (파서 백엔드 교체 가능)
+# ==================================================================
+# dom_crawler.py (실시간 수집)와 reparse.py (저장된 HTML 재파싱)가 같은 규칙을 씁니다.
+# 기본 백엔드는 기존과 동일한 BeautifulSoup("html.parser") 이고,
+# lxml / selectolax 가 설치되어 있으면 더 빠른 백엔드로 바꿔 돌릴 수 있습니다.
+
+
+class Bs4Backend:
+
+    def __init__(self, features="html.parser"):
+        from bs4 import BeautifulSoup
+
+        self.name = "bs4" if features == "html.parser" else f"bs4-{features}"
+        self._soup = BeautifulSoup
+        self.features = features
+
+    def parse(self, html):
+        return self._soup(html, self.features)
+
+    def first(self, node, css):
+        return node.select_one(css)
+
+    def all(self, node, css):
+        return node.select(css)
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+
+        self._html = lxml.html
+        self._selector = CSSSelector
+        self._cache = {}
+
+    def parse(self, html):
+        return self._html.document_fromstring(html or "<html></html>")
+
+    def _compiled(self, css):
+        if css not in self._cache:
+            self._cache[css] = self._selector(css)
+        return self._cache[css]
+
+    def first(self, node, css):
+        found = self._compiled(css)(node)
+        return found[0] if found else None
+
+    def all(self, node, css):
+        return self._compiled(css)(node)
+
+    def text(self, node):
+        return "".join(s.strip() for s in node.itertext())
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:  # lexbor 백엔드가 없는 구버전
+            from selectolax.parser import HTMLParser
+
+        self._parser = HTMLParser
+
+    def parse(self, html):
+        return self._parser(html or "")
+
+    def first(self, node, css):
+        return node.css_first(css)
+
+    def all(self, node, css):
+        return node.css(css)
+
+    def text(self, node):
+        return node.text(deep=True, separator="", strip=True)
+
+
+BACKENDS = {
+    "bs4": lambda: Bs4Backend("html.parser"),
+    "bs4-lxml": lambda: Bs4Backend("lxml"),
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name="bs4"):
+    if name not in _instances:
+        if name not in BACKENDS:
+            raise ValueError(f"알 수 없는 파서 백엔드: {name} ({', '.join(BACKENDS)})")
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def _first_text(backend, doc, css, default=None):
+    node = backend.first(doc, css)
+    return backend.text(node) if node is not None else default
+
+
+# ==================================================================
+# [규칙] 필드 추출
+# ==================================================================
+def parse_group(html, backend=None):
+    """목록 그룹(div.item) -> 제목(동 포함), 스펙. 제목이 없으면 title=None"""
+    backend = backend or get_backend()
+    doc = backend.parse(html)
+    return {
+        "title": _first_text(backend, doc, "div.item_title > span.text"),
+        "spec": _first_text(backend, doc, "div.info_area .spec", ""),
+    }
+
+
+def parse_confirm_date(raw_text):
+    """'확인매물 25.11.29.' -> '2025-11-29' (형식이 다르면 None)"""
+    date_part = raw_text.replace("확인매물", "").strip().rstrip(".")
+    parts = date_part.split('.')
+    if len(parts) == 3:
+        yy, mm, dd = parts
+        full_year = f"20{yy}" if len(yy) == 2 else yy
+        return f"{full_year}-{mm}-{dd}"
+    return None
+
+
+def parse_item(html, backend=None):
+    """개별 매물(div.item_inner) -> 중개업소, 가격, 집주인 인증, 확인매물 날짜, 매물 특징(설명)"""
+    backend = backend or get_backend()
+    doc = backend.parse(html)
+
+    agents = backend.all(doc, "a.agent_name")
+    owner_text = _first_text(backend, doc, ".icon-badge.type-owner")
+    confirm_text = _first_text(backend, doc, ".icon-badge.type-confirmed")
+
+    return {
+        "agent": backend.text(agents[-1]) if agents else "알수없음",
+        "price": _first_text(backend, doc, "span.price", ""),
+        "is_landlord": bool(owner_text and "집주인" in owner_text),
+        "verification_date": parse_confirm_date(confirm_text) if confirm_text else None,
+        "description": _first_text(backend, doc, "div.info_area p.line span.text", ""),
+    }
+
+
+def parse_detail(html, backend=None):
+    """상세 패널(div.detail_contents_inner) -> 매물번호 (없으면 None)"""
+    if not html:
+        return {"article_no": None}
+    backend = backend or get_backend()
+    doc = backend.parse(html)
+
+    for row in backend.all(doc, "tr.info_table_item"):
+        th = backend.first(row, "th")
+        if th is not None and "매물번호" in backend.text(th):
+            td = backend.first(row, "td")
+            if td is not None:
+                txt = backend.text(td)
+                if txt:
+                    return {"article_no": txt}
+    return {"article_no": None}
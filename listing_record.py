@@ -0,0 +1,187 @@
+import sys
+
+# ==================================================================
+# [레코드] articleList 아이템 -> Listing (슬롯 객체) / ListingBatch (컬럼형)
+# ==================================================================
+# API 응답 dict 를 그대로 들고 다니지 않고, 실제로 쓰는 필드만 꺼내 검증합니다.
+# 중개업소/동/제공업체처럼 반복되는 문자열은 sys.intern 으로 한 번만 메모리에 둡니다.
+# 저장은 ListingBatch 의 컬럼에서 real_estate_logs 행을 바로 만듭니다. (Listing -> 행 dict -> 저장용 사본 단계 없이)
+TRADE_TYPES = ("매매", "전세", "월세")
+# 행에는 싣지만 real_estate_logs 에는 저장하지 않는 필드 (매물 설명은 near_duplicates.py 가 로컬 보관)
+LOCAL_FIELDS = ("description",)
+
+
+class ListingDecodeError(ValueError):
+    pass
+
+
+def _text(item, key, required=False, intern=False):
+    """문자열 필드 검증 (숫자는 문자열로 변환, 없으면 '' / 필수면 예외)"""
+    value = item.get(key)
+    if value is None or value == "":
+        if required:
+            raise ListingDecodeError(f"필수 필드 누락: {key}")
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ListingDecodeError(f"{key} 형식 오류: {value!r}")
+    value = str(value).strip()
+    return sys.intern(value) if intern else value
+
+
+def _spec(area_name, area_ex, floor, direction):
+    # 예) 110E-2/84m², 저/22층, 남서향
+    return f"{area_name}/{area_ex}m², {floor}, {direction}"
+
+
+class Listing:
+    __slots__ = (
+        "article_no", "trade_type", "price", "dong", "area_name", "area_ex",
+        "floor", "direction", "agent", "provider", "confirm_date", "is_owner", "description",
+    )
+
+    def __init__(self, article_no, trade_type, price, dong="", area_name="", area_ex="",
+                 floor="", direction="", agent="", provider="", confirm_date="", is_owner=False, description=""):
+        self.article_no = article_no
+        self.trade_type = trade_type
+        self.price = price
+        self.dong = dong
+        self.area_name = area_name
+        self.area_ex = area_ex
+        self.floor = floor
+        self.direction = direction
+        self.agent = agent
+        self.provider = provider
+        self.confirm_date = confirm_date
+        self.is_owner = is_owner
+        self.description = description
+
+    @property
+    def spec(self):
+        return _spec(self.area_name, self.area_ex, self.floor, self.direction)
+
+    def to_row(self, crawl_date, crawl_time, complex_no=None):
+        """real_estate_logs 행 (기존 refine_data 와 동일한 스키마, description 은 저장 전 제외)"""
+        row = {
+            "crawl_date": crawl_date,
+            "crawl_time": crawl_time,
+            "article_no": self.article_no,
+            "trade_type": self.trade_type,
+            "price": self.price,
+            "dong": self.dong or None,
+            "spec": self.spec,
+            "agent": self.agent or None,
+            "provider": self.provider or None,
+            "confirm_date": self.confirm_date,
+            "is_owner": self.is_owner,
+            "description": self.description or None,
+        }
+        if complex_no is not None:
+            row["complex_no"] = str(complex_no)
+        return row
+
+    def __repr__(self):
+        return f"Listing({self.article_no}, {self.trade_type}, {self.price}, {self.dong}, {self.agent})"
+
+
+def decode_article(item, trade_type=None):
+    """articleList 아이템 1건 -> Listing (형식이 맞지 않으면 ListingDecodeError)"""
+    if not isinstance(item, dict):
+        raise ListingDecodeError(f"아이템 형식 오류: {type(item).__name__}")
+
+    article_no = _text(item, "articleNo", required=True)
+    if not article_no.isdigit():
+        raise ListingDecodeError(f"매물번호 형식 오류: {article_no!r}")
+
+    item_trade_type = _text(item, "tradeTypeName", required=True, intern=True)
+    if item_trade_type not in TRADE_TYPES:
+        raise ListingDecodeError(f"알 수 없는 거래방식: {item_trade_type!r}")
+    if trade_type and item_trade_type != trade_type:
+        raise ListingDecodeError(f"거래방식 불일치: {item_trade_type} != {trade_type}")
+
+    return Listing(
+        article_no=article_no,
+        trade_type=item_trade_type,
+        price=_text(item, "dealOrWarrantPrc", required=True),
+        dong=_text(item, "buildingName", intern=True),
+        area_name=_text(item, "areaName", intern=True),
+        area_ex=_text(item, "area2", intern=True),
+        floor=_text(item, "floorInfo", intern=True),
+        direction=_text(item, "direction", intern=True),
+        agent=_text(item, "realtorName", intern=True),
+        provider=_text(item, "cpName", intern=True),
+        confirm_date=_text(item, "articleConfirmYmd", intern=True),
+        is_owner=item.get("verificationTypeCode") == "OWNER",
+        description=_text(item, "articleFeatureDesc"),
+    )
+
+
+class ListingBatch:
+    """Listing 여러 건을 필드별 리스트(컬럼)로 보관 (저장용)"""
+
+    __slots__ = ("columns",)
+    FIELDS = Listing.__slots__
+
+    def __init__(self):
+        self.columns = {name: [] for name in self.FIELDS}
+
+    def __len__(self):
+        return len(self.columns["article_no"])
+
+    def append(self, listing):
+        for name in self.FIELDS:
+            self.columns[name].append(getattr(listing, name))
+
+    def extend(self, batch):
+        for name in self.FIELDS:
+            self.columns[name].extend(batch.columns[name])
+        return self
+
+    def column(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        for values in zip(*(self.columns[name] for name in self.FIELDS)):
+            yield Listing(*values)
+
+    @classmethod
+    def from_listings(cls, listings):
+        batch = cls()
+        for listing in listings:
+            batch.append(listing)
+        return batch
+
+    def to_rows(self, crawl_date, crawl_time, complex_no=None):
+        """Listing.to_row 와 같은 행 목록 (변경 이벤트/가격/생애주기 등 로컬 분석용, description 포함)"""
+        return [listing.to_row(crawl_date, crawl_time, complex_no) for listing in self]
+
+    def db_rows(self, crawl_date, crawl_time, snapshot_id=None, complex_no=None):
+        """real_estate_logs 저장 행을 컬럼에서 바로 생성 (LOCAL_FIELDS 제외, snapshot_id / complex_no 가 있으면 포함)"""
+        c = self.columns
+        rows = []
+        for article_no, trade_type, price, dong, area_name, area_ex, floor, direction, agent, provider, confirm_date, is_owner in zip(
+                c["article_no"], c["trade_type"], c["price"], c["dong"], c["area_name"], c["area_ex"],
+                c["floor"], c["direction"], c["agent"], c["provider"], c["confirm_date"], c["is_owner"]):
+            row = {
+                "crawl_date": crawl_date,
+                "crawl_time": crawl_time,
+                "article_no": article_no,
+                "trade_type": trade_type,
+                "price": price,
+                "dong": dong or None,
+                "spec": _spec(area_name, area_ex, floor, direction),
+                "agent": agent or None,
+                "provider": provider or None,
+                "confirm_date": confirm_date,
+                "is_owner": is_owner,
+            }
+            if snapshot_id is not None:
+                row["snapshot_id"] = snapshot_id
+            if complex_no is not None:
+                row["complex_no"] = str(complex_no)
+            rows.append(row)
+        return rows
+
+
+def db_rows(rows):
+    """real_estate_logs 저장용 사본 (LOCAL_FIELDS 제외)"""
+    return [{k: v for k, v in row.items() if k not in LOCAL_FIELDS} for row in rows]
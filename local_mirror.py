@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+from config import COMPLEX_NO, data_path
+from dimensions import DIMENSIONS, NAMED_LOGS
+from snapshot_index import snapshot_order
+
+# ==================================================================
+# [미러] Supabase -> 로컬 SQLite 증분 동기화 + 조회 API
+# ==================================================================
+# 마지막으로 받은 id 이후의 행만 큰 페이지 단위로 가져와 로컬 DB 에 쌓습니다.
+# 분석/배치 작업은 운영 DB 대신 이 파일을 조회합니다.
+# 크롤러는 중개업소/제공업체/동을 차원 키(*_id)로만 저장하므로(dimensions.py) 차원 테이블도 함께 받고,
+# 매물 행은 이름을 되살린 real_estate_logs_named 뷰로 읽습니다. (Supabase 의 같은 이름 뷰와 동일한 컬럼)
+MIRROR_FILE = "mirror.db"
+MIRROR_TABLES = ("snapshots", "dim_agent", "dim_provider", "dim_dong", "real_estate_logs", "crawl_history", "agent_stats")
+OPTIONAL_TABLES = ("snapshots", "dim_agent", "dim_provider", "dim_dong")  # migrations/002, 003 적용 전이면 건너뜀
+# 기존 행이 제자리에서 갱신(upsert)되는 작은 테이블은 id 커서 대신 매번 전체를 다시 받음
+# (snapshots: 같은 시각 크롤러가 complex_nos / trade_types 를 합침)
+FULL_SYNC_TABLES = ("snapshots",)
+SYNC_PAGE_SIZE = int(os.environ.get("MIRROR_PAGE_SIZE", "1000"))  # PostgREST max-rows 이하로 설정
+
+INDEXES = {
+    "real_estate_logs": [
+        "CREATE INDEX IF NOT EXISTS idx_logs_snapshot ON real_estate_logs (crawl_date, crawl_time)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_article ON real_estate_logs (article_no)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_snapshot_id ON real_estate_logs (snapshot_id, article_no)",
+        "CREATE INDEX IF NOT EXISTS idx_logs_complex_snapshot ON real_estate_logs (complex_no, crawl_date, crawl_time)",
+    ],
+    "crawl_history": [
+        "CREATE INDEX IF NOT EXISTS idx_history_snapshot ON crawl_history (crawl_date, crawl_time)",
+        "CREATE INDEX IF NOT EXISTS idx_history_snapshot_id ON crawl_history (snapshot_id)",
+    ],
+    "agent_stats": [
+        "CREATE INDEX IF NOT EXISTS idx_stats_snapshot ON agent_stats (crawl_date, crawl_time)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_snapshot_id ON agent_stats (snapshot_id, agent_id)",
+    ],
+    "snapshots": [
+        "CREATE INDEX IF NOT EXISTS idx_snapshots_crawled_at ON snapshots (crawled_at)",
+    ],
+}
+
+
+def _sqlite_value(value):
+    """dict/list 컬럼은 문자열로 저장 (bool 은 sqlite 가 0/1 로 처리)"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class LocalMirror:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(MIRROR_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._columns = {}
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = ?", (NAMED_LOGS,)).fetchone():
+            self.refresh_named_view()
+
+    def close(self):
+        self.conn.close()
+
+    # --------------------------------------------------------------
+    # 동기화
+    # --------------------------------------------------------------
+    def _ensure_table(self, table, row):
+        """처음 보는 테이블/컬럼은 자동 생성 (원격 스키마 변경 대응)"""
+        if table not in self._columns:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (id INTEGER PRIMARY KEY)')
+            self._columns[table] = {r["name"] for r in self.conn.execute(f'PRAGMA table_info("{table}")')}
+            for sql in INDEXES.get(table, []):
+                try: self.conn.execute(sql)
+                except sqlite3.OperationalError: pass  # 컬럼이 아직 없으면 다음 동기화 때 생성
+
+        for column in row:
+            if column not in self._columns[table]:
+                self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+                self._columns[table].add(column)
+
+    def cursor(self, table):
+        try:
+            return self.conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{table}"').fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+
+    def sync_table(self, table, page_size=SYNC_PAGE_SIZE):
+        from db_client import iter_rows
+
+        after_id = 0 if table in FULL_SYNC_TABLES else self.cursor(table)
+        batch, total = [], 0
+
+        def flush():
+            columns = list(batch[0].keys())
+            placeholders = ",".join("?" * len(columns))
+            names = ",".join(f'"{c}"' for c in columns)
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO "{table}" ({names}) VALUES ({placeholders})',
+                [tuple(_sqlite_value(r.get(c)) for c in columns) for r in batch],
+            )
+            self.conn.commit()
+
+        for row in iter_rows(table, "*", after_id=after_id, page_size=page_size):
+            if batch and row.keys() != batch[0].keys():
+                flush()
+                batch = []
+            self._ensure_table(table, row)
+            batch.append(row)
+            total += 1
+            if len(batch) >= page_size:
+                flush()
+                batch = []
+        if batch:
+            flush()
+
+        for sql in INDEXES.get(table, []):
+            try: self.conn.execute(sql)
+            except sqlite3.OperationalError: pass
+        return total
+
+    def sync(self, tables=MIRROR_TABLES):
+        for table in tables:
+            started = time.time()
+            try:
+                count = self.sync_table(table)
+            except Exception as e:
+                if table not in OPTIONAL_TABLES:
+                    raise
+                print(f"⚠️ [Mirror] {table}: 건너뜀 ({e})")
+                continue
+            print(f"🔄 [Mirror] {table}: 신규 {count}건 ({time.time() - started:.1f}초, 커서 id={self.cursor(table)})")
+        self.refresh_named_view()
+
+    def refresh_named_view(self):
+        """
+        real_estate_logs 의 *_id 를 차원 테이블 이름으로 되살린 뷰 (새 컬럼이 생길 수 있어 동기화마다 다시 만듦)
+        차원 테이블이나 *_id 컬럼이 아직 없으면 해당 컬럼은 원본 그대로
+        """
+        columns = [r["name"] for r in self.conn.execute("PRAGMA table_info(real_estate_logs)")]
+        if not columns:
+            return
+        tables = {r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        select, joins = [], []
+        for column in columns:
+            dim = DIMENSIONS.get(column)
+            if dim in tables and f"{column}_id" in columns:
+                select.append(f'COALESCE(l."{column}", d_{column}.name) AS "{column}"')
+                joins.append(f'LEFT JOIN "{dim}" d_{column} ON d_{column}.id = l."{column}_id"')
+            else:
+                select.append(f'l."{column}"')
+        with self.conn:
+            self.conn.execute(f'DROP VIEW IF EXISTS "{NAMED_LOGS}"')
+            self.conn.execute(f'CREATE VIEW "{NAMED_LOGS}" AS SELECT {", ".join(select)} FROM real_estate_logs l {" ".join(joins)}')
+
+    # --------------------------------------------------------------
+    # 조회 API
+    # --------------------------------------------------------------
+    def query(self, sql, params=()):
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def complex_column(self, table=NAMED_LOGS):
+        """단지번호 SQL 식 (complex_no 컬럼이 없거나 NULL 인 행은 기본 단지, migrations/006)"""
+        columns = {r["name"] for r in self.conn.execute(f'PRAGMA table_info("{table}")')}
+        return f"COALESCE(complex_no, '{COMPLEX_NO}')" if "complex_no" in columns else f"'{COMPLEX_NO}'"
+
+    def snapshots(self, start_date=None, end_date=None):
+        """crawl_history 기준 스냅샷 목록 (최신 -> 과거, 거래방식별 이력이면 trade_type 포함)"""
+        rows = self.query(
+            "SELECT * FROM crawl_history "
+            "WHERE crawl_date >= COALESCE(?, '') AND crawl_date <= COALESCE(?, '9999') ORDER BY id DESC",
+            (start_date, end_date),
+        )
+        # 문자열 키('HH시' / 'HH:MM')가 아니라 정수 snapshot_id 순서 (같은 스냅샷이면 최근 기록 먼저)
+        rows.sort(key=snapshot_order, reverse=True)
+        return rows
+
+    def latest_snapshot(self, trade_type=None):
+        """가장 최근 스냅샷의 매물 목록"""
+        latest = self.conn.execute(
+            "SELECT crawl_date, crawl_time FROM real_estate_logs "
+            "WHERE (? IS NULL OR trade_type = ?) ORDER BY id DESC LIMIT 1",
+            (trade_type, trade_type),
+        ).fetchone()
+        if latest is None:
+            return []
+        return self.query(
+            f"SELECT * FROM {NAMED_LOGS} WHERE crawl_date = ? AND crawl_time = ? AND (? IS NULL OR trade_type = ?) ORDER BY id",
+            (latest["crawl_date"], latest["crawl_time"], trade_type, trade_type),
+        )
+
+    def listing_history(self, article_no):
+        rows = self.query(f"SELECT * FROM {NAMED_LOGS} WHERE article_no = ? ORDER BY id", (article_no,))
+        rows.sort(key=snapshot_order)
+        return rows
+
+    def agent_counts(self, start_date, end_date, trade_type=None):
+        """기간 내 중개업소별 (스냅샷 합계) 매물 수"""
+        return self.query(
+            f"SELECT agent, COUNT(*) AS count, COUNT(DISTINCT article_no) AS listings FROM {NAMED_LOGS} "
+            "WHERE crawl_date BETWEEN ? AND ? AND (? IS NULL OR trade_type = ?) "
+            "GROUP BY agent ORDER BY count DESC",
+            (start_date, end_date, trade_type, trade_type),
+        )
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 분석용 미러 DB")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sync = sub.add_parser("sync", help="신규 행 동기화")
+    p_sync.add_argument("--table", dest="tables", action="append", choices=MIRROR_TABLES)
+    p_sql = sub.add_parser("sql", help="SQL 직접 실행")
+    p_sql.add_argument("statement")
+    args = parser.parse_args(argv)
+
+    mirror = LocalMirror()
+    try:
+        if args.cmd == "sync":
+            mirror.sync(args.tables or MIRROR_TABLES)
+        elif args.cmd == "sql":
+            started = time.time()
+            rows = mirror.query(args.statement)
+            for row in rows:
+                print("\t".join(str(v) for v in row.values()))
+            print(f"-- {len(rows)}행 ({(time.time() - started) * 1000:.0f}ms)", file=sys.stderr)
+    finally:
+        mirror.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
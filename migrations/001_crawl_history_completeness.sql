@@ -0,0 +1,10 @@
+-- ==================================================================
+-- crawl_history: 수집 완전성 검증 결과 (completeness.py)
+-- ==================================================================
+-- expected_count  : 단지 상세 API 기준 기대 매물 수 (거래방식 합계)
+-- refetched_pages : 누락되어 다시 요청한 articleList 페이지 수
+-- is_complete     : 모든 페이지 수신 + 기대 건수 충족 여부
+ALTER TABLE crawl_history
+    ADD COLUMN IF NOT EXISTS expected_count  integer,
+    ADD COLUMN IF NOT EXISTS refetched_pages integer DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS is_complete     boolean;
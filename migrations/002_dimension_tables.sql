@@ -0,0 +1,60 @@
+-- ==================================================================
+-- 차원 테이블: 중개업소 / 제공업체 / 동 (dimensions.py)
+-- ==================================================================
+-- 매 시간 수백 건씩 반복되는 긴 문자열(realtorName, cpName, buildingName)을
+-- 정수 키로 바꿔 저장합니다. 크롤러는 *_id 컬럼을 함께 기록하고,
+-- DIMENSION_KEYS_ONLY=1 이면 문자열 컬럼을 비우고 키만 저장합니다.
+-- 문자열이 필요한 화면은 real_estate_logs_named 뷰를 읽으면 됩니다.
+CREATE TABLE IF NOT EXISTS dim_agent (
+    id   integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name text NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dim_provider (
+    id   smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name text NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS dim_dong (
+    id   smallint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    name text NOT NULL UNIQUE
+);
+
+ALTER TABLE real_estate_logs
+    ADD COLUMN IF NOT EXISTS agent_id    integer  REFERENCES dim_agent (id),
+    ADD COLUMN IF NOT EXISTS provider_id smallint REFERENCES dim_provider (id),
+    ADD COLUMN IF NOT EXISTS dong_id     smallint REFERENCES dim_dong (id);
+ALTER TABLE agent_stats
+    ADD COLUMN IF NOT EXISTS agent_id integer REFERENCES dim_agent (id);
+
+-- 기존 행 채우기
+INSERT INTO dim_agent (name)
+    SELECT DISTINCT agent FROM real_estate_logs WHERE agent IS NOT NULL
+    UNION SELECT DISTINCT agent FROM agent_stats WHERE agent IS NOT NULL
+    ON CONFLICT (name) DO NOTHING;
+INSERT INTO dim_provider (name)
+    SELECT DISTINCT provider FROM real_estate_logs WHERE provider IS NOT NULL
+    ON CONFLICT (name) DO NOTHING;
+INSERT INTO dim_dong (name)
+    SELECT DISTINCT dong FROM real_estate_logs WHERE dong IS NOT NULL
+    ON CONFLICT (name) DO NOTHING;
+
+UPDATE real_estate_logs l SET agent_id = d.id FROM dim_agent d WHERE l.agent_id IS NULL AND l.agent = d.name;
+UPDATE real_estate_logs l SET provider_id = d.id FROM dim_provider d WHERE l.provider_id IS NULL AND l.provider = d.name;
+UPDATE real_estate_logs l SET dong_id = d.id FROM dim_dong d WHERE l.dong_id IS NULL AND l.dong = d.name;
+UPDATE agent_stats s SET agent_id = d.id FROM dim_agent d WHERE s.agent_id IS NULL AND s.agent = d.name;
+
+CREATE INDEX IF NOT EXISTS idx_logs_snapshot_agent_id ON real_estate_logs (crawl_date, crawl_time, agent_id);
+CREATE INDEX IF NOT EXISTS idx_logs_snapshot_dong_id  ON real_estate_logs (crawl_date, crawl_time, dong_id);
+
+-- 문자열 컬럼을 비운 뒤에도 기존 쿼리가 동작하도록 이름을 되살린 뷰
+CREATE OR REPLACE VIEW real_estate_logs_named AS
+SELECT l.id, l.crawl_date, l.crawl_time, l.article_no, l.trade_type, l.price,
+       COALESCE(l.dong, dd.name)      AS dong,
+       l.spec,
+       COALESCE(l.agent, da.name)     AS agent,
+       COALESCE(l.provider, dp.name)  AS provider,
+       l.confirm_date, l.is_owner,
+       l.agent_id, l.provider_id, l.dong_id
+FROM real_estate_logs l
+LEFT JOIN dim_agent da    ON da.id = l.agent_id
+LEFT JOIN dim_provider dp ON dp.id = l.provider_id
+LEFT JOIN dim_dong dd     ON dd.id = l.dong_id;
@@ -0,0 +1,130 @@
+-- ==================================================================
+-- 스냅샷 레지스트리: 크롤링 1회 = 정수 snapshot_id (snapshot_registry.py)
+-- ==================================================================
+-- 스냅샷 키가 crawl_date + crawl_time 문자열이고 형식도 섞여 있습니다.
+--   crawler.py            : 'HH:MM' (예전에는 실행 PC 로컬 시각, 이후 KST)
+--   crawler_sale/jeonse.py: 'HH시'  (KST)
+-- 각 스냅샷을 KST 기준 timestamptz(crawled_at, 분 단위)로 정규화해 한 번만 등록하고,
+-- 사실 테이블(real_estate_logs / crawl_history / agent_stats)은 snapshot_id 로 참조합니다.
+-- 같은 시각에 실행된 매매/전세 크롤러는 같은 스냅샷을 공유하고 단지/거래방식 목록만 합쳐집니다.
+-- id 는 기존 스냅샷을 시각 순으로 채운 뒤 새 크롤링마다 증가하므로 정렬/구간 조회에 그대로 사용 가능.
+-- 기존 'HH:MM' 행은 당시 크롤링 PC 가 KST 였던 것으로 보고 변환합니다.
+CREATE TABLE IF NOT EXISTS snapshots (
+    id          bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    crawled_at  timestamptz NOT NULL UNIQUE,
+    crawl_date  text NOT NULL,                 -- 처음 등록된 원래 키 (호환용)
+    crawl_time  text NOT NULL,
+    complex_nos text[] NOT NULL DEFAULT '{}',
+    trade_types text[] NOT NULL DEFAULT '{}',
+    created_at  timestamptz NOT NULL DEFAULT now()
+);
+
+-- '2025-12-01' + '14시' / '14:05' / '9:5' -> 2025-12-01 14:05:00+09
+CREATE OR REPLACE FUNCTION snapshot_ts(p_date text, p_time text) RETURNS timestamptz
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT (p_date || ' ' ||
+            CASE WHEN btrim(p_time) LIKE '%시'
+                 THEN lpad(rtrim(btrim(p_time), '시'), 2, '0') || ':00'
+                 ELSE lpad(split_part(btrim(p_time), ':', 1), 2, '0') || ':' ||
+                      lpad(left(split_part(btrim(p_time), ':', 2), 2), 2, '0')
+            END || ':00+09')::timestamptz
+$$;
+
+-- 스냅샷 등록 (이미 있으면 단지/거래방식 목록만 합침) -> id
+CREATE OR REPLACE FUNCTION register_snapshot(
+    p_crawl_date text, p_crawl_time text, p_complex_nos text[] DEFAULT '{}', p_trade_types text[] DEFAULT '{}'
+) RETURNS bigint
+LANGUAGE sql AS $$
+    INSERT INTO snapshots AS s (crawled_at, crawl_date, crawl_time, complex_nos, trade_types)
+    VALUES (snapshot_ts(p_crawl_date, p_crawl_time), p_crawl_date, p_crawl_time,
+            COALESCE(p_complex_nos, '{}'), COALESCE(p_trade_types, '{}'))
+    ON CONFLICT (crawled_at) DO UPDATE SET
+        complex_nos = ARRAY(SELECT DISTINCT unnest(s.complex_nos || EXCLUDED.complex_nos) ORDER BY 1),
+        trade_types = ARRAY(SELECT DISTINCT unnest(s.trade_types || EXCLUDED.trade_types) ORDER BY 1)
+    RETURNING id
+$$;
+
+ALTER TABLE real_estate_logs ADD COLUMN IF NOT EXISTS snapshot_id bigint REFERENCES snapshots (id);
+ALTER TABLE crawl_history    ADD COLUMN IF NOT EXISTS snapshot_id bigint REFERENCES snapshots (id);
+ALTER TABLE agent_stats      ADD COLUMN IF NOT EXISTS snapshot_id bigint REFERENCES snapshots (id);
+
+-- 기존 스냅샷을 시각 순으로 등록 (id 가 시간 순서를 따르도록)
+CREATE TEMP TABLE snapshot_keys AS
+SELECT DISTINCT crawl_date, crawl_time, snapshot_ts(crawl_date, crawl_time) AS crawled_at
+FROM (
+    SELECT crawl_date, crawl_time FROM crawl_history
+    UNION SELECT crawl_date, crawl_time FROM real_estate_logs
+    UNION SELECT crawl_date, crawl_time FROM agent_stats
+) k
+WHERE crawl_date IS NOT NULL AND crawl_time IS NOT NULL;
+
+INSERT INTO snapshots (crawled_at, crawl_date, crawl_time)
+SELECT DISTINCT ON (crawled_at) crawled_at, crawl_date, crawl_time
+FROM snapshot_keys
+ORDER BY crawled_at, crawl_time
+ON CONFLICT (crawled_at) DO NOTHING;
+
+-- 거래방식 목록은 수집된 매물 기준으로 채움 (단지는 기존 기본 단지)
+UPDATE snapshots s SET
+    trade_types = t.trade_types,
+    complex_nos = '{108064}'
+FROM (
+    SELECT k.crawled_at, ARRAY_AGG(DISTINCT l.trade_type ORDER BY l.trade_type) AS trade_types
+    FROM snapshot_keys k
+    JOIN real_estate_logs l ON l.crawl_date = k.crawl_date AND l.crawl_time = k.crawl_time
+    WHERE l.trade_type IS NOT NULL
+    GROUP BY k.crawled_at
+) t
+WHERE s.crawled_at = t.crawled_at AND s.trade_types = '{}';
+
+UPDATE real_estate_logs l SET snapshot_id = s.id
+FROM snapshot_keys k JOIN snapshots s ON s.crawled_at = k.crawled_at
+WHERE l.snapshot_id IS NULL AND l.crawl_date = k.crawl_date AND l.crawl_time = k.crawl_time;
+UPDATE crawl_history h SET snapshot_id = s.id
+FROM snapshot_keys k JOIN snapshots s ON s.crawled_at = k.crawled_at
+WHERE h.snapshot_id IS NULL AND h.crawl_date = k.crawl_date AND h.crawl_time = k.crawl_time;
+UPDATE agent_stats a SET snapshot_id = s.id
+FROM snapshot_keys k JOIN snapshots s ON s.crawled_at = k.crawled_at
+WHERE a.snapshot_id IS NULL AND a.crawl_date = k.crawl_date AND a.crawl_time = k.crawl_time;
+
+DROP TABLE snapshot_keys;
+
+CREATE INDEX IF NOT EXISTS idx_logs_snapshot_id    ON real_estate_logs (snapshot_id, article_no);
+CREATE INDEX IF NOT EXISTS idx_history_snapshot_id ON crawl_history (snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_stats_snapshot_id   ON agent_stats (snapshot_id, agent_id);
+
+-- snapshot_id 없이 저장하는 기존 스크립트(fake_listing_detector.py 등)도 자동으로 참조를 갖도록
+CREATE OR REPLACE FUNCTION fill_snapshot_id() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.snapshot_id IS NULL AND NEW.crawl_date IS NOT NULL AND NEW.crawl_time IS NOT NULL THEN
+        NEW.snapshot_id := register_snapshot(NEW.crawl_date, NEW.crawl_time);
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_logs_snapshot_id ON real_estate_logs;
+CREATE TRIGGER trg_logs_snapshot_id BEFORE INSERT ON real_estate_logs
+    FOR EACH ROW EXECUTE FUNCTION fill_snapshot_id();
+DROP TRIGGER IF EXISTS trg_history_snapshot_id ON crawl_history;
+CREATE TRIGGER trg_history_snapshot_id BEFORE INSERT ON crawl_history
+    FOR EACH ROW EXECUTE FUNCTION fill_snapshot_id();
+DROP TRIGGER IF EXISTS trg_stats_snapshot_id ON agent_stats;
+CREATE TRIGGER trg_stats_snapshot_id BEFORE INSERT ON agent_stats
+    FOR EACH ROW EXECUTE FUNCTION fill_snapshot_id();
+
+-- 뷰에도 snapshot_id 노출 (기존 컬럼 뒤에 추가)
+CREATE OR REPLACE VIEW real_estate_logs_named AS
+SELECT l.id, l.crawl_date, l.crawl_time, l.article_no, l.trade_type, l.price,
+       COALESCE(l.dong, dd.name)      AS dong,
+       l.spec,
+       COALESCE(l.agent, da.name)     AS agent,
+       COALESCE(l.provider, dp.name)  AS provider,
+       l.confirm_date, l.is_owner,
+       l.agent_id, l.provider_id, l.dong_id,
+       l.snapshot_id
+FROM real_estate_logs l
+LEFT JOIN dim_agent da    ON da.id = l.agent_id
+LEFT JOIN dim_provider dp ON dp.id = l.provider_id
+LEFT JOIN dim_dong dd     ON dd.id = l.dong_id;
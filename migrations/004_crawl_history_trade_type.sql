@@ -0,0 +1,12 @@
+-- ==================================================================
+-- crawl_history: 거래방식별 이력 (crawler_sale.py / crawler_jeonse.py)
+-- ==================================================================
+-- 화면 기반 매매/전세 크롤러는 같은 시각('HH시')에 각자 이력을 남기므로
+-- (crawl_date, crawl_time) 만으로는 어느 거래방식의 결과인지 알 수 없었습니다.
+--   trade_type = '매매' / '전세' : 해당 거래방식만의 결과
+--   trade_type IS NULL           : 한 번에 여러 거래방식을 수집한 실행의 합친 결과
+--                                  (crawler.py, parallel_crawler.py, 이 마이그레이션 이전 행)
+-- 조회 쪽은 (날짜, 시각, 거래방식) 행을 먼저 보고, 없으면 합친 행을 사용합니다.
+ALTER TABLE crawl_history ADD COLUMN IF NOT EXISTS trade_type text;
+
+CREATE INDEX IF NOT EXISTS idx_history_snapshot_trade ON crawl_history (crawl_date, crawl_time, trade_type);
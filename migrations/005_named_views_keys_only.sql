@@ -0,0 +1,34 @@
+-- ==================================================================
+-- 차원 키만 저장 (dimensions.py 기본값) + 이름을 되살린 뷰 보강
+-- ==================================================================
+-- 크롤러는 이제 기본으로 agent / provider / dong 문자열을 비우고 *_id 만 저장합니다.
+-- (DIMENSION_KEYS_ONLY=0 이면 예전처럼 문자열도 함께 저장)
+-- 이름이 필요한 조회(대시보드, export_logs.py, search_index.py)는 아래 뷰를 읽습니다.
+--   real_estate_logs_named : 화면(DOM) 크롤러가 저장하는 is_landlord / verification_date 추가
+--   agent_stats_named      : agent_stats 의 agent 도 키만 저장되므로 같은 방식의 뷰
+-- CREATE OR REPLACE VIEW 는 컬럼을 뒤에만 추가할 수 있으므로 기존 컬럼 순서는 그대로 둡니다.
+ALTER TABLE real_estate_logs
+    ADD COLUMN IF NOT EXISTS is_landlord       boolean,
+    ADD COLUMN IF NOT EXISTS verification_date text;
+
+CREATE OR REPLACE VIEW real_estate_logs_named AS
+SELECT l.id, l.crawl_date, l.crawl_time, l.article_no, l.trade_type, l.price,
+       COALESCE(l.dong, dd.name)      AS dong,
+       l.spec,
+       COALESCE(l.agent, da.name)     AS agent,
+       COALESCE(l.provider, dp.name)  AS provider,
+       l.confirm_date, l.is_owner,
+       l.agent_id, l.provider_id, l.dong_id,
+       l.snapshot_id,
+       l.is_landlord, l.verification_date
+FROM real_estate_logs l
+LEFT JOIN dim_agent da    ON da.id = l.agent_id
+LEFT JOIN dim_provider dp ON dp.id = l.provider_id
+LEFT JOIN dim_dong dd     ON dd.id = l.dong_id;
+
+CREATE OR REPLACE VIEW agent_stats_named AS
+SELECT s.id, s.crawl_date, s.crawl_time,
+       COALESCE(s.agent, da.name) AS agent,
+       s.count, s.agent_id, s.snapshot_id
+FROM agent_stats s
+LEFT JOIN dim_agent da ON da.id = s.agent_id;
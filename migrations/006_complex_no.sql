@@ -0,0 +1,43 @@
+-- ==================================================================
+-- 단지 구분 컬럼 (parallel_crawler.py 가 여러 단지를 한 스냅샷에 저장)
+-- ==================================================================
+-- 병렬 크롤러는 한 시각에 여러 단지를 같은 real_estate_logs / agent_stats / crawl_history 에
+-- 저장하므로 행마다 complex_no 를 붙입니다.
+--   real_estate_logs / agent_stats : 기존 행은 모두 기본 단지(108064) 로 채움
+--                                    (저장 코드가 NULL 을 남겨도 조회 쪽은 기본 단지로 봄)
+--   crawl_history                  : complex_no = 해당 단지만의 결과 (병렬 크롤러는 단지 x 거래방식마다 1건)
+--                                    NULL = 단지 구분 없는 이력 (이 마이그레이션 이전 행) -> 모든 단지에 적용
+-- CREATE OR REPLACE VIEW 는 컬럼을 뒤에만 추가할 수 있으므로 complex_no 는 맨 뒤에 붙입니다.
+ALTER TABLE real_estate_logs ADD COLUMN IF NOT EXISTS complex_no text;
+ALTER TABLE agent_stats      ADD COLUMN IF NOT EXISTS complex_no text;
+ALTER TABLE crawl_history    ADD COLUMN IF NOT EXISTS complex_no text;
+
+UPDATE real_estate_logs SET complex_no = '108064' WHERE complex_no IS NULL;
+UPDATE agent_stats      SET complex_no = '108064' WHERE complex_no IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_logs_complex_snapshot ON real_estate_logs (complex_no, crawl_date, crawl_time);
+CREATE INDEX IF NOT EXISTS idx_history_complex_snapshot ON crawl_history (complex_no, crawl_date, crawl_time, trade_type);
+
+CREATE OR REPLACE VIEW real_estate_logs_named AS
+SELECT l.id, l.crawl_date, l.crawl_time, l.article_no, l.trade_type, l.price,
+       COALESCE(l.dong, dd.name)      AS dong,
+       l.spec,
+       COALESCE(l.agent, da.name)     AS agent,
+       COALESCE(l.provider, dp.name)  AS provider,
+       l.confirm_date, l.is_owner,
+       l.agent_id, l.provider_id, l.dong_id,
+       l.snapshot_id,
+       l.is_landlord, l.verification_date,
+       l.complex_no
+FROM real_estate_logs l
+LEFT JOIN dim_agent da    ON da.id = l.agent_id
+LEFT JOIN dim_provider dp ON dp.id = l.provider_id
+LEFT JOIN dim_dong dd     ON dd.id = l.dong_id;
+
+CREATE OR REPLACE VIEW agent_stats_named AS
+SELECT s.id, s.crawl_date, s.crawl_time,
+       COALESCE(s.agent, da.name) AS agent,
+       s.count, s.agent_id, s.snapshot_id,
+       s.complex_no
+FROM agent_stats s
+LEFT JOIN dim_agent da ON da.id = s.agent_id;
@@ -0,0 +1,314 @@
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import unicodedata
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from config import data_path
+from snapshot_index import snapshot_order, snapshot_sort_key
+
+# ==================================================================
+# [중복 문구] 매물 설명 MinHash + LSH -> 중개업소를 넘나드는 복붙 광고 묶음
+# ==================================================================
+# 허위 매물은 같은 광고 문구를 여러 중개업소가 조금씩 고쳐 올리는 경우가 많습니다.
+# 매물 설명(articleFeatureDesc / 목록의 특징 문구)을 글자 3-gram 집합으로 보고
+#   - 매물마다 MinHash 서명(NUM_PERM 개)을 한 번만 계산해 저장 (설명이 바뀐 매물만 다시 계산)
+#   - 서명을 BANDS 개 구간으로 나눠 구간별 버킷에 넣고, 버킷을 공유하는 매물만 후보로 비교
+#     -> 전체 쌍 비교 없이 (이번 수집 건수 x 후보 수) 만 비교
+#   - 후보는 서명 일치율(자카드 유사도 추정치)이 SIM_THRESHOLD 이상이고 중개업소가 다를 때만 연결
+# 연결된 매물을 묶은 그룹은 스냅샷(crawl_date, crawl_time)별로 저장합니다.
+# 다른 단지/거래방식이나 최근 WINDOW_DAYS 일 안에 본 매물도 후보에 포함됩니다.
+# 설명은 real_estate_logs 에 저장하지 않고 이 파일에만 보관합니다 (listing_record.LOCAL_FIELDS).
+INDEX_FILE = "near_duplicates.db"
+SHINGLE_SIZE = 3
+MIN_CHARS = 12          # 정규화 후 이보다 짧은 설명("급매", "로얄층")은 누구나 쓰므로 제외
+NUM_PERM = 128
+BANDS = 32              # 32 x 4행: 유사도 0.6 인 쌍을 약 99% 확률로 후보에 올림
+ROWS = NUM_PERM // BANDS
+SIM_THRESHOLD = 0.6
+WINDOW_DAYS = 14
+KEEP_DAYS = 30
+PRIME = (1 << 31) - 1
+SEED = 20251201
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    article_no TEXT PRIMARY KEY, complex_no TEXT, trade_type TEXT, agent TEXT,
+    text_hash TEXT, description TEXT, signature BLOB,
+    first_seen TEXT, last_seen TEXT        -- 'YYYY-MM-DD HH:MM' (KST)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER, bucket INTEGER, article_no TEXT,
+    PRIMARY KEY (band, bucket, article_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_buckets_article ON buckets (article_no);
+CREATE TABLE IF NOT EXISTS dup_groups (
+    crawl_date TEXT, crawl_time TEXT, group_id TEXT, article_no TEXT,
+    complex_no TEXT, trade_type TEXT, agent TEXT, similarity REAL,
+    snapshot_id INTEGER,                   -- migrations/003 스냅샷 id (정렬용, 없으면 NULL)
+    PRIMARY KEY (crawl_date, crawl_time, article_no)
+);
+CREATE INDEX IF NOT EXISTS idx_dup_groups_group ON dup_groups (group_id);
+"""
+
+_rng = np.random.RandomState(SEED)
+_PERM_A = _rng.randint(1, PRIME, NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, PRIME, NUM_PERM).astype(np.uint64)
+_NOISE = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize_text(text):
+    """전각/반각 통일, 소문자, 공백/기호 제거 ('★급매★ 로얄층!' -> '급매로얄층')"""
+    return _NOISE.sub("", unicodedata.normalize("NFKC", text or "").lower())
+
+
+def shingles(norm):
+    return {norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)}
+
+
+def minhash(norm):
+    """정규화된 문자열 -> uint32 서명 (NUM_PERM 개의 (a*x+b) mod p 최솟값)"""
+    x = np.fromiter((int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") % PRIME
+                     for s in shingles(norm)), dtype=np.uint64)
+    return ((_PERM_A[:, None] * x[None, :] + _PERM_B[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature):
+    """서명 -> [(구간 번호, 버킷 키)] (버킷 키는 sqlite INTEGER 에 맞춘 부호 있는 64비트)"""
+    raw = signature.tobytes()
+    width = ROWS * 4
+    return [(band, int.from_bytes(hashlib.blake2b(raw[band * width:(band + 1) * width], digest_size=8).digest(), "little", signed=True))
+            for band in range(BANDS)]
+
+
+def similarity(sig_a, sig_b):
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class _UnionFind:
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+# ==================================================================
+# [저장소] 서명 / LSH 버킷 / 스냅샷별 중복 그룹
+# ==================================================================
+class NearDuplicateIndex:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(INDEX_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        # snapshot_id 컬럼이 생기기 전에 만든 파일
+        if "snapshot_id" not in {r["name"] for r in self.conn.execute("PRAGMA table_info(dup_groups)")}:
+            self.conn.execute("ALTER TABLE dup_groups ADD COLUMN snapshot_id INTEGER")
+
+    def close(self):
+        self.conn.close()
+
+    def _put(self, row, norm, text_hash, seen):
+        """설명이 새로 생겼거나 바뀐 매물: 서명 계산 + 버킷 교체"""
+        article_no = row["article_no"]
+        signature = minhash(norm)
+        self.conn.execute(
+            "INSERT INTO texts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (article_no) DO UPDATE SET "
+            "complex_no = excluded.complex_no, trade_type = excluded.trade_type, agent = excluded.agent, "
+            "text_hash = excluded.text_hash, description = excluded.description, signature = excluded.signature, "
+            "last_seen = excluded.last_seen",
+            (article_no, row["complex_no"], row["trade_type"], row["agent"], text_hash, row["description"],
+             signature.tobytes(), seen, seen))
+        self.conn.execute("DELETE FROM buckets WHERE article_no = ?", (article_no,))
+        self.conn.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)",
+                              [(band, key, article_no) for band, key in band_keys(signature)])
+        return signature
+
+    def _candidates(self, article_no, agent, since):
+        """버킷을 하나 이상 공유하고 최근에 본, 다른 중개업소 매물"""
+        return self.conn.execute(
+            "SELECT DISTINCT t.article_no, t.complex_no, t.trade_type, t.agent, t.signature "
+            "FROM buckets b1 JOIN buckets b2 ON b2.band = b1.band AND b2.bucket = b1.bucket "
+            "JOIN texts t ON t.article_no = b2.article_no "
+            "WHERE b1.article_no = ? AND b2.article_no != ? AND t.last_seen >= ? AND (t.agent != ? OR ? = '')",
+            (article_no, article_no, since, agent, agent)).fetchall()
+
+    # --------------------------------------------------------------
+    # 크롤링 1회 반영
+    # --------------------------------------------------------------
+    def update(self, complex_no, trade_type, rows, crawl_date, crawl_time, snapshot_id=None):
+        """
+        이번 수집분의 설명을 색인에 반영하고 중복 그룹을 찾아 스냅샷에 저장
+        반환: (그룹 목록, 통계 dict). 그룹 = 멤버 dict 목록 (이번 수집분이 하나 이상 포함된 그룹만)
+        """
+        date, hhmm = snapshot_sort_key(crawl_date, crawl_time)
+        seen = f"{date} {hhmm}"
+        since = (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+        stats = {"indexed": 0, "hashed": 0, "compared": 0}
+
+        current = {}
+        with self.conn:
+            for row in rows:
+                article_no = row.get("article_no")
+                norm = normalize_text(row.get("description"))
+                if not article_no or article_no == "-" or len(norm) < MIN_CHARS:
+                    continue
+                row = {"article_no": article_no, "complex_no": str(complex_no), "trade_type": trade_type,
+                       "agent": row.get("agent") or "", "description": row.get("description")}
+                text_hash = hashlib.blake2b(norm.encode(), digest_size=8).hexdigest()
+                old = self.conn.execute("SELECT text_hash, signature FROM texts WHERE article_no = ?", (article_no,)).fetchone()
+                if old and old["text_hash"] == text_hash:
+                    self.conn.execute("UPDATE texts SET last_seen = ?, agent = ? WHERE article_no = ?", (seen, row["agent"], article_no))
+                    signature = np.frombuffer(old["signature"], dtype=np.uint32)
+                else:
+                    signature = self._put(row, norm, text_hash, seen)
+                    stats["hashed"] += 1
+                current[article_no] = (row, signature)
+            stats["indexed"] = len(current)
+
+            # 후보 검증 -> 연결 요소 = 중복 그룹
+            uf, members, best = _UnionFind(), {}, {}
+            for article_no, (row, signature) in current.items():
+                for cand in self._candidates(article_no, row["agent"], since):
+                    stats["compared"] += 1
+                    other = cand["article_no"]
+                    other_sig = current[other][1] if other in current else np.frombuffer(cand["signature"], dtype=np.uint32)
+                    sim = similarity(signature, other_sig)
+                    if sim < SIM_THRESHOLD:
+                        continue
+                    uf.union(article_no, other)
+                    members[article_no] = row
+                    members[other] = current[other][0] if other in current else dict(cand)
+                    best[article_no] = max(best.get(article_no, 0.0), sim)
+                    best[other] = max(best.get(other, 0.0), sim)
+
+            groups = {}
+            for article_no, row in members.items():
+                groups.setdefault(uf.find(article_no), []).append({
+                    "article_no": article_no, "complex_no": row["complex_no"], "trade_type": row["trade_type"],
+                    "agent": row["agent"], "similarity": round(best[article_no], 3),
+                })
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dup_groups (crawl_date, crawl_time, group_id, article_no, complex_no, trade_type, agent, "
+                "similarity, snapshot_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(crawl_date, crawl_time, group_id, m["article_no"], m["complex_no"], m["trade_type"], m["agent"], m["similarity"],
+                  snapshot_id) for group_id, group in groups.items() for m in group])
+            self._prune(date)
+
+        result = [dict(group_id=gid, members=sorted(g, key=lambda m: m["article_no"])) for gid, g in sorted(groups.items())]
+        return result, stats
+
+    def _prune(self, date):
+        cutoff = (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=KEEP_DAYS)).strftime("%Y-%m-%d")
+        self.conn.execute("DELETE FROM buckets WHERE article_no IN (SELECT article_no FROM texts WHERE last_seen < ?)", (cutoff,))
+        self.conn.execute("DELETE FROM texts WHERE last_seen < ?", (cutoff,))
+        self.conn.execute("DELETE FROM dup_groups WHERE crawl_date < ?", (cutoff,))
+
+    # --------------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------------
+    def latest_snapshot(self):
+        rows = self.conn.execute(
+            "SELECT crawl_date, crawl_time, MAX(snapshot_id) AS snapshot_id FROM dup_groups GROUP BY crawl_date, crawl_time").fetchall()
+        latest = max((dict(r) for r in rows), key=snapshot_order, default=None)
+        return (latest["crawl_date"], latest["crawl_time"]) if latest else None
+
+    def groups(self, crawl_date, crawl_time):
+        """스냅샷의 중복 그룹 -> {group_id: [멤버 + 설명]} (그룹 크기 내림차순)"""
+        result = {}
+        for r in self.conn.execute(
+                "SELECT g.*, t.description FROM dup_groups g LEFT JOIN texts t ON t.article_no = g.article_no "
+                "WHERE g.crawl_date = ? AND g.crawl_time = ? ORDER BY g.group_id, g.article_no", (crawl_date, crawl_time)):
+            result.setdefault(r["group_id"], []).append(dict(r))
+        return dict(sorted(result.items(), key=lambda kv: -len(kv[1])))
+
+    def article(self, article_no):
+        text = self.conn.execute("SELECT * FROM texts WHERE article_no = ?", (article_no,)).fetchone()
+        history = self.conn.execute(
+            "SELECT crawl_date, crawl_time, group_id, similarity, snapshot_id FROM dup_groups WHERE article_no = ?",
+            (article_no,)).fetchall()
+        return (dict(text) if text else None), [dict(h) for h in history]
+
+
+def find_duplicates(complex_no, trade_type, rows, crawl_date, crawl_time, snapshot_id=None):
+    """크롤러에서 호출하는 단축 함수 (실패해도 저장을 막지 않도록 예외 흡수)"""
+    try:
+        started = time.time()
+        index = NearDuplicateIndex()
+        try:
+            groups, stats = index.update(complex_no, trade_type, rows, crawl_date, crawl_time, snapshot_id)
+        finally:
+            index.close()
+        for group in groups:
+            agents = {m["agent"] for m in group["members"]}
+            print(f"   👯 [Dup] 그룹 {group['group_id']}: 매물 {len(group['members'])}건 / 중개업소 {len(agents)}곳 "
+                  f"(최대 유사도 {max(m['similarity'] for m in group['members']):.2f})")
+        print(f"👯 [Dup] {complex_no}/{trade_type}: 설명 {stats['indexed']}건 (서명 계산 {stats['hashed']}건, "
+              f"후보 비교 {stats['compared']}건), 중복 그룹 {len(groups)}개 ({time.time() - started:.1f}초)")
+        return groups
+    except Exception as e:
+        print(f"❌ [Dup] 중복 문구 탐지 실패: {e}")
+        return []
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="매물 설명 중복 문구 그룹")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_groups = sub.add_parser("groups", help="스냅샷의 중복 그룹 (기본: 최근 스냅샷)")
+    p_groups.add_argument("--date", help="YYYY-MM-DD")
+    p_groups.add_argument("--time", help="'14시' / '14:05'")
+    p_groups.add_argument("--min-agents", type=int, default=2)
+    p_show = sub.add_parser("show", help="매물 1건의 설명과 그룹 이력")
+    p_show.add_argument("article_no")
+    args = parser.parse_args(argv)
+
+    index = NearDuplicateIndex()
+    try:
+        if args.cmd == "groups":
+            snapshot = (args.date, args.time) if args.date and args.time else index.latest_snapshot()
+            if not snapshot:
+                print("⚠️ 저장된 중복 그룹이 없습니다.")
+                return
+            shown = 0
+            for group_id, members in index.groups(*snapshot).items():
+                if len({m["agent"] for m in members}) < args.min_agents:
+                    continue
+                shown += 1
+                print(f"[{group_id}] 매물 {len(members)}건")
+                for m in members:
+                    print(f"  {m['article_no']}\t{m['complex_no']}/{m['trade_type']}\t{m['agent']}\t{m['similarity']:.2f}\t{(m['description'] or '')[:60]}")
+            print(f"-- {snapshot[0]} {snapshot[1]}: 그룹 {shown}개", file=sys.stderr)
+        elif args.cmd == "show":
+            text, history = index.article(args.article_no)
+            if not text:
+                print("⚠️ 색인에 없는 매물입니다.")
+                return
+            print(f"{text['article_no']}\t{text['complex_no']}/{text['trade_type']}\t{text['agent']}\t{text['first_seen']} ~ {text['last_seen']}")
+            print(f"설명: {text['description']}")
+            for h in sorted(history, key=snapshot_order):
+                print(f"  {h['crawl_date']} {h['crawl_time']}\t그룹 {h['group_id']}\t유사도 {h['similarity']:.2f}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
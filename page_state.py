@@ -0,0 +1,192 @@
+import time
+
+from rate_limiter import (
+    get_limiter, classify_response, classify_page_text, BlockedError,
+    OK, THROTTLED, BLOCKED,
+)
+
+# ==================================================================
+# [판정] 단지 페이지 접속 직후 상태 분류 (빠른 실패)
+# ==================================================================
+# 예전에는 WebDriverWait(40초/20초) 후 50회 스크롤까지 다 돌고 나서야 0건임을 알았습니다.
+# 여기서는 접속 직후 0.25초 간격으로 아래 정보를 한 번에 읽어 상태가 확정되는 즉시 반환합니다.
+#   - 문서 제목/본문 앞부분 (rate_limiter 의 차단/과부하 문구, 본문은 매물 화면이 없을 때만)
+#   - 문서 및 articleList API 응답 상태 코드 (Resource Timing, 성능 로그를 소비하지 않음)
+#   - 필터/목록 영역/매물 요소 존재 여부, "매물이 없습니다" 문구
+# EMPTY 는 "매물 없음" 문구가 보이거나 단지 API 의 매물 수(dealCount/leaseCount)가 0일 때만 확정합니다.
+# 목록이 늦게 그려지는 것만으로는 0건으로 보지 않습니다. (0건 + 완전 수집이면 전체 삭제로 기록되므로)
+# 상태별 조치:
+#   OK             -> 계속 진행
+#   EMPTY          -> 스크롤 없이 0건으로 종료 (정상 결과)
+#   THROTTLED      -> 속도 제한 반영 후 재시도
+#   BLOCKED        -> 즉시 중단, 재시도 안 함 (BlockedError)
+#   LAYOUT_CHANGED -> 즉시 중단, 재시도 안 함 (화면 구조 변경, 셀렉터 수정 필요)
+EMPTY, LAYOUT_CHANGED = "EMPTY", "LAYOUT_CHANGED"
+ACTIONS = {
+    OK: "continue",
+    EMPTY: "finish_empty",
+    THROTTLED: "retry",
+    BLOCKED: "abort",
+    LAYOUT_CHANGED: "abort",
+}
+
+PROBE_TIMEOUT = 15.0   # 이 안에 확정되지 않으면 THROTTLED(골격만 있음) / LAYOUT_CHANGED
+LAYOUT_GRACE = 4.0     # 문서 로딩 완료 후 필터 영역이 이 시간 안에 안 나오면 LAYOUT_CHANGED
+TOTAL_CHECK_AFTER = 1.5  # articleList 응답 후 매물 요소가 이 시간 안에 안 나오면 단지 API 매물 수 1회 확인
+POLL_INTERVAL = 0.25
+
+FILTER_SELECTOR = "#complex_article_trad_type_filter_0"
+LIST_SELECTOR = "#articleListArea"
+ITEM_SELECTOR = "div.item:not(.item--child)"
+EMPTY_MARKERS = ("등록된 매물이 없습니다", "조건에 맞는 매물이 없습니다", "매물이 없습니다")
+
+_PROBE_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const api = performance.getEntriesByType('resource').filter(e => e.name.includes('api/articles/complex'));
+const list = document.querySelector(arguments[1]);
+return {
+    ready: document.readyState,
+    title: document.title || '',
+    text: document.body ? document.body.innerText.slice(0, 2000) : '',
+    doc_status: nav && nav.responseStatus ? nav.responseStatus : 0,
+    api_status: api.map(e => e.responseStatus || 0),
+    has_filter: !!document.querySelector(arguments[0]),
+    has_list: !!list,
+    list_text: list ? list.innerText.slice(0, 300) : '',
+    items: document.querySelectorAll(arguments[2]).length,
+};
+"""
+
+
+class PageStateError(RuntimeError):
+    """페이지 상태 때문에 진행할 수 없음 (state: THROTTLED / LAYOUT_CHANGED)"""
+
+    def __init__(self, state, message):
+        super().__init__(message)
+        self.state = state
+
+
+class PageState:
+
+    __slots__ = ("state", "detail", "elapsed")
+
+    def __init__(self, state, detail="", elapsed=0.0):
+        self.state = state
+        self.detail = detail
+        self.elapsed = elapsed
+
+    @property
+    def action(self):
+        return ACTIONS[self.state]
+
+    def __repr__(self):
+        return f"PageState({self.state}, {self.detail!r}, {self.elapsed:.1f}s)"
+
+
+def classify_snapshot(snap, loaded_for=0.0, api_total=None):
+    """
+    probe 결과 1회분 -> (상태, 설명). 아직 판단할 수 없으면 (None, "")
+    loaded_for: 문서 로딩 완료 후 경과 초 / api_total: 단지 API 의 매물 수 (확인 전/실패 시 None)
+    """
+    # 매물 화면이 그려졌으면 본문(매물 설명 포함)은 문구 검사에서 제외
+    outcome = classify_page_text(snap.get("doc_status") or 200, snap.get("title", ""), snap.get("text", ""),
+                                 bool(snap.get("has_filter") or snap.get("has_list")))
+    if outcome == BLOCKED:
+        return BLOCKED, f"차단 문구/상태 (문서 {snap.get('doc_status')})"
+    for status in snap.get("api_status") or []:
+        api_outcome = classify_response(status)
+        if api_outcome == BLOCKED:
+            return BLOCKED, f"articleList API {status}"
+        if api_outcome == THROTTLED:
+            return THROTTLED, f"articleList API {status}"
+    if outcome == THROTTLED:
+        return THROTTLED, f"과부하 문구/상태 (문서 {snap.get('doc_status')})"
+
+    if snap.get("items"):
+        return OK, f"매물 요소 {snap['items']}개"
+    if snap.get("has_filter") or snap.get("has_list"):
+        list_text = snap.get("list_text") or ""
+        if any(m in list_text for m in EMPTY_MARKERS):
+            return EMPTY, "매물 없음 문구"
+        if api_total == 0:
+            return EMPTY, "단지 API 매물 수 0"
+        return None, ""
+
+    if snap.get("ready") == "complete" and loaded_for >= LAYOUT_GRACE:
+        return LAYOUT_CHANGED, f"필터({FILTER_SELECTOR})/목록({LIST_SELECTOR}) 영역 없음"
+    return None, ""
+
+
+def probe(driver, timeout=PROBE_TIMEOUT, total_fn=None):
+    """
+    접속 직후 페이지 상태를 확정될 때까지(최대 timeout 초) 짧게 반복 확인
+    total_fn: 단지 API 의 매물 수를 돌려주는 함수 (목록이 비어 있을 때 1번만 호출, 실패 시 None)
+    """
+    started = time.monotonic()
+    loaded_at = api_at = None
+    api_total, total_checked = None, False
+    last_error = ""
+    snap = {}
+
+    while True:
+        now = time.monotonic()
+        try:
+            snap = driver.execute_script(_PROBE_JS, FILTER_SELECTOR, LIST_SELECTOR, ITEM_SELECTOR) or {}
+        except Exception as e:
+            last_error = str(e)[:200]
+
+        if snap.get("ready") == "complete" and loaded_at is None:
+            loaded_at = now
+        if snap.get("api_status") and api_at is None:
+            api_at = now
+
+        # 목록 영역은 있는데 매물 요소가 계속 없으면 0건인지 단지 API 로 확인
+        if (total_fn and not total_checked and api_at is not None and now - api_at >= TOTAL_CHECK_AFTER
+                and not snap.get("items") and (snap.get("has_filter") or snap.get("has_list"))):
+            total_checked = True
+            api_total = total_fn()
+
+        state, detail = classify_snapshot(
+            snap,
+            loaded_for=now - loaded_at if loaded_at is not None else 0.0,
+            api_total=api_total,
+        )
+        if state:
+            return PageState(state, detail, now - started)
+
+        if now - started >= timeout:
+            # 화면 골격은 있는데 목록이 안 오면 일시적 지연, 골격도 없으면 구조 변경으로 봄
+            if snap.get("has_filter") or snap.get("has_list"):
+                return PageState(THROTTLED, f"{timeout:.0f}초 안에 목록 응답 없음", now - started)
+            detail = f"{timeout:.0f}초 안에 상태 확정 실패"
+            if last_error:
+                detail += f" ({last_error})"
+            return PageState(LAYOUT_CHANGED, detail, now - started)
+        time.sleep(POLL_INTERVAL)
+
+
+def check_landing(driver, host, timeout=PROBE_TIMEOUT, screenshot="debug_page_state.png", total_fn=None):
+    """
+    probe + 속도 제한 반영 + 상태별 조치
+    OK / EMPTY 는 PageState 반환, BLOCKED 는 BlockedError, 나머지는 PageStateError
+    """
+    result = probe(driver, timeout, total_fn)
+    limiter_outcome = result.state if result.state in (THROTTLED, BLOCKED) else OK
+    get_limiter().feedback(host, "page", limiter_outcome)
+    print(f"   🩺 [Page] {result.state} ({result.detail}, {result.elapsed:.1f}초) -> {result.action}")
+
+    if result.state in (OK, EMPTY):
+        return result
+    if screenshot:
+        try: driver.save_screenshot(screenshot)
+        except Exception: pass
+    if result.state == BLOCKED:
+        raise BlockedError(f"차단 페이지 감지 ({host}): {result.detail}")
+    raise PageStateError(result.state, f"{result.state}: {result.detail}")
+
+
+def is_retryable(exc):
+    """재시도해도 결과가 같을 오류(차단, 화면 구조 변경)는 False"""
+    if isinstance(exc, BlockedError):
+        return False
+    return not (isinstance(exc, PageStateError) and exc.state == LAYOUT_CHANGED)
@@ -0,0 +1,375 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+import multiprocessing as mp
+from datetime import datetime
+
+from config import KST, COMPLEX_NO
+from crawl_budget import CrawlBudget, DeadlineExceeded, DEFER
+
+# ==================================================================
+# [병렬] 단지 x 거래방식 단위로 워커 프로세스에 분배
+# ==================================================================
+# 워커마다 가상 디스플레이(Xvfb) + 크롬 1개를 띄우고, 작업 큐에서 (단지, 거래방식)을
+# 하나씩 꺼내 처리합니다. 결과는 부모 프로세스가 모아서 한 번에 저장합니다.
+# 매물 행에는 단지번호(complex_no)를 붙이고, crawl_history 에는 (단지, 거래방식) 작업마다
+# 그 작업의 상태/완전성으로 1건씩 기록합니다. (연기된 작업은 이력 없음 = 이 스냅샷에서 수집하지 않음)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)  # 크롬 1개가 여러 프로세스를 쓰므로 코어 절반
+DEFAULT_MEMORY_MB = int(os.environ.get("CRAWLER_WORKER_MEMORY_MB", "1500"))
+# 마감 예산 (crawl_budget.py): 작업은 우선순위 순으로 큐에 들어가므로 시간이 모자라면 뒤쪽(낮은 우선순위) 단지가 연기됨
+MIN_TASK_SEC = 120      # 남은 수집 시간이 이보다 적으면 새 작업을 시작하지 않고 연기
+WORKER_MARGIN_SEC = 15  # 워커는 부모보다 이만큼 먼저 마감 (결과를 돌려줄 시간)
+STOP_GRACE_SEC = 15     # 마감 후에도 안 끝난 워커에 SIGTERM 을 보내고 기다리는 시간
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def tree_rss_mb(root_pid):
+    """root_pid 와 모든 하위 프로세스(크롬, 드라이버, Xvfb)의 RSS 합계 (MB)"""
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += _rss_kb(pid)
+        stack.extend(children.get(pid, []))
+    return total // 1024
+
+
+class MemoryWatchdog(threading.Thread):
+    """워커 프로세스 트리 메모리가 한도를 넘으면 브라우저를 강제 종료"""
+
+    def __init__(self, limit_mb, interval=2.0):
+        super().__init__(daemon=True)
+        self.limit_mb = limit_mb
+        self.interval = interval
+        self.driver = None
+        self.tripped = False
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            driver = self.driver
+            if driver is None:
+                continue
+            used = tree_rss_mb(os.getpid())
+            if used > self.limit_mb:
+                print(f"   🧯 메모리 한도 초과 ({used}MB > {self.limit_mb}MB) -> 브라우저 종료")
+                self.tripped = True
+                self.driver = None
+                try: driver.quit()
+                except: pass
+
+
+def _worker_main(worker_idx, task_q, result_q, driver_lock, crawl_date, crawl_time, memory_mb, deadline_at=None):
+    """워커 프로세스: 디스플레이/크롬 1개로 작업 큐를 처리 (deadline_at: 수집 마감 시각, 유닉스 초)"""
+    from pyvirtualdisplay import Display
+    from dom_crawler import create_driver, crawl_complex
+
+    # 디스플레이 번호는 Xvfb 잠금 파일 기준으로 자동 할당되어 워커끼리 겹치지 않음
+    display = Display(visible=0, size=(1920, 1080))
+    display.start()
+    print(f"👷 [W{worker_idx}] 시작 (DISPLAY=:{display.display}, 메모리 한도 {memory_mb}MB)")
+
+    watchdog = MemoryWatchdog(memory_mb)
+    watchdog.start()
+    driver = None
+    budget = CrawlBudget(deadline_at, write_reserve=0.0) if deadline_at else CrawlBudget()
+
+    try:
+        with budget.guard():
+            while not budget.stop_reason:
+                task = task_q.get()
+                if task is None:
+                    break
+                complex_no, trade_type, title_prefix = task
+                started = time.time()
+
+                # 남은 시간으로 끝낼 수 없는 작업은 시작하지 않음 (큐를 비우며 연기 처리)
+                if budget.available() < MIN_TASK_SEC:
+                    result_q.put({"task": task, "worker": worker_idx, "rows": [], "error": "", "deferred": True, "elapsed": 0.0})
+                    continue
+
+                task_budget = budget.sub(1.0)
+                try:
+                    if driver is None:
+                        # undetected_chromedriver 패치 파일 경합 방지를 위해 생성은 한 번에 하나씩
+                        with driver_lock:
+                            driver = create_driver(extra_args=[f"--js-flags=--max-old-space-size={memory_mb // 2}"])
+                        watchdog.tripped = False
+                        watchdog.driver = driver
+
+                    report = {}
+                    rows = crawl_complex(driver, complex_no, trade_type, crawl_date, crawl_time, title_prefix, report, task_budget)
+                    result_q.put({"task": task, "worker": worker_idx, "rows": rows, "error": "", "report": report,
+                                  "partial": task_budget.partial, "budget": (task_budget.level, task_budget.notes),
+                                  "elapsed": time.time() - started})
+
+                except DeadlineExceeded as e:
+                    # 접속 단계에서 마감/중단 -> 실패가 아니라 연기로 기록
+                    print(f"⏳ [W{worker_idx}] {complex_no}/{trade_type} 연기: {e}")
+                    result_q.put({"task": task, "worker": worker_idx, "rows": [], "error": "", "deferred": True, "elapsed": time.time() - started})
+
+                except Exception as e:
+                    error = str(e)
+                    if watchdog.tripped:
+                        error = f"메모리 한도 초과 ({memory_mb}MB): {error}"
+                    print(f"❌ [W{worker_idx}] {complex_no}/{trade_type} 실패: {error}")
+                    result_q.put({"task": task, "worker": worker_idx, "rows": [], "error": error, "elapsed": time.time() - started})
+
+                    # 브라우저 상태를 믿을 수 없으므로 다음 작업은 새 크롬으로
+                    watchdog.driver = None
+                    if driver:
+                        try: driver.quit()
+                        except: pass
+                    driver = None
+    except DeadlineExceeded:
+        pass  # 작업 대기 중 중단 요청 -> 정리 후 종료
+    finally:
+        watchdog.driver = None
+        if driver:
+            try: driver.quit()
+            except: pass
+        display.stop()
+        # 워커 프로세스는 atexit 가 돌지 않으므로 추적 리포트를 직접 남김 (CRAWLER_TRACE=1)
+        from driver_trace import get_tracer
+        get_tracer().report()
+
+
+def task_status(result):
+    """작업 결과 -> crawl_history / 생애주기 상태 (0건은 매물 없음이 확정된 경우만 성공)"""
+    if result["error"] or not (result["rows"] or result.get("report", {}).get("empty")):
+        return "FAIL"
+    return "PARTIAL" if result.get("partial") else "SUCCESS"
+
+
+def run_parallel(complexes, trade_types, workers=DEFAULT_WORKERS, memory_mb=DEFAULT_MEMORY_MB, save=True, budget=None):
+    """
+    complexes: [(단지번호, 제목에서 제거할 단지명), ...] (우선순위 순)
+    budget: CrawlBudget 을 넘기면 마감 전에 수집을 멈추고 저장 예산 안에서 저장 (연기된 작업은 deferred)
+    반환: (병합된 매물 리스트, 작업별 결과 리스트)
+    """
+    budget = budget or CrawlBudget()
+    now = datetime.now(KST)
+    crawl_date = now.strftime("%Y-%m-%d")
+    crawl_time = f"{now.strftime('%H')}시"
+
+    tasks = [(complex_no, trade_type, title_prefix) for complex_no, title_prefix in complexes for trade_type in trade_types]
+    n_workers = max(1, min(workers, len(tasks)))
+    print(f"🚀 [병렬] {crawl_date} {crawl_time} 작업 {len(tasks)}개 / 워커 {n_workers}개")
+
+    ctx = mp.get_context("spawn")
+    task_q, result_q, driver_lock = ctx.Queue(), ctx.Queue(), ctx.Lock()
+    for task in tasks:
+        task_q.put(task)
+    for _ in range(n_workers):
+        task_q.put(None)
+
+    worker_deadline = budget.deadline_at - budget.write_reserve - WORKER_MARGIN_SEC if budget.limited else None
+    procs = [
+        ctx.Process(target=_worker_main, args=(i, task_q, result_q, driver_lock, crawl_date, crawl_time, memory_mb, worker_deadline))
+        for i in range(n_workers)
+    ]
+    for p in procs:
+        p.start()
+
+    results = []
+    stop_at = None
+    while len(results) < len(tasks):
+        # 마감이 지나도 안 끝난 워커(멈춘 드라이버 등)는 SIGTERM -> 수집분을 돌려주고 종료
+        if stop_at is None and budget.expired():
+            stop_at = time.time() + STOP_GRACE_SEC
+            budget.stop_reason = "마감 시각 도달"
+            print("⏳ [Budget] 마감: 작업 중인 워커에 중단 요청")
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+        if stop_at is not None and time.time() >= stop_at:
+            break
+        timeout = 30.0 if not budget.limited else max(0.5, min(30.0, budget.available() if stop_at is None else stop_at - time.time()))
+        try:
+            results.append(result_q.get(timeout=timeout))
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break  # 워커가 모두 죽었으면 더 기다리지 않음
+    for p in procs:
+        p.join(STOP_GRACE_SEC if stop_at else None)
+        if p.is_alive():
+            p.kill()
+
+    # 마감으로 시작하지 못한 작업은 연기로 기록 (다음 실행에서 스케줄러가 다시 고름)
+    done = {r["task"] for r in results}
+    if budget.limited and budget.expired():
+        results += [{"task": t, "worker": "-", "rows": [], "error": "", "deferred": True, "elapsed": 0.0} for t in tasks if t not in done]
+    for r in results:
+        if r.get("budget"):
+            budget.merge(*r["budget"])
+    deferred = [r["task"] for r in results if r.get("deferred")]
+    if deferred:
+        budget.degrade(DEFER, f"{len(deferred)}개 작업 다음 실행으로: " + ", ".join(f"{c}/{t}" for c, t, _ in deferred))
+
+    # --------------------------------------------------------------
+    # 결과 병합 (단지/거래방식별, 매물번호 기준 중복 제거)
+    # --------------------------------------------------------------
+    merged = {}
+    for r in results:
+        for row in r["rows"]:
+            merged[(row.get("complex_no", r["task"][0]), row["trade_type"], row["article_no"])] = row
+    all_rows = list(merged.values())
+
+    budget.begin("write")
+    errors = [f"{r['task'][0]}/{r['task'][1]}: {r['error']}" for r in results if r["error"]]
+    done = {r["task"] for r in results}
+    errors += [f"{t[0]}/{t[1]}: 결과 없음 (워커 비정상 종료)" for t in tasks if t not in done]
+
+    for r in sorted(results, key=lambda r: r["task"]):
+        print(f"   - [W{r['worker']}] {r['task'][0]}/{r['task'][1]}: {len(r['rows'])}건, {r['elapsed']:.0f}초")
+    print(f"📊 병합 결과: {len(all_rows)}건, 실패 작업 {len(errors)}개")
+
+    if save:
+        from db_client import get_supabase
+        from dom_crawler import save_listings, save_crawl_history
+        from snapshot_registry import register_snapshot
+
+        supabase = get_supabase()
+        # 연기된 작업을 뺀, 이번 스냅샷에서 시도한 단지/거래방식만 등록
+        attempted = [r["task"] for r in results if not r.get("deferred")]
+        snapshot_id = register_snapshot(crawl_date, crawl_time, [t[0] for t in attempted], [t[1] for t in attempted])
+        for trade_type in trade_types:
+            save_listings(supabase, [r for r in all_rows if r["trade_type"] == trade_type], crawl_date, crawl_time, snapshot_id)
+
+        from completeness import summarize
+
+        from change_events import emit_changes
+        from price_sketch import check_prices
+        from near_duplicates import find_duplicates
+
+        for r in results:
+            # 0건은 매물 없음이 확정된 경우(report["empty"])만 비교
+            if (r["rows"] or r.get("report", {}).get("empty")) and not r["error"]:
+                complex_no, trade_type, _ = r["task"]
+                events = emit_changes(complex_no, trade_type, r["rows"], crawl_date, crawl_time, r.get("report", {}).get("complete", True))
+                r["events"] = len(events)
+                r["bait"] = len(check_prices(complex_no, trade_type, r["rows"], crawl_date, crawl_time))
+                r["dups"] = len(find_duplicates(complex_no, trade_type, r["rows"], crawl_date, crawl_time, snapshot_id))
+
+        # (단지, 거래방식) 작업마다 이력 1건 (history_key 의 거래방식 + complex_no)
+        finished = {r["task"]: r for r in results}
+        for task in tasks:
+            complex_no, trade_type, _ = task
+            r = finished.get(task)
+            if r is None:
+                save_crawl_history(supabase, crawl_date, crawl_time, "FAIL", 0, "결과 없음 (워커 비정상 종료)",
+                                   {"is_complete": False}, snapshot_id, trade_type, complex_no)
+                continue
+            if r.get("deferred"):
+                continue
+            report = r.get("report")
+            completeness = summarize([report]) if report else {"is_complete": False}
+            if r.get("partial"):
+                completeness["is_complete"] = False
+            notes = ([r["error"]] if r["error"] else []) + list(r.get("budget", (None, []))[1])
+            save_crawl_history(supabase, crawl_date, crawl_time, task_status(r), len(r["rows"]), " | ".join(notes),
+                               completeness, snapshot_id, trade_type, complex_no)
+
+        from lifecycle_state import advance_lifecycle
+
+        for r in results:
+            if r.get("deferred"):
+                continue  # 이번 스냅샷에서 시도하지 않은 단지는 상태를 건드리지 않음
+            complex_no, trade_type, _ = r["task"]
+            advance_lifecycle(complex_no, trade_type, crawl_date, crawl_time, task_status(r), r["rows"],
+                              r.get("report", {}).get("complete", True), snapshot_id)
+
+    return all_rows, results
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def _parse_complex(value):
+    """'108064' 또는 '108064:DMC파크뷰자이'"""
+    complex_no, _, title_prefix = value.partition(":")
+    if not title_prefix and complex_no == COMPLEX_NO:
+        title_prefix = "DMC파크뷰자이"
+    return complex_no, title_prefix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="멀티 프로세스 브라우저 크롤링")
+    parser.add_argument("--complex", dest="complexes", action="append", type=_parse_complex,
+                        help="단지번호[:단지명] (여러 번 지정 가능)")
+    parser.add_argument("--catalog-region", help="단지 카탈로그(complex_catalog.py)에서 지역 코드로 단지 목록 가져오기")
+    parser.add_argument("--min-households", type=int, default=0, help="카탈로그 사용 시 최소 세대수")
+    parser.add_argument("--trade-type", dest="trade_types", action="append", choices=["매매", "전세"])
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB, help="워커별 메모리 한도")
+    parser.add_argument("--scheduled", action="store_true", help="적응형 스케줄러(adaptive_scheduler.py)가 고른 단지만 크롤링")
+    parser.add_argument("--budget", type=int, help="--scheduled 사용 시 이번 실행에서 크롤링할 최대 단지 수")
+    parser.add_argument("--deadline", type=float, help="마감까지 남은 분 (없으면 CRAWL_DEADLINE 환경변수, crawl_budget.py)")
+    parser.add_argument("--dry-run", action="store_true", help="DB 저장 없이 수집만")
+    args = parser.parse_args(argv)
+
+    complexes = list(args.complexes or [])
+    if args.catalog_region is not None:
+        from complex_catalog import ComplexCatalog
+
+        catalog = ComplexCatalog()
+        complexes += [(c["complex_no"], c["name"] or "") for c in catalog.complexes(args.catalog_region, args.min_households)]
+        catalog.close()
+    if not complexes:
+        complexes = [_parse_complex(COMPLEX_NO)]
+    trade_types = args.trade_types or ["매매", "전세"]
+
+    scheduler = None
+    if args.scheduled:
+        from adaptive_scheduler import AdaptiveScheduler
+
+        scheduler = AdaptiveScheduler()
+        scheduler.register(c for c, _ in complexes)
+        names = dict(complexes)
+        complexes = [(c, names.get(c) or _parse_complex(c)[1]) for c in scheduler.due(args.budget)]
+        if not complexes:
+            print("⏭️ 주기가 도래한 단지가 없습니다.")
+            scheduler.close()
+            return
+
+    budget = CrawlBudget(time.time() + args.deadline * 60) if args.deadline else CrawlBudget.from_env()
+    _, results = run_parallel(complexes, trade_types, args.workers, args.memory_mb, save=not args.dry_run, budget=budget)
+
+    if scheduler:
+        # 모든 거래방식이 끝까지 성공한 단지만 변동량 측정에 반영 (연기/일부 수집은 다음 실행에서 다시 고름)
+        for complex_no, _ in complexes:
+            mine = [r for r in results if r["task"][0] == complex_no]
+            if len(mine) == len(trade_types) and not any(r["error"] or r.get("deferred") or r.get("partial") for r in mine):
+                interval = scheduler.record_crawl(complex_no, sum(r.get("events", 0) for r in mine))
+                print(f"   ⏱️ {complex_no}: 다음 주기 {interval:.0f}분")
+        scheduler.close()
+    if any(r["error"] for r in results) or len(results) < len(complexes) * len(trade_types):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,440 @@
+import os
+import sys
+import json
+import zlib
+import fcntl
+import sqlite3
+import hashlib
+import argparse
+from contextlib import contextmanager
+
+from config import data_path
+
+# ==================================================================
+# [원본 보관] articleList 아이템 내용 주소 저장소 (스냅샷 간 중복 제거)
+# ==================================================================
+# 매시간 크롤링해도 대부분의 아이템은 직전과 바이트 단위로 같습니다.
+#   - 아이템을 정규화한 JSON 의 sha256 을 키로, 고유한 버전만 1번 압축 저장
+#   - 스냅샷은 해시 목록(매니페스트)만 보관
+#   - 압축은 학습된 사전을 쓰는 zstd (zstandard 미설치 시 zlib 프리셋 사전)
+# 압축된 아이템은 팩 파일에 순서대로 이어 붙이므로, 스냅샷을 읽을 때는
+# (팩, 오프셋) 순으로 정렬해 순차 읽기를 합니다.
+#   data/payloads/index.db      해시 -> 팩 위치, 사전, 매니페스트
+#   data/payloads/pack-NNNNNN   압축 아이템
+# 크롤러는 SnapshotWriter 로 응답 페이지 단위로 아이템을 넣고, 메모리에는 매물별 해시만 들고 있다가
+# 마지막에 매니페스트만 기록합니다. (원본 아이템을 수집 내내 쌓아 두지 않도록)
+STORE_DIR = "payloads"
+FLUSH_ITEMS = 20           # articleList 한 페이지 분량 (페이지 경계 밖에서도 이만큼 쌓이면 저장)
+PACK_MAX_BYTES = 64 * 1024 * 1024
+TRAIN_AFTER = 500          # 사전 없이 저장된 아이템이 이만큼 쌓이면 사전 학습
+TRAIN_SAMPLES = 2000
+DICT_SIZE = 32 * 1024      # zlib 프리셋 사전 최대 크기와 동일
+ZSTD_LEVEL = 9
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash   BLOB PRIMARY KEY,
+    pack   INTEGER,
+    offset INTEGER,
+    length INTEGER,
+    raw_length INTEGER,
+    dict_id INTEGER DEFAULT 0,
+    codec  TEXT
+);
+CREATE TABLE IF NOT EXISTS dicts (
+    id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    codec TEXT,
+    data  BLOB
+);
+CREATE TABLE IF NOT EXISTS manifests (
+    complex_no TEXT, trade_type TEXT, crawl_date TEXT, crawl_time TEXT,
+    hashes BLOB,
+    PRIMARY KEY (complex_no, trade_type, crawl_date, crawl_time)
+);
+"""
+
+
+def canonical(item):
+    """키 정렬 + 공백 없는 JSON (같은 내용이면 같은 바이트)"""
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).digest()
+
+
+# ==================================================================
+# [코덱] 압축 / 해제
+# ==================================================================
+def _train(samples, codec):
+    if codec == "zstd":
+        return zstandard.train_dictionary(DICT_SIZE, samples).as_bytes()
+    # zlib 프리셋 사전: 뒤쪽 바이트일수록 잘 참조되므로 최근 아이템이 뒤에 오도록 이어 붙임
+    data = b"".join(samples)
+    return data[-DICT_SIZE:]
+
+
+class _Codecs:
+    """사전 id 별 압축기/해제기 캐시"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._dicts = {}
+        self._compressors = {}
+        self._decompressors = {}
+
+    def dict_data(self, dict_id):
+        if dict_id not in self._dicts:
+            row = self.conn.execute("SELECT codec, data FROM dicts WHERE id = ?", (dict_id,)).fetchone()
+            self._dicts[dict_id] = (row[0], bytes(row[1])) if row else (None, b"")
+        return self._dicts[dict_id]
+
+    def compress(self, data, codec, dict_id):
+        _, zdict = self.dict_data(dict_id) if dict_id else (None, b"")
+        if codec == "zstd":
+            if dict_id not in self._compressors:
+                kwargs = {"dict_data": zstandard.ZstdCompressionDict(zdict)} if zdict else {}
+                self._compressors[dict_id] = zstandard.ZstdCompressor(level=ZSTD_LEVEL, **kwargs)
+            return self._compressors[dict_id].compress(data)
+        c = zlib.compressobj(9, zdict=zdict) if zdict else zlib.compressobj(9)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, blob, codec, dict_id):
+        _, zdict = self.dict_data(dict_id) if dict_id else (None, b"")
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstd 로 저장된 아이템입니다. zstandard 를 설치하세요.")
+            if dict_id not in self._decompressors:
+                kwargs = {"dict_data": zstandard.ZstdCompressionDict(zdict)} if zdict else {}
+                self._decompressors[dict_id] = zstandard.ZstdDecompressor(**kwargs)
+            return self._decompressors[dict_id].decompress(blob)
+        d = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        return d.decompress(blob) + d.flush()
+
+
+# ==================================================================
+# [저장소]
+# ==================================================================
+class PayloadStore:
+
+    def __init__(self, path=None):
+        self.root = path or os.path.dirname(data_path(STORE_DIR, "index.db"))
+        self.conn = sqlite3.connect(os.path.join(self.root, "index.db"))
+        self.conn.executescript(SCHEMA)
+        self.codecs = _Codecs(self.conn)
+        self.codec = "zstd" if zstandard is not None else "zlib"
+
+    def close(self):
+        self.conn.close()
+
+    def _pack_path(self, pack):
+        return os.path.join(self.root, f"pack-{pack:06d}")
+
+    def _current_dict(self):
+        row = self.conn.execute("SELECT id FROM dicts WHERE codec = ? ORDER BY id DESC LIMIT 1", (self.codec,)).fetchone()
+        return row[0] if row else 0
+
+    def _current_pack(self):
+        row = self.conn.execute("SELECT MAX(pack) FROM blobs").fetchone()
+        pack = row[0] or 1
+        try:
+            if os.path.getsize(self._pack_path(pack)) >= PACK_MAX_BYTES:
+                pack += 1
+        except OSError:
+            pass
+        return pack
+
+    # --------------------------------------------------------------
+    # 쓰기
+    # --------------------------------------------------------------
+    @contextmanager
+    def _locked(self):
+        """여러 크롤러 프로세스가 같은 팩 파일에 이어 쓰지 않도록 파일 잠금"""
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def put_items(self, items):
+        """아이템만 저장 (매니페스트 없음). 반환: (아이템 순서대로의 해시 목록, 새로 저장한 아이템 수)"""
+        encoded = [canonical(item) for item in items]
+        hashes = [content_hash(data) for data in encoded]
+        with self._locked():
+            new = self._put_blobs(encoded, hashes)
+            self._maybe_train()
+        return hashes, new
+
+    def put_manifest(self, complex_no, trade_type, crawl_date, crawl_time, hashes):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO manifests VALUES (?, ?, ?, ?, ?)",
+                (str(complex_no), trade_type, crawl_date, crawl_time, b"".join(hashes)),
+            )
+
+    def put_snapshot(self, complex_no, trade_type, crawl_date, crawl_time, items):
+        """스냅샷 1개 저장. 반환: (전체 아이템 수, 새로 저장한 아이템 수)"""
+        hashes, new = self.put_items(items)
+        self.put_manifest(complex_no, trade_type, crawl_date, crawl_time, hashes)
+        return len(hashes), new
+
+    def _put_blobs(self, encoded, hashes):
+        known = set()
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            known.update(bytes(r[0]) for r in self.conn.execute(f"SELECT hash FROM blobs WHERE hash IN ({marks})", chunk))
+
+        pending = {}
+        for data, h in zip(encoded, hashes):
+            if h not in known and h not in pending:
+                pending[h] = data
+        if not pending:
+            return 0
+
+        dict_id = self._current_dict()
+        pack = self._current_pack()
+        rows = []
+        with open(self._pack_path(pack), "ab") as f:
+            for h, data in pending.items():
+                blob = self.codecs.compress(data, self.codec, dict_id)
+                offset = f.tell()
+                f.write(blob)
+                rows.append((h, pack, offset, len(blob), len(data), dict_id, self.codec))
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _maybe_train(self):
+        if self._current_dict():
+            return
+        count = self.conn.execute("SELECT COUNT(*) FROM blobs WHERE dict_id = 0").fetchone()[0]
+        if count >= TRAIN_AFTER:
+            self.train()
+
+    def train(self, samples=TRAIN_SAMPLES):
+        """최근 아이템으로 사전 학습 (이후 저장분부터 적용, 기존 아이템은 그대로)"""
+        rows = self.conn.execute(
+            "SELECT hash, pack, offset, length, raw_length, dict_id, codec FROM blobs ORDER BY pack DESC, offset DESC LIMIT ?",
+            (samples,)).fetchall()
+        data = [self._read_blob(r) for r in self._sorted(rows)]
+        if len(data) < 10:
+            return None
+        zdict = _train(data, self.codec)
+        with self.conn:
+            cur = self.conn.execute("INSERT INTO dicts (codec, data) VALUES (?, ?)", (self.codec, zdict))
+        print(f"📚 [Payload] {self.codec} 사전 학습 완료 (샘플 {len(data)}개, {len(zdict) // 1024}KB)")
+        return cur.lastrowid
+
+    # --------------------------------------------------------------
+    # 읽기
+    # --------------------------------------------------------------
+    @staticmethod
+    def _sorted(rows):
+        return sorted(rows, key=lambda r: (r[1], r[2]))
+
+    def _read_blob(self, row, handle=None):
+        _, pack, offset, length, _, dict_id, codec = row
+        if handle is None:
+            with open(self._pack_path(pack), "rb") as f:
+                f.seek(offset)
+                blob = f.read(length)
+        else:
+            handle.seek(offset)
+            blob = handle.read(length)
+        return self.codecs.decompress(blob, codec, dict_id)
+
+    def get_many(self, hashes):
+        """해시 목록 -> {해시: 아이템}. 팩/오프셋 순으로 순차 읽기"""
+        rows = []
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows.extend(self.conn.execute(
+                f"SELECT hash, pack, offset, length, raw_length, dict_id, codec FROM blobs WHERE hash IN ({marks})", chunk))
+
+        result = {}
+        handle, handle_pack = None, None
+        try:
+            for row in self._sorted(rows):
+                if row[1] != handle_pack:
+                    if handle:
+                        handle.close()
+                    handle, handle_pack = open(self._pack_path(row[1]), "rb"), row[1]
+                result[bytes(row[0])] = json.loads(self._read_blob(row, handle))
+        finally:
+            if handle:
+                handle.close()
+        return result
+
+    def get_snapshot(self, complex_no, trade_type, crawl_date, crawl_time):
+        """매니페스트 순서대로 원본 아이템 목록 (없으면 None)"""
+        row = self.conn.execute(
+            "SELECT hashes FROM manifests WHERE complex_no = ? AND trade_type = ? AND crawl_date = ? AND crawl_time = ?",
+            (str(complex_no), trade_type, crawl_date, crawl_time)).fetchone()
+        if row is None:
+            return None
+        raw = bytes(row[0])
+        hashes = [raw[i:i + 32] for i in range(0, len(raw), 32)]
+        items = self.get_many(hashes)
+        return [items[h] for h in hashes]
+
+    def snapshots(self, complex_no=None):
+        sql = "SELECT complex_no, trade_type, crawl_date, crawl_time, LENGTH(hashes) / 32 FROM manifests"
+        params = ()
+        if complex_no:
+            sql += " WHERE complex_no = ?"
+            params = (str(complex_no),)
+        return self.conn.execute(sql + " ORDER BY crawl_date, crawl_time, complex_no, trade_type", params).fetchall()
+
+    def stats(self):
+        blobs, stored, raw = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0), COALESCE(SUM(raw_length), 0) FROM blobs").fetchone()
+        snapshots, refs = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(hashes)), 0) / 32 FROM manifests").fetchone()
+        # 스냅샷마다 통째로 저장했을 때의 원본 크기 (아이템 평균 크기 기준 추정)
+        naive = raw / blobs * refs if blobs else 0
+        return {
+            "snapshots": snapshots, "item_refs": refs, "unique_items": blobs,
+            "raw_bytes": raw, "stored_bytes": stored, "naive_bytes": int(naive),
+            "dicts": self.conn.execute("SELECT COUNT(*) FROM dicts").fetchone()[0],
+        }
+
+
+def store_snapshot(complex_no, trade_type, crawl_date, crawl_time, items):
+    """크롤러에서 호출하는 단축 함수 (보관 실패가 저장을 막지 않도록 예외 흡수)"""
+    try:
+        store = PayloadStore()
+        try:
+            total, new = store.put_snapshot(complex_no, trade_type, crawl_date, crawl_time, items)
+            print(f"🗄️ [Payload] {complex_no}/{trade_type}: {total}건 중 {new}건 신규 저장 ({store.codec})")
+            return new
+        finally:
+            store.close()
+    except Exception as e:
+        print(f"⚠️ [Payload] 원본 응답 보관 실패: {e}")
+        return None
+
+
+class SnapshotWriter:
+    """
+    수집 중인 스냅샷 1개 (단지, 거래방식). add() 로 받은 아이템을 페이지 단위로 저장소에 넣고
+    메모리에는 키(매물번호) -> 해시만 남김. 같은 키가 다시 오면 마지막 버전으로 교체
+    보관 실패가 크롤링을 막지 않도록 예외를 흡수하고, 이후 아이템은 버림
+    """
+
+    def __init__(self, complex_no, trade_type, flush_items=FLUSH_ITEMS):
+        self.complex_no = str(complex_no)
+        self.trade_type = trade_type
+        self.flush_items = flush_items
+        self.digests = {}
+        self.pending = []
+        self.new = 0
+        self.store = None
+        self.failed = False
+
+    def _store(self):
+        if self.store is None:
+            self.store = PayloadStore()
+        return self.store
+
+    def _fail(self, e):
+        print(f"⚠️ [Payload] 원본 응답 보관 실패: {e}")
+        self.failed = True
+        self.pending = []
+        self.close()
+
+    def add(self, key, item):
+        if self.failed:
+            return
+        self.pending.append((key, item))
+        if len(self.pending) >= self.flush_items:
+            self.flush()
+
+    def flush(self):
+        """쌓인 아이템 저장 (응답 페이지 하나를 다 처리할 때마다 호출)"""
+        if self.failed or not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        try:
+            hashes, new = self._store().put_items([item for _, item in pending])
+        except Exception as e:
+            self._fail(e)
+            return
+        self.new += new
+        for (key, _), h in zip(pending, hashes):
+            self.digests[key] = h
+
+    def commit(self, crawl_date, crawl_time):
+        """남은 아이템 저장 + 매니페스트 기록. 반환: 새로 저장한 아이템 수 (실패 시 None)"""
+        self.flush()
+        if self.failed:
+            return None
+        try:
+            store = self._store()
+            store.put_manifest(self.complex_no, self.trade_type, crawl_date, crawl_time, list(self.digests.values()))
+            print(f"🗄️ [Payload] {self.complex_no}/{self.trade_type}: {len(self.digests)}건 중 {self.new}건 신규 저장 ({store.codec})")
+            return self.new
+        except Exception as e:
+            self._fail(e)
+            return None
+        finally:
+            self.close()
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="articleList 원본 아이템 저장소")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="중복 제거/압축 효과")
+    p_list = sub.add_parser("list", help="저장된 스냅샷 목록")
+    p_list.add_argument("--complex", dest="complex_no")
+    p_show = sub.add_parser("show", help="스냅샷 원본을 JSONL 로 출력")
+    p_show.add_argument("complex_no")
+    p_show.add_argument("trade_type")
+    p_show.add_argument("crawl_date")
+    p_show.add_argument("crawl_time")
+    sub.add_parser("train", help="사전 재학습 (이후 저장분부터 적용)")
+    args = parser.parse_args(argv)
+
+    store = PayloadStore()
+    try:
+        if args.cmd == "stats":
+            s = store.stats()
+            ratio = s["naive_bytes"] / s["stored_bytes"] if s["stored_bytes"] else 0
+            print(f"스냅샷 {s['snapshots']}개 / 아이템 참조 {s['item_refs']}건 / 고유 아이템 {s['unique_items']}건 (사전 {s['dicts']}개)")
+            print(f"원본(고유) {s['raw_bytes'] / 1024:.0f}KB -> 저장 {s['stored_bytes'] / 1024:.0f}KB, "
+                  f"스냅샷별 통째 저장 대비 x{ratio:.1f} 절감")
+        elif args.cmd == "list":
+            for complex_no, trade_type, crawl_date, crawl_time, n in store.snapshots(args.complex_no):
+                print(f"{crawl_date} {crawl_time}\t{complex_no}/{trade_type}\t{n}건")
+        elif args.cmd == "show":
+            items = store.get_snapshot(args.complex_no, args.trade_type, args.crawl_date, args.crawl_time)
+            if items is None:
+                print("⚠️ 해당 스냅샷이 없습니다.", file=sys.stderr)
+                sys.exit(1)
+            for item in items:
+                print(json.dumps(item, ensure_ascii=False))
+        elif args.cmd == "train":
+            store.train()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,324 @@
+import sys
+import math
+import json
+import zlib
+import random
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+from config import data_path
+from change_events import JsonlSink, price_to_manwon
+
+# ==================================================================
+# [분포] (단지, 거래방식, 평형) 별 가격 분위수 스케치 + 미끼 매물 감지
+# ==================================================================
+# 이력을 매번 내려받아 분포를 계산하지 않고, 크롤링마다 가격(만원)을 KLL 스케치에 넣어 둡니다.
+#   - 스케치는 하루 단위로 저장 (zlib 압축 JSON, 수 KB) -> 기간을 골라 병합해서 조회
+#   - 크롤링 시작 시 최근 WINDOW_DAYS 일 스케치를 병합해 그룹별 기준값(분위수)을 한 번 계산하고
+#     매물마다 기준값과 비교만 하므로 건당 O(1)
+#   - 판정은 이번 크롤링 값을 넣기 전 분포로 함 (미끼 매물이 자기 기준을 끌어내리지 않도록)
+#   - 매물은 하루에 한 번만 스케치에 넣음 (매시간 크롤링해도 오래 걸린 매물의 가중치가 커지지 않도록)
+# 미끼 의심: 그룹 하위 LOW_QUANTILE 분위수 미만 + 중앙값 대비 BAIT_DISCOUNT 이상 저렴
+SKETCH_FILE = "price_sketch.db"
+OUTLIER_LOG = "price_outliers.jsonl"
+SKETCH_K = 200
+WINDOW_DAYS = 14
+MIN_SAMPLES = 30
+LOW_QUANTILE = 0.05
+BAIT_DISCOUNT = 0.15
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketches (
+    complex_no TEXT, trade_type TEXT, area_type TEXT, day TEXT, n INTEGER, data BLOB,
+    PRIMARY KEY (complex_no, trade_type, area_type, day)
+);
+CREATE TABLE IF NOT EXISTS sketched (
+    complex_no TEXT, trade_type TEXT, area_type TEXT, day TEXT, listing TEXT,
+    PRIMARY KEY (complex_no, trade_type, area_type, day, listing)
+);
+"""
+
+
+# ==================================================================
+# [스케치] KLL (Karnin-Lang-Liberty) - 병합 가능한 분위수 요약
+# ==================================================================
+class KLLSketch:
+    """
+    레벨 h 의 원소는 가중치 2^h. 레벨이 가득 차면 정렬 후 하나 걸러 하나씩 위 레벨로 올림.
+    k=200 이면 분위수 오차 약 1% 이내, 원소 수와 무관하게 수백 개만 보관
+    """
+
+    __slots__ = ("k", "c", "levels", "n")
+
+    def __init__(self, k=SKETCH_K, c=2 / 3):
+        self.k = k
+        self.c = c
+        self.levels = [[]]
+        self.n = 0
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _size(self):
+        return sum(len(level) for level in self.levels)
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for h, level in enumerate(self.levels):
+                if len(level) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    level.sort()
+                    keep = [level.pop()] if len(level) % 2 else []
+                    self.levels[h + 1].extend(level[random.getrandbits(1)::2])
+                    self.levels[h] = keep
+                    break
+            else:
+                break
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = [(v, 1 << h) for h, level in enumerate(self.levels) for v in level]
+        items.sort()
+        return items
+
+    def quantiles(self, qs):
+        """여러 분위수를 한 번의 정렬로 계산"""
+        items = self._weighted()
+        if not items:
+            return [None] * len(qs)
+        total = sum(w for _, w in items)
+        result = []
+        for q in qs:
+            target, acc = q * total, 0
+            for value, weight in items:
+                acc += weight
+                if acc >= target:
+                    result.append(value)
+                    break
+            else:
+                result.append(items[-1][0])
+        return result
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def rank(self, value):
+        """value 이하 비율 (0~1)"""
+        items = self._weighted()
+        total = sum(w for _, w in items)
+        return sum(w for v, w in items if v <= value) / total if total else 0.0
+
+    def to_bytes(self):
+        return zlib.compress(json.dumps({"k": self.k, "n": self.n, "levels": self.levels}, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_bytes(cls, data):
+        raw = json.loads(zlib.decompress(data))
+        sketch = cls(raw["k"])
+        sketch.levels = raw["levels"] or [[]]
+        sketch.n = raw["n"]
+        return sketch
+
+
+def area_type(row):
+    """'110E/84m², 저/22층, 남서향' -> '110E' (API 행은 '110E-2' 처럼 붙는 번호까지 그대로)"""
+    spec = row.get("spec") or ""
+    return spec.split("/", 1)[0].strip() or "-"
+
+
+def listing_id(row):
+    """스케치 중복 판단용 매물 키 (매물번호를 못 읽은 화면 수집 행은 동/가격/중개업소)"""
+    article_no = row.get("article_no")
+    if article_no and article_no != "-":
+        return str(article_no)
+    return f"{row.get('dong') or ''}|{row.get('price') or ''}|{row.get('agent') or ''}"
+
+
+# ==================================================================
+# [저장소] 일 단위 스케치
+# ==================================================================
+class SketchStore:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(SKETCH_FILE))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, complex_no, trade_type, day, values_by_area):
+        """{평형: [가격...]} 을 해당 일자 스케치에 추가"""
+        with self.conn:
+            for area, values in values_by_area.items():
+                key = (str(complex_no), trade_type, area, day)
+                row = self.conn.execute(
+                    "SELECT data FROM sketches WHERE complex_no = ? AND trade_type = ? AND area_type = ? AND day = ?", key).fetchone()
+                sketch = KLLSketch.from_bytes(row[0]) if row else KLLSketch()
+                for value in values:
+                    sketch.update(value)
+                self.conn.execute("INSERT OR REPLACE INTO sketches VALUES (?, ?, ?, ?, ?, ?)",
+                                  key + (sketch.n, sketch.to_bytes()))
+
+    def unsketched(self, complex_no, trade_type, day, listings):
+        """
+        [(평형, 매물 키)] 중 오늘 아직 스케치에 넣지 않은 것만 반환하고 넣은 것으로 기록
+        (중복 판단은 하루 단위라 지난 날짜 기록은 지움)
+        """
+        complex_no = str(complex_no)
+        with self.conn:
+            self.conn.execute("DELETE FROM sketched WHERE complex_no = ? AND trade_type = ? AND day <> ?",
+                              (complex_no, trade_type, day))
+            before = self.conn.total_changes
+            fresh = []
+            for area, listing in listings:
+                self.conn.execute("INSERT OR IGNORE INTO sketched VALUES (?, ?, ?, ?, ?)",
+                                  (complex_no, trade_type, area, day, listing))
+                if self.conn.total_changes > before:
+                    fresh.append((area, listing))
+                    before = self.conn.total_changes
+        return fresh
+
+    def merged(self, complex_no, trade_type=None, date_from=None, date_to=None):
+        """기간 내 일 단위 스케치를 (거래방식, 평형) 별로 병합"""
+        sql = "SELECT trade_type, area_type, data FROM sketches WHERE complex_no = ?"
+        params = [str(complex_no)]
+        if trade_type:
+            sql += " AND trade_type = ?"
+            params.append(trade_type)
+        if date_from:
+            sql += " AND day >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND day <= ?"
+            params.append(date_to)
+
+        groups = {}
+        for trade, area, data in self.conn.execute(sql, params):
+            sketch = KLLSketch.from_bytes(data)
+            key = (trade, area)
+            if key in groups:
+                groups[key].merge(sketch)
+            else:
+                groups[key] = sketch
+        return groups
+
+
+# ==================================================================
+# [판정] 크롤링 중 미끼 가격 감지
+# ==================================================================
+class PriceGuard:
+
+    def __init__(self, store, complex_no, trade_type, crawl_date, window_days=WINDOW_DAYS):
+        self.store = store
+        self.complex_no = str(complex_no)
+        self.trade_type = trade_type
+        self.day = crawl_date
+        date_from = (datetime.strptime(crawl_date, "%Y-%m-%d") - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        # 그룹별 기준값을 미리 계산 (매물 판정은 비교 연산만)
+        self.thresholds = {}
+        for (_, area), sketch in store.merged(self.complex_no, trade_type, date_from, crawl_date).items():
+            if sketch.n >= MIN_SAMPLES:
+                low, median = sketch.quantiles([LOW_QUANTILE, 0.5])
+                self.thresholds[area] = (min(low, median * (1 - BAIT_DISCOUNT)), low, median, sketch.n)
+
+    def check(self, row):
+        """미끼 의심이면 정보 dict, 아니면 None"""
+        price = price_to_manwon(row.get("price"))
+        limit = self.thresholds.get(area_type(row))
+        if not price or limit is None or price >= limit[0]:
+            return None
+        _, low, median, n = limit
+        return {
+            "type": "BAIT_PRICE", "complex_no": self.complex_no, "trade_type": self.trade_type,
+            "area_type": area_type(row), "article_no": row.get("article_no"), "price": row.get("price"),
+            "price_manwon": price, "p05": low, "median": median, "samples": n,
+            "discount": round(1 - price / median, 3) if median else None,
+            "agent": row.get("agent"), "dong": row.get("dong"),
+        }
+
+    def process(self, rows, crawl_time):
+        """판정 후 오늘 처음 본 매물 가격만 스케치에 반영. 반환: 의심 매물 목록"""
+        flagged, prices = [], {}
+        for row in rows:
+            hit = self.check(row)
+            if hit:
+                hit.update(crawl_date=self.day, crawl_time=crawl_time)
+                flagged.append(hit)
+            price = price_to_manwon(row.get("price"))
+            if price:
+                prices[(area_type(row), listing_id(row))] = price
+        values = {}
+        for area, listing in self.store.unsketched(self.complex_no, self.trade_type, self.day, prices):
+            values.setdefault(area, []).append(prices[(area, listing)])
+        self.store.add(self.complex_no, self.trade_type, self.day, values)
+        return flagged
+
+
+def check_prices(complex_no, trade_type, rows, crawl_date, crawl_time):
+    """크롤러에서 호출하는 단축 함수 (실패해도 저장을 막지 않도록 예외 흡수)"""
+    try:
+        store = SketchStore()
+        try:
+            flagged = PriceGuard(store, complex_no, trade_type, crawl_date).process(rows, crawl_time)
+        finally:
+            store.close()
+        JsonlSink(data_path(OUTLIER_LOG)).emit(flagged)
+        for hit in flagged:
+            print(f"   🎣 [Price] 미끼 의심: {hit['article_no']} {hit['area_type']} {hit['price']} "
+                  f"(중앙값 대비 -{hit['discount'] * 100:.0f}%, {hit['agent']})")
+        print(f"📏 [Price] {complex_no}/{trade_type}: {len(rows)}건 반영, 미끼 의심 {len(flagged)}건")
+        return flagged
+    except Exception as e:
+        print(f"❌ [Price] 가격 분포 처리 실패: {e}")
+        return []
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    from config import COMPLEX_NO
+
+    parser = argparse.ArgumentParser(description="평형별 가격 분위수 조회")
+    parser.add_argument("--complex", dest="complex_no", default=COMPLEX_NO)
+    parser.add_argument("--trade-type", choices=["매매", "전세", "월세"])
+    parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    args = parser.parse_args(argv)
+
+    store = SketchStore()
+    try:
+        groups = store.merged(args.complex_no, args.trade_type, args.date_from, args.date_to)
+    finally:
+        store.close()
+    if not groups:
+        print("⚠️ 저장된 스케치가 없습니다.")
+        return
+    print(f"{'거래':<4}{'평형':<10}{'표본':>8}{'p05':>8}{'p25':>8}{'p50':>8}{'p75':>8}{'p95':>8}  (만원)")
+    for (trade, area), sketch in sorted(groups.items()):
+        qs = sketch.quantiles([0.05, 0.25, 0.5, 0.75, 0.95])
+        print(f"{trade:<4}{area:<10}{sketch.n:>8}" + "".join(f"{q:>8}" for q in qs))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,185 @@
+import json
+import time
+import fcntl
+import random
+
+from config import data_path
+
+# ==================================================================
+# [속도 제한] 호스트/엔드포인트별 토큰 버킷 + 차단 감지 + 적응형 백오프
+# ==================================================================
+# 버킷 상태는 파일 하나에 저장하고 flock 으로 잠그기 때문에, 같은 머신의 모든 크롤러와
+# 병렬 워커 프로세스가 같은 한도를 나눠 씁니다.
+#   OK        -> 속도를 조금씩 올림 (기본 속도의 MAX_SPEEDUP 배까지)
+#   THROTTLED -> 속도 절반 + 짧은 휴식
+#   BLOCKED   -> 속도 1/4 + 긴 휴식 (연속 차단 시 2배씩 증가)
+# 모든 대기 시간에는 지터(무작위 추가 대기)를 붙여 요청이 한꺼번에 몰리지 않게 합니다.
+STATE_FILE = "rate_limit.json"
+
+OK, THROTTLED, BLOCKED = "OK", "THROTTLED", "BLOCKED"
+
+# (초당 요청 수, 버스트)
+DEFAULT_RATES = {
+    "page": (0.2, 1),    # 단지 페이지 접속
+    "api": (1.0, 3),     # fetch() 로 직접 호출하는 JSON API
+    "detail": (1.5, 3),  # 상세 패널 클릭 (내부적으로 API 호출 발생)
+}
+FALLBACK_RATE = (0.5, 1)
+MAX_SPEEDUP = 2.0
+MIN_SLOWDOWN = 0.1
+THROTTLE_COOLDOWN = 15.0
+BLOCK_COOLDOWN = 120.0
+MAX_COOLDOWN = 1800.0
+JITTER = 0.25
+
+BLOCK_MARKERS = ("captcha", "자동입력 방지", "비정상적인 접근", "접근이 제한", "보안 확인")
+THROTTLE_MARKERS = ("요청이 많아", "잠시 후 다시", "too many requests")
+# 위 문구는 차단/안내 페이지에서만 찾음. 정상 JSON 응답이나 매물 화면 본문에는 중개사가 쓴
+# 매물 설명("보안 확인 철저" 등)이 섞여 있어 문구 검사를 하면 멀쩡한 응답을 차단으로 오판함
+CONTENT_SELECTOR = "#articleListArea, #complex_article_trad_type_filter_0"
+
+
+class BlockedError(RuntimeError):
+    """사이트가 차단/캡차 페이지를 보여줌 (계속 진행해도 의미 없음)"""
+
+
+# ==================================================================
+# [분류] 응답 / 페이지 상태 판정
+# ==================================================================
+def classify_response(status, body=""):
+    """
+    HTTP 상태 코드 + 본문으로 OK / THROTTLED / BLOCKED 판정
+    본문 문구는 2xx JSON 이 아닐 때만 검사 (정상 JSON 에는 매물 설명이 들어 있음)
+    """
+    text = str(body or "")
+    if 200 <= status < 300 and text.lstrip()[:1] in ("{", "["):
+        text = ""
+    text = text[:2000].lower()
+    if status in (401, 403) or any(m.lower() in text for m in BLOCK_MARKERS):
+        return BLOCKED
+    if status == 429 or status >= 500 or any(m.lower() in text for m in THROTTLE_MARKERS):
+        return THROTTLED
+    return OK
+
+
+def classify_page_text(status, title, text="", has_content=False):
+    """페이지 제목은 항상, 본문은 매물 화면(필터/목록 영역)이 없는 페이지일 때만 문구 검사"""
+    return classify_response(status, f"{title}\n{'' if has_content else text}")
+
+
+def classify_page(driver):
+    """현재 브라우저 페이지의 제목/본문 일부로 판정"""
+    try:
+        title = driver.title or ""
+        snap = driver.execute_script(
+            "return {text: document.body ? document.body.innerText.slice(0, 2000) : '',"
+            " content: !!document.querySelector(arguments[0])};", CONTENT_SELECTOR) or {}
+    except Exception:
+        return OK  # 판정 불가 시 정상으로 간주 (다음 단계에서 다시 확인됨)
+    return classify_page_text(200, title, snap.get("text") or "", bool(snap.get("content")))
+
+
+# ==================================================================
+# [리미터]
+# ==================================================================
+class RateLimiter:
+
+    def __init__(self, path=None, rates=None):
+        self.path = path or data_path(STATE_FILE)
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+
+    def _locked(self, update):
+        """상태 파일을 잠근 채로 update(state) 실행 후 저장"""
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw.strip() else {}
+                result = update(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _bucket(self, state, key, endpoint, now):
+        base_rate, burst = self.rates.get(endpoint, FALLBACK_RATE)
+        b = state.setdefault(key, {"tokens": burst, "updated": now, "factor": 1.0, "cooldown_until": 0, "strikes": 0})
+        rate = base_rate * b["factor"]
+        b["tokens"] = min(burst, b["tokens"] + (now - b["updated"]) * rate)
+        b["updated"] = now
+        return b, rate
+
+    def acquire(self, host, endpoint, max_wait=None):
+        """토큰 1개를 얻을 때까지 대기. 반환값: 실제 대기한 초"""
+        key = f"{host}|{endpoint}"
+        waited = 0.0
+
+        while True:
+            def take(state):
+                now = time.time()
+                b, rate = self._bucket(state, key, endpoint, now)
+                if now < b["cooldown_until"]:
+                    return b["cooldown_until"] - now
+                if b["tokens"] >= 1:
+                    b["tokens"] -= 1
+                    return 0.0
+                return (1 - b["tokens"]) / rate
+
+            wait = self._locked(take)
+            if wait <= 0:
+                return waited
+            wait += random.uniform(0, wait * JITTER)
+            if max_wait is not None and waited + wait > max_wait:
+                raise TimeoutError(f"속도 제한 대기 초과 ({key}, {waited + wait:.0f}초)")
+            time.sleep(wait)
+            waited += wait
+
+    def feedback(self, host, endpoint, outcome):
+        """요청 결과 반영 (속도 조절 / 휴식)"""
+        key = f"{host}|{endpoint}"
+
+        def update(state):
+            now = time.time()
+            b, _ = self._bucket(state, key, endpoint, now)
+            if outcome == OK:
+                b["factor"] = min(MAX_SPEEDUP, b["factor"] * 1.05)
+                b["strikes"] = 0
+            elif outcome == THROTTLED:
+                b["factor"] = max(MIN_SLOWDOWN, b["factor"] * 0.5)
+                b["cooldown_until"] = now + THROTTLE_COOLDOWN * random.uniform(1, 1 + JITTER)
+            elif outcome == BLOCKED:
+                b["factor"] = max(MIN_SLOWDOWN, b["factor"] * 0.25)
+                cooldown = min(MAX_COOLDOWN, BLOCK_COOLDOWN * (2 ** b["strikes"]))
+                b["cooldown_until"] = now + cooldown * random.uniform(1, 1 + JITTER)
+                b["strikes"] += 1
+            if outcome != OK:
+                b["tokens"] = min(b["tokens"], 0)  # 남은 버스트도 비움
+            return b["factor"]
+
+        factor = self._locked(update)
+        if outcome != OK:
+            print(f"   🐢 [RateLimit] {key}: {outcome} -> 속도 x{factor:.2f}")
+        return factor
+
+    def check_page(self, driver, host, endpoint="page"):
+        """페이지 상태 판정 + 반영. 차단이면 BlockedError"""
+        outcome = classify_page(driver)
+        self.feedback(host, endpoint, outcome)
+        if outcome == BLOCKED:
+            raise BlockedError(f"차단 페이지 감지 ({host})")
+        return outcome
+
+
+_limiter = None
+
+
+def get_limiter():
+    """프로세스당 1개 (상태는 파일로 프로세스 간 공유)"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,198 @@
+import os
+import sys
+import gzip
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from config import DATA_DIR, data_path
+from listing_html import get_backend, parse_group, parse_item, parse_detail, BACKENDS
+
+# ==================================================================
+# [원본 보관] 스냅샷별 목록/상세 HTML 저장 + 오프라인 재파싱
+# ==================================================================
+# 화면 크롤러(dom_crawler.py)는 매물마다 목록 그룹 HTML, 개별 매물 HTML, 상세 패널 HTML 과
+# 그때 추출한 결과(row)를 gzip JSONL 로 남깁니다.
+#   data/raw_html/<crawl_date>/<complex_no>_<trade_type>_<crawl_time>.jsonl.gz
+# 새 필드를 추가하면 재크롤링 없이 이 파일들을 프로세스 풀로 다시 파싱해 과거분을 채웁니다.
+# 파서 백엔드(bs4 / lxml / selectolax)는 listing_html.py 에서 교체하며,
+# parity 명령으로 크롤링 당시 결과와 필드 단위로 비교합니다.
+RAW_DIR = "raw_html"
+KEEP_RAW_HTML = os.environ.get("KEEP_RAW_HTML", "1") != "0"
+COMPARE_FIELDS = ("article_no", "dong", "spec", "price", "agent", "is_landlord", "verification_date")
+
+
+def raw_path(complex_no, trade_type, crawl_date, crawl_time):
+    return data_path(RAW_DIR, crawl_date, f"{complex_no}_{trade_type}_{crawl_time}.jsonl.gz")
+
+
+def save_raw_html(complex_no, trade_type, crawl_date, crawl_time, records):
+    """스냅샷 1개 분량의 원본 HTML 기록 (실패해도 크롤링 결과 저장은 계속)"""
+    if not KEEP_RAW_HTML or not records:
+        return None
+    path = raw_path(complex_no, trade_type, crawl_date, crawl_time)
+    try:
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(dict(record, complex_no=str(complex_no)), ensure_ascii=False) + "\n")
+        print(f"🗄️ [Raw] 원본 HTML {len(records)}건 보관: {path}")
+        return path
+    except Exception as e:
+        print(f"⚠️ [Raw] 원본 HTML 저장 실패: {e}")
+        return None
+
+
+def read_raw(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_raw_files(date_from=None, date_to=None, complex_no=None):
+    """보관된 스냅샷 파일 목록 (날짜 폴더 기준 범위 필터)"""
+    root = os.path.join(DATA_DIR, RAW_DIR)
+    if not os.path.isdir(root):
+        return []
+    paths = []
+    for day in sorted(os.listdir(root)):
+        if (date_from and day < date_from) or (date_to and day > date_to):
+            continue
+        for name in sorted(os.listdir(os.path.join(root, day))):
+            if name.endswith(".jsonl.gz") and (not complex_no or name.startswith(f"{complex_no}_")):
+                paths.append(os.path.join(root, day, name))
+    return paths
+
+
+# ==================================================================
+# [재파싱] 레코드 1건 -> real_estate_logs 행 (dom_crawler 와 같은 규칙)
+# ==================================================================
+def extract_record(record, backend):
+    group = parse_group(record["group_html"], backend)
+    item = parse_item(record["item_html"], backend)
+    detail = parse_detail(record.get("detail_html"), backend)
+
+    title = group["title"] or ""
+    prefix = record.get("title_prefix")
+    return {
+        "agent": item["agent"],
+        "dong": title.replace(prefix, "").strip() if prefix else title,
+        "spec": group["spec"],
+        "price": item["price"],
+        # 상세 패널에서 못 찾은 경우 크롤링 당시 URL/data 속성으로 복구한 값을 사용
+        "article_no": detail["article_no"] or record["row"].get("article_no"),
+        "trade_type": record["trade_type"],
+        "crawl_date": record["crawl_date"],
+        "crawl_time": record["crawl_time"],
+        "is_landlord": item["is_landlord"],
+        "verification_date": item["verification_date"],
+        "description": item["description"],
+        "complex_no": record.get("complex_no"),
+    }
+
+
+def _reparse_file(args):
+    """워커 프로세스: 파일 1개 재파싱 -> (경로, 행 목록, 소요 초)"""
+    path, backend_name = args
+    backend = get_backend(backend_name)
+    started = time.perf_counter()
+    rows = [extract_record(record, backend) for record in read_raw(path)]
+    return path, rows, time.perf_counter() - started
+
+
+def _parity_file(args):
+    """워커 프로세스: 크롤링 당시 결과(row) 대비 백엔드별 불일치 필드"""
+    path, backend_names = args
+    backends = [get_backend(name) for name in backend_names]
+    mismatches = []
+    count = 0
+    for record in read_raw(path):
+        count += 1
+        for backend in backends:
+            row = extract_record(record, backend)
+            for field in COMPARE_FIELDS:
+                if row[field] != record["row"].get(field):
+                    mismatches.append((backend.name, field, path, record["row"].get("article_no"),
+                                       record["row"].get(field), row[field]))
+    return count, mismatches
+
+
+def reparse(paths, backend="bs4", workers=None):
+    """파일 단위로 프로세스 풀에 분배. (경로, 행 목록, 소요 초) 를 순서대로 yield"""
+    get_backend(backend)  # 백엔드 미설치면 워커 띄우기 전에 실패
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_reparse_file, [(p, backend) for p in paths], chunksize=4)
+
+
+def parity(paths, backends, workers=None):
+    for name in backends:
+        get_backend(name)
+    total, mismatches = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for count, found in pool.map(_parity_file, [(p, tuple(backends)) for p in paths], chunksize=4):
+            total += count
+            mismatches.extend(found)
+    return total, mismatches
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="보관된 원본 HTML 재파싱")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name in ("run", "parity"):
+        p = sub.add_parser(name)
+        p.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+        p.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+        p.add_argument("--complex", dest="complex_no")
+        p.add_argument("--workers", type=int, default=os.cpu_count())
+    sub.choices["run"].add_argument("--backend", default="bs4", choices=sorted(BACKENDS))
+    sub.choices["run"].add_argument("--out", help="결과 JSONL 경로 (기본: 표준출력)")
+    sub.choices["parity"].add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                                       help="비교할 백엔드 (여러 번 지정 가능, 기본: 설치된 전부)")
+    args = parser.parse_args(argv)
+
+    paths = iter_raw_files(args.date_from, args.date_to, args.complex_no)
+    if not paths:
+        print("⚠️ 보관된 원본 HTML 이 없습니다.")
+        return
+
+    if args.cmd == "run":
+        out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+        started = time.perf_counter()
+        n_rows = 0
+        try:
+            for _, rows, _ in reparse(paths, args.backend, args.workers):
+                for row in rows:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                n_rows += len(rows)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"✅ [{args.backend}] 파일 {len(paths)}개 / {n_rows}건 재파싱 ({time.perf_counter() - started:.1f}초)", file=sys.stderr)
+
+    elif args.cmd == "parity":
+        backends = args.backend
+        if not backends:
+            backends = []
+            for name in sorted(BACKENDS):
+                try:
+                    get_backend(name)
+                    backends.append(name)
+                except ImportError:
+                    print(f"   (건너뜀: {name} 미설치)")
+        total, mismatches = parity(paths, backends, args.workers)
+        print(f"🔎 레코드 {total}건 x 백엔드 {', '.join(backends)}")
+        if not mismatches:
+            print("✅ 모든 필드가 크롤링 당시 결과와 일치")
+            return
+        print(f"❌ 불일치 {len(mismatches)}건")
+        for backend, field, path, article_no, expected, got in mismatches[:30]:
+            print(f"   [{backend}] {field} {article_no}: {expected!r} != {got!r} ({os.path.basename(path)})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
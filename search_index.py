@@ -0,0 +1,268 @@
+import sys
+import time
+import sqlite3
+import argparse
+
+from config import data_path
+from dimensions import NAMED_LOGS
+
+# ==================================================================
+# [검색] 매물번호 / 동 / 중개업소 n-gram 역색인
+# ==================================================================
+# 대시보드 검색(dong.ilike.%검색어%, agent.ilike.%검색어%)은 전체 로그를 매번 훑습니다.
+# 여기서는 "매물(article_no) 1건 = 엔티티 1개"로 모아 두고
+#   - 동/중개업소: 공백 제거 후 글자 1-gram + 2-gram 역색인 (한글은 형태소 없이 글자 단위)
+#   - 매물번호  : 정확히 일치 / 앞부분 일치 (정렬된 인덱스 범위 조회)
+# 로 찾으므로 검색 시간은 전체 행 수가 아니라 고유 매물 수에 비례합니다.
+# real_estate_logs 의 id 커서로 새 행만 반영합니다 (Supabase 또는 로컬 미러).
+# 동/중개업소는 차원 키만 저장되므로(dimensions.py) 이름을 조인한 real_estate_logs_named 뷰에서 읽습니다.
+INDEX_FILE = "search_index.db"
+FIELDS = {"dong": 1, "agent": 2}
+SOURCE_COLUMNS = "id,article_no,trade_type,dong,agent,crawl_date,crawl_time"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id          INTEGER PRIMARY KEY,
+    article_no  TEXT UNIQUE,
+    trade_type  TEXT,
+    dong        TEXT,
+    agent       TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT
+);
+CREATE TABLE IF NOT EXISTS entity_values (
+    entity_id INTEGER, field INTEGER, value TEXT,
+    PRIMARY KEY (entity_id, field, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT, field INTEGER, entity_id INTEGER,
+    PRIMARY KEY (gram, field, entity_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY, last_id INTEGER
+);
+"""
+
+
+def normalize(text):
+    return "".join(str(text or "").split()).lower()
+
+
+def ngrams(text):
+    """1-gram + 2-gram (중복 제거)"""
+    text = normalize(text)
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def query_grams(term):
+    """검색어 -> 조회용 gram (2글자 이상이면 2-gram 만, 1글자면 1-gram)"""
+    if len(term) == 1:
+        return {term}
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+class SearchIndex:
+
+    def __init__(self, path=None):
+        self.conn = sqlite3.connect(path or data_path(INDEX_FILE))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # --------------------------------------------------------------
+    # 색인 갱신
+    # --------------------------------------------------------------
+    def cursor(self, source):
+        row = self.conn.execute("SELECT last_id FROM cursors WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else 0
+
+    def add_rows(self, rows):
+        """real_estate_logs 행 반영. 반환: 새로 생긴 매물 수"""
+        new_entities = 0
+        known_values = set()
+        with self.conn:
+            for row in rows:
+                article_no = row.get("article_no")
+                if not article_no or article_no == "-":
+                    continue
+                seen_at = f"{row.get('crawl_date')} {row.get('crawl_time')}"
+                entity = self.conn.execute("SELECT id, last_seen FROM entities WHERE article_no = ?", (article_no,)).fetchone()
+                if entity is None:
+                    cur = self.conn.execute(
+                        "INSERT INTO entities (article_no, trade_type, dong, agent, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                        (article_no, row.get("trade_type"), row.get("dong"), row.get("agent"), seen_at, seen_at))
+                    entity_id = cur.lastrowid
+                    new_entities += 1
+                else:
+                    entity_id = entity["id"]
+                    if seen_at >= (entity["last_seen"] or ""):
+                        self.conn.execute(
+                            "UPDATE entities SET trade_type = ?, dong = ?, agent = ?, last_seen = ? WHERE id = ?",
+                            (row.get("trade_type"), row.get("dong"), row.get("agent"), seen_at, entity_id))
+
+                # 동/중개업소는 처음 보는 값일 때만 gram 추가 (이력상 값이 바뀌어도 예전 이름으로 검색 가능)
+                for field, code in FIELDS.items():
+                    value = row.get(field)
+                    if not value or (entity_id, code, value) in known_values:
+                        continue
+                    known_values.add((entity_id, code, value))
+                    cur = self.conn.execute("INSERT OR IGNORE INTO entity_values VALUES (?, ?, ?)", (entity_id, code, value))
+                    if cur.rowcount:
+                        self.conn.executemany("INSERT OR IGNORE INTO grams VALUES (?, ?, ?)",
+                                              [(g, code, entity_id) for g in ngrams(value)])
+        return new_entities
+
+    def _set_cursor(self, source, last_id):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?)", (source, last_id))
+
+    def sync(self, page_size=1000):
+        """Supabase real_estate_logs 에서 커서 이후 행 반영"""
+        from db_client import iter_rows
+        from dimensions import logs_table
+
+        return self._sync_rows("supabase", lambda after: iter_rows(logs_table(), SOURCE_COLUMNS, after_id=after, page_size=page_size), page_size)
+
+    def sync_from_mirror(self, mirror, page_size=5000):
+        """로컬 미러(local_mirror.py)에서 커서 이후 행 반영"""
+        def rows(after):
+            while True:
+                batch = mirror.query(f"SELECT {SOURCE_COLUMNS} FROM {NAMED_LOGS} WHERE id > ? ORDER BY id LIMIT ?", (after, page_size))
+                yield from batch
+                if len(batch) < page_size:
+                    break
+                after = batch[-1]["id"]
+
+        return self._sync_rows("mirror", rows, page_size)
+
+    def _sync_rows(self, source, fetch, page_size):
+        last_id = self.cursor(source)
+        batch, total, new = [], 0, 0
+        for row in fetch(last_id):
+            batch.append(row)
+            if len(batch) >= page_size:
+                new += self.add_rows(batch)
+                last_id = batch[-1]["id"]
+                self._set_cursor(source, last_id)
+                total += len(batch)
+                batch = []
+        if batch:
+            new += self.add_rows(batch)
+            last_id = batch[-1]["id"]
+            self._set_cursor(source, last_id)
+            total += len(batch)
+        return total, new
+
+    # --------------------------------------------------------------
+    # 검색
+    # --------------------------------------------------------------
+    def _candidates(self, term, code):
+        grams = sorted(query_grams(term))
+        marks = ",".join("?" * len(grams))
+        return [r[0] for r in self.conn.execute(
+            f"SELECT entity_id FROM grams WHERE field = ? AND gram IN ({marks}) "
+            f"GROUP BY entity_id HAVING COUNT(*) = ?", [code] + grams + [len(grams)])]
+
+    def search(self, term, limit=50, fields=None):
+        """
+        검색어가 숫자면 매물번호(정확/앞부분 일치) + 동, 아니면 동 + 중개업소 (대시보드 검색과 같은 대상)
+        반환: 최근에 본 순서의 매물 목록 (matched: 일치한 필드)
+        """
+        term = normalize(term)
+        if not term:
+            return []
+        if fields is None:
+            fields = ("article_no", "dong") if term.isdigit() else ("dong", "agent")
+
+        matched = {}
+        if "article_no" in fields:
+            for r in self.conn.execute(
+                    "SELECT id FROM entities WHERE article_no >= ? AND article_no < ? LIMIT ?", (term, term + "￿", limit * 4)):
+                matched.setdefault(r[0], set()).add("article_no")
+
+        for field in fields:
+            code = FIELDS.get(field)
+            if code is None:
+                continue
+            ids = self._candidates(term, code)
+            if not ids:
+                continue
+            # 2-gram 이 모두 있어도 순서가 다를 수 있으므로 실제 값으로 한 번 더 확인
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for r in self.conn.execute(
+                        f"SELECT entity_id, value FROM entity_values WHERE field = ? AND entity_id IN ({marks})", [code] + chunk):
+                    if term in normalize(r["value"]):
+                        matched.setdefault(r["entity_id"], set()).add(field)
+
+        if not matched:
+            return []
+        ids = list(matched)
+        results = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for r in self.conn.execute(f"SELECT * FROM entities WHERE id IN ({marks})", chunk):
+                item = dict(r)
+                item["matched"] = sorted(matched[item.pop("id")])
+                results.append(item)
+        # 최근에 본 순, 매물번호 정확히 일치는 맨 앞
+        results.sort(key=lambda r: r["last_seen"] or "", reverse=True)
+        results.sort(key=lambda r: r["article_no"] != term)
+        return results[:limit]
+
+    def stats(self):
+        return {
+            "entities": self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0],
+            "values": self.conn.execute("SELECT COUNT(*) FROM entity_values").fetchone()[0],
+            "grams": self.conn.execute("SELECT COUNT(*) FROM grams").fetchone()[0],
+        }
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="매물번호/동/중개업소 검색 색인")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sync = sub.add_parser("sync", help="새 로그 반영")
+    p_sync.add_argument("--from-mirror", action="store_true", help="Supabase 대신 로컬 미러에서 읽기")
+    p_search = sub.add_parser("search", help="검색")
+    p_search.add_argument("term")
+    p_search.add_argument("--limit", type=int, default=50)
+    sub.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex()
+    try:
+        if args.cmd == "sync":
+            started = time.time()
+            if args.from_mirror:
+                from local_mirror import LocalMirror
+                mirror = LocalMirror()
+                try:
+                    total, new = index.sync_from_mirror(mirror)
+                finally:
+                    mirror.close()
+            else:
+                total, new = index.sync()
+            print(f"🔎 [Search] 로그 {total}건 반영, 신규 매물 {new}건 ({time.time() - started:.1f}초)")
+        elif args.cmd == "search":
+            started = time.perf_counter()
+            results = index.search(args.term, args.limit)
+            for r in results:
+                print(f"{r['article_no']}\t{r['trade_type']}\t{r['dong']}\t{r['agent']}\t{r['last_seen']}\t({', '.join(r['matched'])})")
+            print(f"-- {len(results)}건 ({(time.perf_counter() - started) * 1000:.1f}ms)", file=sys.stderr)
+        elif args.cmd == "stats":
+            print(index.stats())
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
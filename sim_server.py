@@ -0,0 +1,485 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from config import KST, COMPLEX_NO
+from completeness import TRADE_TYPE_CODES
+
+# ==================================================================
+# [시뮬레이션] 부하/규모 테스트용 로컬 매물 사이트
+# ==================================================================
+# 실제 사이트를 두드리지 않고 크롤러를 10배/100배 규모로 돌려 보기 위한 가짜 사이트입니다.
+#   GET /complexes/<단지번호>           단지 화면 (필터/묶기/정렬/무한 스크롤/상세 패널)
+#   GET /api/articles/complex/<단지>    articleList 페이지 (page, tradeType, order)
+#   GET /api/complexes/<단지>           단지 상세 (거래방식별 매물 수)
+#   GET /api/articles/<매물번호>        상세 패널 (클릭 시 호출)
+#   GET /__sim/stats                    요청/주입 오류 통계
+# 단지와 매물은 (seed, 단지번호, 회차)로 결정되므로 같은 설정이면 항상 같은 결과가 나옵니다.
+# 회차(epoch)는 --epoch-seconds 마다 바뀌며, 회차마다 --churn 비율만큼 매물이 교체되고
+# --price-change 비율만큼 가격이 바뀝니다.
+# 크롤러는 LAND_BASE_URL=http://127.0.0.1:8800 으로 실행하면 이 서버를 사용합니다.
+PAGE_SIZE = 20
+TRADE_NAMES = {code: name for name, code in TRADE_TYPE_CODES.items()}
+
+AGENTS = ("DMC공인중개사사무소", "상암센트럴공인중개사", "파크뷰부동산", "자이공인중개사사무소", "수색역공인중개사",
+          "하늘공인중개사", "가재울부동산", "한강공인중개사사무소", "월드컵공인중개사", "증산역부동산")
+PROVIDERS = ("매경부동산", "부동산뱅크", "한경부동산", "부동산114", "네이버부동산")
+AREAS = (("59A", "59", 80000), ("84A", "84", 110000), ("84B", "84", 105000), ("110E", "110", 140000), ("132C", "132", 170000))
+DIRECTIONS = ("남향", "남동향", "남서향", "동향", "서향")
+FEATURES = ("올수리", "기본형", "남향 정원뷰", "한강 조망", "급매", "역세권", "초품아", "입주협의", "세안고", "즉시입주",
+            "로얄층", "확장형", "시스템에어컨", "주차 편리")
+
+BLOCK_HTML = ("<html><head><title>보안 확인</title></head><body>"
+              "<h1>비정상적인 접근이 감지되었습니다.</h1><p>자동입력 방지 문자를 입력해 주세요.</p></body></html>")
+THROTTLE_HTML = ("<html><head><title>잠시 후 다시 시도</title></head><body>"
+                 "<p>요청이 많아 잠시 후 다시 시도해 주세요.</p></body></html>")
+
+
+def format_price(manwon):
+    """125000 -> '12억 5,000' (change_events.price_to_manwon 의 역변환)"""
+    uk, rest = divmod(int(manwon), 10000)
+    if uk and rest:
+        return f"{uk}억 {rest:,}"
+    if uk:
+        return f"{uk}억"
+    return f"{rest:,}"
+
+
+# ==================================================================
+# [데이터] 합성 단지 / 매물
+# ==================================================================
+class SyntheticSite:
+
+    def __init__(self, listings=300, churn=0.05, price_change=0.02, seed=1, epoch_seconds=3600, epoch=None):
+        self.listings = listings
+        self.churn = churn
+        self.price_change = price_change
+        self.seed = seed
+        self.epoch_seconds = epoch_seconds
+        self.fixed_epoch = epoch
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def epoch(self):
+        if self.fixed_epoch is not None:
+            return self.fixed_epoch
+        return int(time.time() // self.epoch_seconds)
+
+    def complex_info(self, complex_no):
+        rng = random.Random(f"{self.seed}:{complex_no}")
+        size = max(1, int(self.listings * rng.uniform(0.5, 1.5)))
+        name = "DMC파크뷰자이" if str(complex_no) == COMPLEX_NO else f"시뮬단지{complex_no}"
+        return {"complexNo": str(complex_no), "complexName": name, "size": size, "dongs": rng.randint(4, 20)}
+
+    def _slot(self, info, slot, epoch):
+        complex_no = info["complexNo"]
+        rng = random.Random(f"{self.seed}:{complex_no}:{slot}")
+        # 매물 수명(회차)과 가격 변경 주기는 슬롯마다 고정, 회차가 넘어가면 새 매물로 교체
+        lifetime = max(1, round(rng.uniform(0.5, 1.5) / self.churn)) if self.churn > 0 else 1 << 30
+        price_period = max(1, round(rng.uniform(0.5, 1.5) / self.price_change)) if self.price_change > 0 else 1 << 30
+        phase = rng.randrange(min(lifetime, 1 << 16))
+        price_phase = rng.randrange(min(price_period, 1 << 16))
+        version = (epoch + phase) // lifetime
+        born = version * lifetime - phase
+
+        vr = random.Random(f"{self.seed}:{complex_no}:{slot}:{version}")
+        trade = vr.choices(("A1", "B1", "B2"), weights=(5, 4, 1))[0]
+        area_name, area_ex, base = vr.choice(AREAS)
+        price = base * vr.uniform(0.9, 1.1) * (0.55 if trade == "B1" else 0.15 if trade == "B2" else 1.0)
+        steps = (epoch + price_phase) // price_period - (born + price_phase) // price_period
+        price += steps * vr.choice((-1000, -500, 500))
+        price = max(1000, int(price // 500 * 500))
+
+        total_floor = vr.randint(15, 30)
+        floor = vr.choice(("저", "중", "고", str(vr.randint(1, total_floor))))
+        # 확인일자: 매물이 처음 나온 회차 (회차를 고정한 경우에도 현재 시각 기준으로 환산)
+        now_epoch = int(time.time() // self.epoch_seconds)
+        confirm = datetime.fromtimestamp(now_epoch * self.epoch_seconds, KST) - timedelta(seconds=(epoch - born) * self.epoch_seconds)
+        article_no = f"{int(complex_no) % 90 + 10:02d}{version % 1000:03d}{slot:05d}"
+        return {
+            "articleNo": article_no,
+            "articleName": info["complexName"],
+            "articleStatus": "R0",
+            "tradeCompleteYN": "N",
+            "tradeTypeCode": trade,
+            "tradeTypeName": TRADE_NAMES[trade],
+            "dealOrWarrantPrc": format_price(price),
+            "rentPrc": str(vr.randint(50, 300)) if trade == "B2" else None,
+            "buildingName": f"{101 + slot % info['dongs']}동",
+            "areaName": area_name,
+            "area2": area_ex,
+            "floorInfo": f"{floor}/{total_floor}",
+            "direction": vr.choice(DIRECTIONS),
+            "realtorName": vr.choice(AGENTS),
+            "cpName": vr.choice(PROVIDERS),
+            "articleConfirmYmd": confirm.strftime("%Y%m%d"),
+            "verificationTypeCode": "OWNER" if vr.random() < 0.2 else "NONE",
+            "articleFeatureDesc": " ".join(vr.sample(FEATURES, vr.randint(1, 3))),
+            "sameAddrCnt": 1,
+            "_price": price,
+        }
+
+    def articles(self, complex_no, epoch=None):
+        epoch = self.epoch() if epoch is None else epoch
+        key = (str(complex_no), epoch)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            info = self.complex_info(complex_no)
+            cached = [self._slot(info, slot, epoch) for slot in range(info["size"])]
+            with self._lock:
+                if len(self._cache) > 64:
+                    self._cache.clear()
+                self._cache[key] = cached
+        return cached
+
+    def page(self, complex_no, trade_codes, order, page):
+        items = [a for a in self.articles(complex_no) if not trade_codes or a["tradeTypeCode"] in trade_codes]
+        if order == "prc":
+            items = sorted(items, key=lambda a: a["_price"])
+        start = (page - 1) * PAGE_SIZE
+        chunk = items[start:start + PAGE_SIZE]
+        return {
+            "isMoreData": start + PAGE_SIZE < len(items),
+            "articleList": [{k: v for k, v in a.items() if not k.startswith("_")} for a in chunk],
+        }
+
+    def detail(self, complex_no):
+        info = self.complex_info(complex_no)
+        counts = {"A1": 0, "B1": 0, "B2": 0}
+        for a in self.articles(complex_no):
+            counts[a["tradeTypeCode"]] += 1
+        return {"complexDetail": {
+            "complexNo": info["complexNo"], "complexName": info["complexName"],
+            "dealCount": counts["A1"], "leaseCount": counts["B1"], "rentCount": counts["B2"],
+            "totalDongCount": info["dongs"],
+        }}
+
+    def article(self, article_no, complex_no):
+        for a in self.articles(complex_no):
+            if a["articleNo"] == article_no:
+                return {"articleDetail": {k: v for k, v in a.items() if not k.startswith("_")}}
+        return None
+
+
+# ==================================================================
+# [장애 주입] 지연 / 오류 / 과부하(429) / 차단(403)
+# ==================================================================
+class Faults:
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rps=0.0, block_after=0, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rps = rps
+        self.block_after = block_after
+        self.rng = random.Random(seed)
+        self.buckets = {}   # 클라이언트 -> [토큰, 마지막 시각]
+        self.requests = {}  # 클라이언트 -> 요청 수
+        self.lock = threading.Lock()
+
+    def decide(self, client, is_api):
+        """요청 1건에 대한 (지연 초, 결과). 결과: None(정상) / 'error' / 'throttle' / 'block'"""
+        with self.lock:
+            count = self.requests[client] = self.requests.get(client, 0) + 1
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.block_after and count > self.block_after:
+                return delay, "block"
+            if self.rps:
+                now = time.monotonic()
+                tokens, last = self.buckets.get(client, (max(1.0, self.rps), now))
+                tokens = min(max(1.0, self.rps), tokens + (now - last) * self.rps)
+                if tokens < 1.0:
+                    self.buckets[client] = (tokens, now)
+                    return delay, "throttle"
+                self.buckets[client] = (tokens - 1.0, now)
+            if is_api and self.error_rate and self.rng.random() < self.error_rate:
+                return delay, "error"
+        return delay, None
+
+
+class Stats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.statuses = {}
+        self.faults = {}
+        self.bytes = 0
+        self.started = time.time()
+
+    def add(self, route, status, size, fault):
+        with self.lock:
+            self.routes[route] = self.routes.get(route, 0) + 1
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+            if fault:
+                self.faults[fault] = self.faults.get(fault, 0) + 1
+            self.bytes += size
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = time.time() - self.started
+            total = sum(self.routes.values())
+            return {"uptime_s": round(elapsed, 1), "requests": total, "rps": round(total / elapsed, 2) if elapsed else 0,
+                    "routes": dict(self.routes), "statuses": dict(self.statuses), "faults": dict(self.faults),
+                    "bytes": self.bytes}
+
+
+# ==================================================================
+# [화면] 단지 페이지 (크롤러가 쓰는 셀렉터와 같은 구조)
+# ==================================================================
+PAGE_HTML = """<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>__NAME__ - 시뮬레이션</title>
+<style>
+body { margin: 0; font-family: sans-serif; }
+#articleListArea { height: 700px; width: 420px; overflow-y: auto; border: 1px solid #ccc; }
+.item { border-bottom: 1px solid #eee; padding: 8px; min-height: 90px; }
+.detail_contents_inner { position: fixed; left: 440px; top: 60px; width: 500px; border: 1px solid #333; padding: 8px; }
+</style></head>
+<body>
+<div class="filter_area">
+  <input type="checkbox" id="complex_article_trad_type_filter_0" checked><label for="complex_article_trad_type_filter_0">전체</label>
+  <input type="checkbox" id="complex_article_trad_type_filter_1" data-code="A1"><label for="complex_article_trad_type_filter_1">매매</label>
+  <input type="checkbox" id="complex_article_trad_type_filter_2" data-code="B1"><label for="complex_article_trad_type_filter_2">전세</label>
+  <input type="checkbox" id="complex_article_trad_type_filter_3" data-code="B2"><label for="complex_article_trad_type_filter_3">월세</label>
+  <input type="checkbox" id="address_group2"><label for="address_group2">동일매물 묶기</label>
+  <a href="#" class="sorting_type" data-nclk="TAA.rank">랭킹순</a>
+  <a href="#" class="sorting_type" data-nclk="TAA.price">가격순</a>
+</div>
+<div id="articleListArea"></div>
+<div id="detailArea"></div>
+<script>
+const COMPLEX_NO = "__COMPLEX__";
+const AUTH = "Bearer __TOKEN__";
+const state = { page: 0, more: true, loading: false, order: "rank", seq: 0 };
+const list = document.getElementById("articleListArea");
+const esc = s => String(s == null ? "" : s).replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+const filters = [1, 2, 3].map(i => document.getElementById("complex_article_trad_type_filter_" + i));
+const all = document.getElementById("complex_article_trad_type_filter_0");
+
+function tradeType() {
+  if (all.checked) return "";
+  return filters.filter(f => f.checked).map(f => f.dataset.code).join(":");
+}
+
+function render(a) {
+  const confirm = a.articleConfirmYmd ? a.articleConfirmYmd.slice(2, 4) + "." + a.articleConfirmYmd.slice(4, 6) + "." + a.articleConfirmYmd.slice(6, 8) + "." : "";
+  const price = a.rentPrc ? a.dealOrWarrantPrc + "/" + a.rentPrc : a.dealOrWarrantPrc;
+  return '<div class="item"><div class="item_inner">' +
+    '<a href="#" class="item_link" data-article-no="' + esc(a.articleNo) + '"><div class="item_title"><span class="text">' + esc(a.articleName + " " + a.buildingName) + '</span></div></a>' +
+    '<div class="price_line"><span class="type">' + esc(a.tradeTypeName) + '</span> <span class="price">' + esc(price) + '</span></div>' +
+    '<div class="info_area"><p class="line"><strong class="type">아파트</strong><span class="spec">' + esc(a.areaName + "/" + a.area2 + "m², " + a.floorInfo + "층, " + a.direction) + '</span></p>' +
+    '<p class="line"><span class="text">' + esc(a.articleFeatureDesc) + '</span></p></div>' +
+    '<div class="label_area">' + (a.verificationTypeCode === "OWNER" ? '<span class="icon-badge type-owner">집주인</span>' : "") +
+    (confirm ? '<span class="icon-badge type-confirmed">확인매물 ' + confirm + '</span>' : "") + '</div>' +
+    '<div class="cp_area"><span class="cp_name">' + esc(a.cpName) + '</span><a class="agent_name">' + esc(a.realtorName) + '</a></div>' +
+    '</div></div>';
+}
+
+function load() {
+  if (state.loading || !state.more) return;
+  state.loading = true;
+  const seq = state.seq;
+  const page = state.page + 1;
+  const url = "/api/articles/complex/" + COMPLEX_NO + "?realEstateType=APT%3AABYG%3AJGC&tradeType=" + encodeURIComponent(tradeType()) +
+    "&order=" + state.order + "&page=" + page + "&complexNo=" + COMPLEX_NO;
+  fetch(url, { headers: { authorization: AUTH } })
+    .then(r => r.ok ? r.json() : Promise.reject(r.status))
+    .then(data => {
+      if (seq !== state.seq) return;
+      state.page = page;
+      state.more = !!data.isMoreData;
+      list.insertAdjacentHTML("beforeend", data.articleList.map(render).join(""));
+      if (!list.querySelector(".item")) list.innerHTML = '<p class="empty">' + (tradeType() ? "조건에 맞는 매물이 없습니다." : "등록된 매물이 없습니다.") + '</p>';
+    })
+    .catch(() => {})
+    .finally(() => { if (seq === state.seq) state.loading = false; });
+}
+
+function reload() {
+  state.seq += 1;
+  state.page = 0; state.more = true; state.loading = false;
+  list.innerHTML = ""; list.scrollTop = 0;
+  load();
+}
+
+all.addEventListener("change", () => { if (all.checked) filters.forEach(f => f.checked = false); reload(); });
+filters.forEach(f => f.addEventListener("change", () => { all.checked = !filters.some(x => x.checked); reload(); }));
+document.getElementById("address_group2").addEventListener("change", reload);
+document.querySelectorAll("a.sorting_type").forEach(a => a.addEventListener("click", e => {
+  e.preventDefault();
+  state.order = a.dataset.nclk === "TAA.price" ? "prc" : "rank";
+  reload();
+}));
+list.addEventListener("scroll", () => { if (list.scrollTop + list.clientHeight >= list.scrollHeight - 200) load(); });
+list.addEventListener("click", e => {
+  const link = e.target.closest("a.item_link");
+  if (!link) return;
+  e.preventDefault();
+  const no = link.dataset.articleNo;
+  fetch("/api/articles/" + no + "?complexNo=" + COMPLEX_NO, { headers: { authorization: AUTH } })
+    .then(r => r.json())
+    .then(d => {
+      const a = d.articleDetail || {};
+      document.getElementById("detailArea").innerHTML = '<div class="detail_contents_inner"><table>' +
+        '<tr class="info_table_item"><th>매물번호</th><td>' + esc(a.articleNo) + '</td></tr>' +
+        '<tr class="info_table_item"><th>매물특징</th><td>' + esc(a.articleFeatureDesc) + '</td></tr>' +
+        '<tr class="info_table_item"><th>중개사</th><td>' + esc(a.realtorName) + '</td></tr></table></div>';
+      history.replaceState(null, "", location.pathname + "?articleNo=" + no);
+    })
+    .catch(() => {});
+});
+load();
+</script></body></html>
+"""
+
+
+# ==================================================================
+# [서버]
+# ==================================================================
+class SimHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LandSim/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, content_type, route, fault=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+        self.server.stats.add(route, status, len(data), fault)
+
+    def _json(self, status, payload, route, fault=None):
+        self._send(status, json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8", route, fault)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        qs = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        segments = path.strip("/").split("/")
+        server = self.server
+
+        if path == "/__sim/stats":
+            return self._json(200, dict(server.stats.snapshot(), epoch=server.site.epoch()), "stats")
+
+        is_api = segments[0] == "api"
+        route = "/".join(segments[:3]) if is_api else segments[0] or "/"
+        delay, fault = server.faults.decide(self.client_address[0], is_api)
+        if delay:
+            time.sleep(delay)
+
+        if fault == "block":
+            return self._send(403, BLOCK_HTML, "text/html; charset=utf-8", route, fault)
+        if fault == "throttle":
+            if is_api:
+                return self._json(429, {"error": "too many requests"}, route, fault)
+            return self._send(429, THROTTLE_HTML, "text/html; charset=utf-8", route, fault)
+        if fault == "error":
+            return self._json(500, {"error": "internal server error"}, route, fault)
+
+        if is_api and server.require_auth and not (self.headers.get("authorization") or "").startswith("Bearer "):
+            return self._json(401, {"error": "unauthorized"}, route)
+
+        try:
+            if len(segments) == 2 and segments[0] == "complexes" and segments[1].isdigit():
+                info = server.site.complex_info(segments[1])
+                html = (PAGE_HTML.replace("__NAME__", info["complexName"]).replace("__COMPLEX__", info["complexNo"])
+                        .replace("__TOKEN__", f"sim-{server.site.seed}"))
+                return self._send(200, html, "text/html; charset=utf-8", route)
+
+            if segments[:3] == ["api", "articles", "complex"] and len(segments) == 4:
+                codes = {c for c in (qs.get("tradeType") or "").split(":") if c}
+                page = max(1, int(qs.get("page") or 1))
+                return self._json(200, server.site.page(segments[3], codes, qs.get("order"), page), route)
+
+            if segments[:2] == ["api", "complexes"] and len(segments) == 3:
+                return self._json(200, server.site.detail(segments[2]), route)
+
+            if segments[:2] == ["api", "articles"] and len(segments) == 3:
+                found = server.site.article(segments[2], qs.get("complexNo") or COMPLEX_NO)
+                if found is None:
+                    return self._json(404, {"error": "article not found"}, route)
+                return self._json(200, found, route)
+        except ValueError as e:
+            return self._json(400, {"error": str(e)}, route)
+
+        self._json(404, {"error": "not found"}, route)
+
+
+class SimServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site, faults, require_auth=True, verbose=False):
+        super().__init__(address, SimHandler)
+        self.site = site
+        self.faults = faults
+        self.stats = Stats()
+        self.require_auth = require_auth
+        self.verbose = verbose
+
+
+def serve_in_thread(host="127.0.0.1", port=0, **kwargs):
+    """테스트 스크립트용: 백그라운드 스레드로 띄우고 (서버, base_url) 반환"""
+    site_keys = ("listings", "churn", "price_change", "seed", "epoch_seconds", "epoch")
+    site = SyntheticSite(**{k: v for k, v in kwargs.items() if k in site_keys})
+    faults = Faults(**{k: v for k, v in kwargs.items() if k in ("latency", "jitter", "error_rate", "rps", "block_after", "seed")})
+    server = SimServer((host, port), site, faults, kwargs.get("require_auth", True))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="크롤러 부하 테스트용 로컬 매물 사이트")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--listings", type=int, default=300, help="단지당 평균 매물 수 (단지마다 0.5~1.5배)")
+    parser.add_argument("--churn", type=float, default=0.05, help="회차당 교체되는 매물 비율")
+    parser.add_argument("--price-change", type=float, default=0.02, help="회차당 가격이 바뀌는 매물 비율")
+    parser.add_argument("--epoch-seconds", type=int, default=3600, help="회차 길이 (초)")
+    parser.add_argument("--epoch", type=int, help="회차 고정 (재현용)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 기본 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 무작위 지연 최대값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="API 500 응답 비율")
+    parser.add_argument("--rps", type=float, default=0.0, help="클라이언트당 초당 허용 요청 (초과 시 429, 0=무제한)")
+    parser.add_argument("--block-after", type=int, default=0, help="클라이언트당 N건 이후 차단 페이지 (0=안 함)")
+    parser.add_argument("--no-auth", action="store_true", help="API 의 authorization 헤더 검사 안 함")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    site = SyntheticSite(args.listings, args.churn, args.price_change, args.seed, args.epoch_seconds, args.epoch)
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.rps, args.block_after, args.seed)
+    server = SimServer((args.host, args.port), site, faults, not args.no_auth, args.verbose)
+    base_url = f"http://{args.host}:{server.server_address[1]}"
+    print(f"🧪 [Sim] {base_url} (회차 {site.epoch()}, 단지당 약 {args.listings}건)")
+    print(f"   크롤러 실행: LAND_BASE_URL={base_url} python crawler.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 [Sim] {json.dumps(server.stats.snapshot(), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,438 @@
+import json
+import sys
+import zlib
+import argparse
+from bisect import bisect_left, bisect_right
+
+from config import COMPLEX_NO, data_path
+from listing_record import TRADE_TYPES
+
+# ==================================================================
+# [인덱스] 스냅샷 출석부 (비트맵)
+# ==================================================================
+# 크롤링 1회(스냅샷)마다 0,1,2... 순번을 부여하고,
+# 매물별 "수집됨" 여부를 정수 비트맵(i번째 비트 = i번째 스냅샷)으로 보관합니다.
+# 실패한 크롤링은 별도 비트맵(failed)으로 관리하며, 대시보드와 동일하게
+# "누락" 판단 시 실패 스냅샷은 건너뜁니다. 마감 예산으로 일부만 수집한 PARTIAL 스냅샷도
+# 빠진 매물을 누락으로 볼 수 없으므로 같은 비트맵에 넣습니다 (수집된 매물은 그대로 출석 처리).
+# 순번과 비트맵은 (단지, 거래방식) 스트림마다 따로 둡니다 (migrations/004, 006).
+# 한 스트림의 순번은 그 스트림을 수집한 스냅샷에만 붙으므로, 다른 단지/거래방식만 수집한 실행이
+# 이 스트림 매물의 누락으로 세어지지 않고 한쪽 실패가 다른 스트림 매물을 가리지도 않습니다.
+UNOBSERVED_STATUSES = ("FAIL", "PARTIAL")
+INDEX_FILE = "snapshot_index.bin"
+
+
+def snapshot_sort_key(date, time_str):
+    """'14시' / '14:05' 형식을 'HH:MM' 으로 맞춰 정렬 키 생성"""
+    t = str(time_str).strip()
+    if t.endswith("시"):
+        t = f"{t[:-1].zfill(2)}:00"
+    elif ":" in t:
+        hh, mm = t.split(":", 1)
+        t = f"{hh.zfill(2)}:{mm[:2].zfill(2)}"
+    return (str(date), t)
+
+
+def snapshot_order(row):
+    """
+    행(dict) 정렬 키: 정수 snapshot_id (migrations/003, 크롤링 순서대로 증가) 기준
+    id 가 없는 행(마이그레이션 이전에 쌓인 로컬 상태 등)은 정규화한 (날짜, 시각) 으로 id 있는 행보다 앞에 둠
+    """
+    snapshot_id = row.get("snapshot_id")
+    if snapshot_id is not None:
+        return (1, int(snapshot_id))
+    return (0,) + snapshot_sort_key(row.get("crawl_date"), row.get("crawl_time"))
+
+
+def history_key(row):
+    """crawl_history 행 -> (날짜, 시각, 거래방식). 여러 거래방식을 합친 이력은 거래방식 None"""
+    return (row.get("crawl_date"), row.get("crawl_time"), row.get("trade_type") or None)
+
+
+def for_complex(history, complex_no):
+    """complex_no 단지의 crawl_history 행만 (단지 구분이 없는 이력은 모든 단지에 적용, migrations/006)"""
+    complex_no = str(complex_no)
+    return [h for h in history if not h.get("complex_no") or str(h["complex_no"]) == complex_no]
+
+
+def lookup_status(status_map, date, time_str, trade_type=None, unrecorded=None):
+    """
+    history_key 로 모은 {키: 값} 에서 (날짜, 시각) 의 trade_type 값 조회
+    거래방식별 이력이 있으면 그 값, 없으면 합친 이력 값, 둘 다 없으면 None.
+    다른 거래방식 이력만 있으면 unrecorded (이 거래방식은 수집하지 않았거나 기록하지 못함)
+    """
+    if trade_type and (date, time_str, trade_type) in status_map:
+        return status_map[(date, time_str, trade_type)]
+    if (date, time_str, None) in status_map:
+        return status_map[(date, time_str, None)]
+    if trade_type and any((date, time_str, other) in status_map for other in TRADE_TYPES if other != trade_type):
+        return unrecorded
+    return None
+
+
+def _range_mask(lo, hi):
+    """lo ~ hi (포함) 비트가 켜진 마스크"""
+    if hi < lo:
+        return 0
+    return ((1 << (hi - lo + 1)) - 1) << lo
+
+
+def _popcount(x):
+    return bin(x).count("1")
+
+
+def _lowest_bit(x):
+    return (x & -x).bit_length() - 1
+
+
+class StreamBits:
+    """(단지, 거래방식) 스트림 1개의 출석부. 이 스트림을 수집한 스냅샷만 순번을 가짐"""
+
+    def __init__(self):
+        self.snapshots = []  # 정렬 키 목록 (순번 = 리스트 인덱스)
+        self.labels = []     # 원본 (crawl_date, crawl_time)
+        self.failed = 0      # 실패 스냅샷 비트맵
+        self.exact = 0       # 이 스트림만의 이력(단지 + 거래방식)으로 상태가 정해진 스냅샷 (합친 이력으로 덮지 않음)
+        self.presence = {}   # article_no -> 비트맵
+
+    def snapshot_id(self, date, time_str, create=True):
+        """스냅샷 순번 반환 (없으면 시간순 위치에 삽입)"""
+        key = snapshot_sort_key(date, time_str)
+        pos = bisect_left(self.snapshots, key)
+        if pos < len(self.snapshots) and self.snapshots[pos] == key:
+            return pos
+        if not create:
+            return None
+
+        if pos < len(self.snapshots):
+            # 과거 시점 삽입: pos 이상 비트를 한 칸씩 밀어줌 (드문 경우)
+            self.failed = self._shift_from(self.failed, pos)
+            self.exact = self._shift_from(self.exact, pos)
+            for article_no, bits in self.presence.items():
+                self.presence[article_no] = self._shift_from(bits, pos)
+
+        self.snapshots.insert(pos, key)
+        self.labels.insert(pos, (str(date), str(time_str)))
+        return pos
+
+    @staticmethod
+    def _shift_from(bits, pos):
+        low = bits & ((1 << pos) - 1)
+        return low | ((bits >> pos) << (pos + 1))
+
+    def set_status(self, date, time_str, status, exact=False):
+        """
+        스냅샷 상태 반영 (같은 수준의 이력이 다시 기록되면 마지막 상태 기준, 재시도 성공 시 실패 해제)
+        합친 이력(exact=False)은 이 스트림만의 이력이 있는 스냅샷을 덮지 않음 (lookup_status 와 같은 규칙)
+        """
+        sid = self.snapshot_id(date, time_str)
+        bit = 1 << sid
+        if not exact and self.exact & bit:
+            return sid
+        self.failed = self.failed | bit if status in UNOBSERVED_STATUSES else self.failed & ~bit
+        if exact:
+            self.exact |= bit
+        return sid
+
+    def add(self, date, time_str, article_no):
+        sid = self.snapshot_id(date, time_str)
+        self.presence[article_no] = self.presence.get(article_no, 0) | (1 << sid)
+
+    def window(self, start=None, end=None):
+        """구간 -> 비트 마스크. (crawl_date, crawl_time) 또는 날짜 문자열(그 날 전체 포함)"""
+        lo = 0
+        hi = len(self.snapshots) - 1
+        if start is not None:
+            key = snapshot_sort_key(*start) if isinstance(start, tuple) else (start, "")
+            lo = bisect_left(self.snapshots, key)
+        if end is not None:
+            key = snapshot_sort_key(*end) if isinstance(end, tuple) else (end, "\uffff")
+            hi = bisect_right(self.snapshots, key) - 1
+        return _range_mask(lo, hi)
+
+    def longest_gap(self, article_no, mask=None):
+        """최초~최종 수집 사이에서 실패를 제외한 최대 연속 누락 횟수"""
+        bits = self.presence.get(article_no, 0)
+        if mask is not None:
+            bits &= mask
+        if not bits:
+            return 0
+
+        first, last = _lowest_bit(bits), bits.bit_length() - 1
+        gaps = _range_mask(first, last) & ~bits
+        longest = 0
+        while gaps:
+            start = _lowest_bit(gaps)
+            above = bits >> start
+            end = start + _lowest_bit(above)  # 다음 수집 지점 (제외)
+            run = _range_mask(start, end - 1)
+            longest = max(longest, _popcount(run & ~self.failed))
+            gaps &= ~run
+        return longest
+
+    def is_deleted(self, article_no, mask=None):
+        """구간 내 마지막 정상 스냅샷에 없으면 삭제로 판단"""
+        ok = ~self.failed & (mask if mask is not None else _range_mask(0, len(self.snapshots) - 1))
+        if not ok:
+            return False
+        bits = self.presence.get(article_no, 0)
+        return bool(bits & ok) and not (bits >> (ok.bit_length() - 1)) & 1
+
+    def timeline(self, article_no):
+        """스냅샷별 상태 (collected / missing / failed), 최신 -> 과거"""
+        bits = self.presence.get(article_no, 0)
+        result = []
+        for sid in range(len(self.snapshots) - 1, -1, -1):
+            if (bits >> sid) & 1:
+                status = "collected"
+            elif (self.failed >> sid) & 1:
+                status = "failed"
+            else:
+                status = "missing"
+            result.append((self.labels[sid], status))
+        return result
+
+    def to_dict(self):
+        return {
+            "labels": self.labels,
+            "failed": _pack(self.failed),
+            "exact": _pack(self.exact),
+            "presence": {a: _pack(b) for a, b in self.presence.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        stream = cls()
+        stream.labels = [tuple(l) for l in payload["labels"]]
+        stream.snapshots = [snapshot_sort_key(*l) for l in stream.labels]
+        stream.failed = _unpack(payload["failed"])
+        stream.exact = _unpack(payload["exact"])
+        stream.presence = {a: _unpack(b) for a, b in payload["presence"].items()}
+        return stream
+
+
+def _pack(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little").hex()
+
+
+def _unpack(text):
+    return int.from_bytes(bytes.fromhex(text), "little")
+
+
+class SnapshotIndex:
+    """
+    (단지, 거래방식) 스트림별 출석부 모음
+    crawl_history 이력은 단지/거래방식이 맞는 스트림에만 반영하고 (migrations/004, 006),
+    단지나 거래방식이 비어 있는 합친 이력은 해당하는 모든 스트림(이후 생기는 스트림 포함)에 반영합니다.
+    스트림을 수집하지 않은 스냅샷(다른 단지/거래방식만 기록된 스냅샷)은 그 스트림에 순번이 없으므로
+    누락으로 세지 않습니다.
+    """
+
+    def __init__(self):
+        self.streams = {}   # "단지|거래방식" -> StreamBits
+        self.general = []   # 합친 이력 [단지 또는 None, 거래방식 또는 None, 날짜, 시각, 상태] (새 스트림에 다시 적용)
+        self.articles = {}  # article_no -> 스트림 키
+        self.cursors = {"crawl_history": 0, "real_estate_logs": 0}
+
+    @staticmethod
+    def stream_key(complex_no, trade_type):
+        return f"{complex_no or COMPLEX_NO}|{trade_type or ''}"
+
+    # --------------------------------------------------------------
+    # 갱신
+    # --------------------------------------------------------------
+    def stream(self, complex_no, trade_type):
+        key = self.stream_key(complex_no, trade_type)
+        if key not in self.streams:
+            stream = self.streams[key] = StreamBits()
+            for entry in self.general:
+                if self._covers(entry, key):
+                    stream.set_status(entry[2], entry[3], entry[4])
+        return self.streams[key]
+
+    @staticmethod
+    def _covers(entry, key):
+        complex_no, trade_type = key.split("|", 1)
+        return entry[0] in (None, complex_no) and entry[1] in (None, trade_type)
+
+    def add_history(self, date, time_str, status, trade_type=None, complex_no=None):
+        """crawl_history 1건 반영 (단지와 거래방식이 모두 있으면 그 스트림만, 아니면 해당하는 모든 스트림)"""
+        complex_no = str(complex_no) if complex_no else None
+        if complex_no and trade_type:
+            self.stream(complex_no, trade_type).set_status(date, time_str, status, exact=True)
+            return
+        entry = [complex_no, trade_type or None, str(date), str(time_str), status]
+        self.general.append(entry)
+        for key, stream in self.streams.items():
+            if self._covers(entry, key):
+                stream.set_status(date, time_str, status)
+
+    def add_snapshot(self, date, time_str, status="SUCCESS", article_nos=(), trade_type=None, complex_no=None):
+        """크롤링 1회 결과 반영 (crawl_history 상태 + 수집된 매물번호)"""
+        self.add_history(date, time_str, status, trade_type, complex_no)
+        for article_no in article_nos:
+            self.add_article(article_no, date, time_str, trade_type, complex_no)
+
+    def add_article(self, article_no, date, time_str, trade_type=None, complex_no=None):
+        if not article_no or article_no == "-":
+            return
+        stream = self.stream(complex_no, trade_type)
+        stream.add(date, time_str, article_no)
+        self.articles[article_no] = self.stream_key(complex_no, trade_type)
+
+    # --------------------------------------------------------------
+    # 조회 (start / end: (crawl_date, crawl_time) 또는 날짜 문자열, 스트림마다 자기 스냅샷 기준)
+    # --------------------------------------------------------------
+    def _article_stream(self, article_no):
+        key = self.articles.get(article_no)
+        return self.streams.get(key) if key else None
+
+    def first_seen(self, article_no):
+        stream = self._article_stream(article_no)
+        bits = stream.presence.get(article_no, 0) if stream else 0
+        return stream.labels[_lowest_bit(bits)] if bits else None
+
+    def last_seen(self, article_no):
+        stream = self._article_stream(article_no)
+        bits = stream.presence.get(article_no, 0) if stream else 0
+        return stream.labels[bits.bit_length() - 1] if bits else None
+
+    def present_in_all(self, start=None, end=None):
+        """구간 내 (실패 제외) 자기 스트림의 모든 스냅샷에 수집된 매물"""
+        result = []
+        for stream in self.streams.values():
+            required = stream.window(start, end) & ~stream.failed
+            if not required:
+                continue
+            result += [a for a, bits in stream.presence.items() if bits & required == required]
+        return result
+
+    def present_in_any(self, start=None, end=None):
+        result = []
+        for stream in self.streams.values():
+            mask = stream.window(start, end)
+            result += [a for a, bits in stream.presence.items() if bits & mask]
+        return result
+
+    def longest_gap(self, article_no, start=None, end=None):
+        stream = self._article_stream(article_no)
+        return stream.longest_gap(article_no, stream.window(start, end)) if stream else 0
+
+    def relisted(self, min_gap=1, start=None, end=None):
+        """수집 -> (실패 제외) min_gap회 이상 누락 -> 재수집 된 매물 (대시보드 재등록 규칙)"""
+        result = []
+        for stream in self.streams.values():
+            mask = stream.window(start, end)
+            result += [a for a in stream.presence if stream.longest_gap(a, mask) >= min_gap]
+        return result
+
+    def is_deleted(self, article_no, start=None, end=None):
+        stream = self._article_stream(article_no)
+        return stream.is_deleted(article_no, stream.window(start, end)) if stream else False
+
+    def timeline(self, article_no):
+        stream = self._article_stream(article_no)
+        return stream.timeline(article_no) if stream else []
+
+    # --------------------------------------------------------------
+    # 저장 / 로드 (비트맵 바이트 + zlib 압축)
+    # --------------------------------------------------------------
+    def save(self, path=None):
+        path = path or data_path(INDEX_FILE)
+        payload = {
+            "streams": {key: stream.to_dict() for key, stream in self.streams.items()},
+            "general": self.general,
+            "articles": self.articles,
+            "cursors": self.cursors,
+        }
+        with open(path, "wb") as f:
+            f.write(zlib.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"), 6))
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or data_path(INDEX_FILE)
+        index = cls()
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except FileNotFoundError:
+            return index
+        if "streams" not in payload:
+            # 스냅샷 순번을 모든 단지가 공유하던 이전 형식은 스트림별로 나눌 수 없으므로 처음부터 다시 동기화
+            print("⚠️ [Index] 이전 형식 인덱스 -> 처음부터 다시 동기화합니다.")
+            return index
+
+        index.streams = {key: StreamBits.from_dict(s) for key, s in payload["streams"].items()}
+        index.general = payload.get("general", [])
+        index.articles = payload.get("articles", {})
+        index.cursors.update(payload.get("cursors", {}))
+        return index
+
+    # --------------------------------------------------------------
+    # DB 동기화 (id 커서 이후 신규 행만)
+    # --------------------------------------------------------------
+    def sync(self):
+        from db_client import get_supabase, iter_rows
+
+        n_hist = n_logs = 0
+        for row in iter_rows("crawl_history", "*", after_id=self.cursors["crawl_history"]):
+            date, time_str, trade_type = history_key(row)
+            self.add_history(date, time_str, row["status"], trade_type, row.get("complex_no"))
+            self.cursors["crawl_history"] = row["id"]
+            n_hist += 1
+
+        columns = "article_no,crawl_date,crawl_time,trade_type"
+        try:
+            get_supabase().table("real_estate_logs").select("complex_no").limit(1).execute()
+            columns += ",complex_no"
+        except Exception as e:
+            print(f"⚠️ [Index] 단지 구분 없이 동기화 (migrations/006 적용 여부 확인): {e}")
+
+        for row in iter_rows("real_estate_logs", columns, after_id=self.cursors["real_estate_logs"]):
+            self.add_article(row.get("article_no"), row["crawl_date"], row["crawl_time"], row.get("trade_type"),
+                             row.get("complex_no"))
+            self.cursors["real_estate_logs"] = row["id"]
+            n_logs += 1
+
+        n_snapshots = sum(len(s.snapshots) for s in self.streams.values())
+        print(f"🔄 [Index] 동기화 완료: 이력 {n_hist}건, 로그 {n_logs}건 "
+              f"(스트림 {len(self.streams)}개, 스냅샷 {n_snapshots}개, 매물 {len(self.articles)}개)")
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스냅샷 비트맵 인덱스")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("sync", help="DB 신규 행 반영")
+    p_rel = sub.add_parser("relisted", help="재등록 매물 조회")
+    p_rel.add_argument("--gap", type=int, default=1, help="최소 누락 횟수")
+    p_rel.add_argument("--start", help="시작일 (YYYY-MM-DD)")
+    p_rel.add_argument("--end", help="종료일 (YYYY-MM-DD)")
+    p_all = sub.add_parser("always", help="구간 내 항상 수집된 매물")
+    p_all.add_argument("--start")
+    p_all.add_argument("--end")
+    p_show = sub.add_parser("show", help="매물 타임라인")
+    p_show.add_argument("article_no")
+    args = parser.parse_args(argv)
+
+    index = SnapshotIndex.load()
+
+    if args.cmd == "sync":
+        index.sync()
+        index.save()
+    elif args.cmd == "relisted":
+        for article_no in index.relisted(args.gap, args.start, args.end):
+            gap = index.longest_gap(article_no, args.start, args.end)
+            print(f"{article_no}\t최대 누락 {gap}회\t최초 {index.first_seen(article_no)}\t최종 {index.last_seen(article_no)}")
+    elif args.cmd == "always":
+        for article_no in index.present_in_all(args.start, args.end):
+            print(article_no)
+    elif args.cmd == "show":
+        for (date, time_str), status in index.timeline(args.article_no):
+            print(f"{date} {time_str}\t{status}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
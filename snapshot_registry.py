@@ -0,0 +1,85 @@
+import sys
+import argparse
+from datetime import datetime
+
+from config import KST
+from db_client import get_supabase
+from snapshot_index import snapshot_sort_key
+
+# ==================================================================
+# [스냅샷] 크롤링 1회 -> 정수 snapshot_id (migrations/003 참고)
+# ==================================================================
+# (crawl_date, crawl_time) 문자열 대신 snapshots 테이블의 정수 id 로 사실 테이블을 묶습니다.
+#   - 'HH시' / 'HH:MM' 은 KST 기준 timestamptz(crawled_at) 로 정규화되어 같은 시각이면 같은 id
+#   - 크롤러는 저장 전에 한 번 등록하고 (단지/거래방식 목록 추가) 돌려받은 id 를 행에 붙임
+#   - id 를 못 받으면(마이그레이션 전) DB 트리거도 없으므로 문자열 키만으로 저장 (기존과 동일)
+# 문자열 컬럼은 대시보드 호환을 위해 그대로 유지합니다.
+_ids = {}
+_disabled = False
+
+
+def snapshot_timestamp(crawl_date, crawl_time):
+    """('2025-12-01', '14시') -> 2025-12-01 14:00+09:00 (DB 의 snapshot_ts 와 동일한 규칙)"""
+    date, hhmm = snapshot_sort_key(crawl_date, crawl_time)
+    return datetime.strptime(f"{date} {hhmm}", "%Y-%m-%d %H:%M").replace(tzinfo=KST)
+
+
+def register_snapshot(crawl_date, crawl_time, complex_nos=(), trade_types=()):
+    """스냅샷 등록 (이미 있으면 단지/거래방식만 합침) -> snapshot_id, 실패 시 None"""
+    global _disabled
+    if _disabled:
+        return None
+    key = snapshot_timestamp(crawl_date, crawl_time)
+    try:
+        snapshot_id = get_supabase().rpc("register_snapshot", {
+            "p_crawl_date": str(crawl_date),
+            "p_crawl_time": str(crawl_time),
+            "p_complex_nos": sorted({str(c) for c in complex_nos}),
+            "p_trade_types": sorted(set(trade_types)),
+        }).execute().data
+    except Exception as e:
+        _disabled = True
+        print(f"⚠️ [Snapshot] 스냅샷 등록 생략 (migrations/003 적용 여부 확인): {e}")
+        return None
+
+    if key not in _ids:
+        print(f"🧾 [Snapshot] {crawl_date} {crawl_time} -> #{snapshot_id} ({key.isoformat()})")
+    _ids[key] = snapshot_id
+    return snapshot_id
+
+
+def with_snapshot_id(rows, snapshot_id):
+    """행 목록에 snapshot_id 를 붙인 사본 (id 가 없으면 원본 그대로)"""
+    if snapshot_id is None:
+        return rows
+    return [dict(row, snapshot_id=snapshot_id) for row in rows]
+
+
+def recent_snapshots(limit=20):
+    return (get_supabase().table("snapshots").select("*")
+            .order("id", desc=True).limit(limit).execute().data or [])
+
+
+# ==================================================================
+# 실행 블록
+# ==================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스냅샷 레지스트리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="최근 스냅샷 목록")
+    p_list.add_argument("--limit", type=int, default=20)
+    p_ts = sub.add_parser("resolve", help="(날짜, 시각) -> 정규화된 시각")
+    p_ts.add_argument("crawl_date")
+    p_ts.add_argument("crawl_time")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "resolve":
+        print(snapshot_timestamp(args.crawl_date, args.crawl_time).isoformat())
+    elif args.cmd == "list":
+        for row in recent_snapshots(args.limit):
+            print(f"#{row['id']}\t{row['crawled_at']}\t{row['crawl_date']} {row['crawl_time']}\t"
+                  f"{','.join(row.get('complex_nos') or [])}\t{','.join(row.get('trade_types') or [])}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
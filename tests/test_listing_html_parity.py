@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import listing_html  # noqa: E402
+
+# ==================================================================
+# [파서 동등성] lxml / selectolax 백엔드 결과 == 기존 BeautifulSoup("html.parser") 결과
+# ==================================================================
+# tests/fixtures 의 목록/상세 HTML 을 dom_crawler 와 같은 단위(그룹 / item_inner / 상세 패널)로
+# 잘라 각 백엔드에 넣고, bs4 결과와 필드 단위로 비교합니다.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+REFERENCE = "bs4"
+BACKEND_MODULES = {"bs4-lxml": "lxml", "lxml": "lxml.cssselect", "selectolax": "selectolax"}
+
+
+def _fragments(filename, css):
+    """fixture 파일 -> css 에 맞는 요소들의 outerHTML 목록 (dom_crawler 가 넘기는 단위)"""
+    bs4 = pytest.importorskip("bs4")
+
+    with open(os.path.join(FIXTURES, filename), encoding="utf-8") as f:
+        soup = bs4.BeautifulSoup(f.read(), "html.parser")
+    fragments = [str(node) for node in soup.select(css)]
+    assert fragments, f"{filename} 에 {css} 요소가 없습니다."
+    return fragments
+
+
+@pytest.fixture(scope="module")
+def groups():
+    return _fragments("list_items.html", "div.item")
+
+
+@pytest.fixture(scope="module")
+def items():
+    return _fragments("list_items.html", "div.item_inner")
+
+
+@pytest.fixture(scope="module")
+def details():
+    return _fragments("detail_panels.html", "div.detail_contents_inner") + ["", "<div></div>"]
+
+
+@pytest.fixture(params=[name for name in listing_html.BACKENDS if name != REFERENCE])
+def backend(request):
+    pytest.importorskip(BACKEND_MODULES[request.param])
+    return listing_html.get_backend(request.param)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    pytest.importorskip("bs4")
+    return listing_html.get_backend(REFERENCE)
+
+
+def test_parse_group_parity(backend, reference, groups):
+    for html in groups:
+        assert listing_html.parse_group(html, backend) == listing_html.parse_group(html, reference), html
+
+
+def test_parse_item_parity(backend, reference, items):
+    for html in items:
+        assert listing_html.parse_item(html, backend) == listing_html.parse_item(html, reference), html
+
+
+def test_parse_detail_parity(backend, reference, details):
+    for html in details:
+        assert listing_html.parse_detail(html, backend) == listing_html.parse_detail(html, reference), html
+
+
+def test_reference_values(reference, groups, items, details):
+    """기준(bs4) 결과 자체가 기대값인지 확인 (모든 백엔드가 같은 틀린 값을 내는 경우 방지)"""
+    assert listing_html.parse_group(groups[0], reference) == {
+        "title": "래미안 101동", "spec": "110E-2/84m², 저/22층, 남서향",
+    }
+    assert listing_html.parse_group(groups[2], reference) == {"title": None, "spec": ""}
+    assert listing_html.parse_item(items[0], reference) == {
+        "agent": "행복공인중개사사무소", "price": "12억 5,000", "is_landlord": True,
+        "verification_date": "2025-11-29", "description": "올수리 & 즉시입주 가능, 역세권",
+    }
+    assert listing_html.parse_item(items[1], reference)["agent"] == "대표두번째공인중개사"
+    assert listing_html.parse_item(items[3], reference) == {
+        "agent": "알수없음", "price": "9억", "is_landlord": False,
+        "verification_date": None, "description": "",
+    }
+    assert [listing_html.parse_detail(html, reference)["article_no"] for html in details] == [
+        "2512345678", "2599999999", None, None, None,
+    ]